@@ -0,0 +1,167 @@
+import argparse
+import os
+import random
+from datetime import date, timedelta
+
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region\n"
+REGIONS = ["North", "South", "East", "West"]
+
+# (name, typical unit price) as in data/sales_data.txt
+BASE_PRODUCTS = [
+    ("Laptop", 60000), ("Mouse", 500), ("Keyboard", 2500), ("Monitor", 10000),
+    ("Webcam", 3000), ("Headphones", 2800), ("USB Cable", 300), ("External Hard Drive", 5000),
+    ("Wireless Mouse", 1200), ("Laptop Charger", 1800)
+]
+VARIANTS = ["", "Premium", "Wireless", "Pro", "Mini", "LED", "Gaming", "HD", "65W", "1TB"]
+
+# Share of rows that are dirty, split evenly over these patterns. Rows with a
+# wrong field count or unparseable number are dropped by parse_transactions;
+# the rest parse but fail validation, except a missing region which is kept.
+DIRTY_PATTERNS = [
+    "zero_quantity", "negative_price", "bad_transaction_id", "bad_product_id",
+    "missing_customer", "missing_region", "extra_field", "missing_field", "bad_number"
+]
+
+
+def parse_rows(value):
+    # "10K", "1M", "10m" or a plain integer
+    value = value.strip().upper()
+    scale = {"K": 1000, "M": 1000000}.get(value[-1:])
+    if scale:
+        return int(float(value[:-1]) * scale)
+    return int(value)
+
+
+def build_catalog(products=500):
+    catalog = []
+
+    for i in range(products):
+        name, price = BASE_PRODUCTS[i % len(BASE_PRODUCTS)]
+        variant = VARIANTS[(i // len(BASE_PRODUCTS)) % len(VARIANTS)]
+        if variant:
+            name = f"{name} {variant}"
+        if i >= len(BASE_PRODUCTS) * len(VARIANTS):
+            name = f"{name} {i}"
+        catalog.append((f"P{101 + i}", name, price))
+
+    return catalog
+
+
+def _format_price(rng, price):
+    # whole rupees like the sample file; some large prices carry thousands separators
+    price = max(1, int(price * rng.uniform(0.7, 1.3)))
+    if price >= 1000 and rng.random() < 0.3:
+        return f"{price:,}"
+    return str(price)
+
+
+def _format_name(rng, name):
+    # the sample file writes some multi-word names with a comma ("Mouse,Wireless")
+    if " " in name and rng.random() < 0.1:
+        return name.replace(" ", ",", 1)
+    return name
+
+
+def generate_sales_data(filename, rows, seed=42, dirty_rate=0.05, products=500,
+                        customers=None, days=365, start=date(2024, 1, 1)):
+    rng = random.Random(seed)
+    catalog = build_catalog(products)
+    if customers is None:
+        customers = max(50, rows // 20)
+
+    dates = [(start + timedelta(days=d)).isoformat() for d in range(days)]
+    counts = {"rows": rows, "dirty": 0}
+
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+
+    with open(filename, "w", encoding="utf-8") as file:
+        file.write(HEADER)
+
+        batch = []
+        for i in range(rows):
+            product_id, name, price = rng.choice(catalog)
+            fields = [
+                f"T{i + 1:07d}",
+                rng.choice(dates),
+                product_id,
+                _format_name(rng, name),
+                str(rng.randint(1, 10)),
+                _format_price(rng, price),
+                f"C{rng.randint(1, customers):06d}",
+                rng.choice(REGIONS)
+            ]
+
+            if rng.random() < dirty_rate:
+                pattern = rng.choice(DIRTY_PATTERNS)
+                counts["dirty"] += 1
+                counts[pattern] = counts.get(pattern, 0) + 1
+
+                if pattern == "zero_quantity":
+                    fields[4] = "0"
+                elif pattern == "negative_price":
+                    fields[5] = "-" + fields[5]
+                elif pattern == "bad_transaction_id":
+                    fields[0] = "X" + fields[0][1:]
+                elif pattern == "bad_product_id":
+                    fields[2] = "Q" + fields[2][1:]
+                elif pattern == "missing_customer":
+                    fields[6] = ""
+                elif pattern == "missing_region":
+                    fields[7] = ""
+                elif pattern == "extra_field":
+                    fields.append("EXTRA")
+                elif pattern == "missing_field":
+                    del fields[3]
+                else:
+                    fields[4] = "ten"
+
+            batch.append("|".join(fields) + "\n")
+            if len(batch) >= 10000:
+                file.writelines(batch)
+                batch = []
+
+        file.writelines(batch)
+
+    return counts
+
+
+# Product mapping in the shape create_product_mapping returns, covering about
+# `coverage` of the catalog so enrichment has both matches and misses.
+
+def synthetic_product_mapping(products=500, coverage=0.8, seed=42):
+    rng = random.Random(seed)
+    mapping = {}
+
+    for product_id, name, _ in build_catalog(products):
+        if rng.random() < coverage:
+            mapping[int(product_id[1:])] = {
+                "title": name,
+                "category": rng.choice(["laptops", "accessories", "electronics"]),
+                "brand": rng.choice(["Acme", "Globex", None]),
+                "rating": round(rng.uniform(2.5, 5.0), 2)
+            }
+
+    return mapping
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic sales data")
+    parser.add_argument("--rows", default="10K", help="row count, e.g. 10K, 1M, 10M")
+    parser.add_argument("--output", default=None,
+                        help="output file (default benchmarks/data/sales_<rows>.txt)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dirty-rate", type=float, default=0.05,
+                        help="share of rows with a dirty-row pattern")
+    parser.add_argument("--products", type=int, default=500)
+    args = parser.parse_args()
+
+    rows = parse_rows(args.rows)
+    output = args.output or os.path.join("benchmarks", "data", f"sales_{args.rows.lower()}.txt")
+
+    counts = generate_sales_data(output, rows, args.seed, args.dirty_rate, args.products)
+    print(f"Wrote {rows} rows to {output} ({counts['dirty']} dirty)")
+
+
+if __name__ == "__main__":
+    main()
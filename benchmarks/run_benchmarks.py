@@ -0,0 +1,306 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from utils.file_handler import (
+    read_sales_data,
+    parse_transactions,
+    validate_and_filter,
+    read_transactions_mmap
+)
+from utils.data_processor import (
+    SalesAggregator,
+    aggregate,
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    daily_sales_trend,
+    find_peak_sales_day,
+    low_performing_products
+)
+from utils import columnar
+from utils.columnar import TransactionColumns, select_valid
+from utils.parse_cache import read_parsed_columns
+from utils.cube import build_cube, save_cube, load_cube
+from utils.sqlite_store import SalesDatabase
+from utils.api_handler import enrich_sales_data
+from utils.report_generator import generate_sales_report
+
+from benchmarks.generate_data import generate_sales_data, synthetic_product_mapping, parse_rows
+
+
+BASELINE_DIR = os.path.join("benchmarks", "baselines")
+DATA_DIR = os.path.join("benchmarks", "data")
+
+SKETCH_PRECISION = 12
+HEAVY_HITTER_CAPACITY = 1000
+SPILL_BUDGET_BYTES = 1024 * 1024
+
+
+# Run `func` `repeat` times and keep the best wall time, then once more under
+# tracemalloc for the peak of Python allocations. Pipeline stages print
+# progress; that output is swallowed so it does not skew the timings.
+
+def measure(func, args, rows, repeat=1, memory=True):
+    best = None
+    result = None
+
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func(*args)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    # stages that produce the rows (the readers) are rated on their output
+    if rows is None:
+        rows = len(result)
+
+    stats = {
+        "seconds": best,
+        "peak_mb": round(peak / 1024 / 1024, 2) if peak is not None else None,
+        "rows": rows,
+        "rows_per_sec": rows / best if best > 0 else None
+    }
+    return result, stats
+
+
+def run_benchmarks(filename, repeat=1, memory=True, mapping=None):
+    if mapping is None:
+        mapping = synthetic_product_mapping()
+
+    stages = {}
+
+    def stage(name, func, *args, rows):
+        print(f"  {name}...", flush=True)
+        result, stats = measure(func, args, rows, repeat, memory)
+        stages[name] = stats
+        return result
+
+    with tempfile.TemporaryDirectory(prefix="sales-bench-") as scratch:
+        lines = stage("read_sales_data", read_sales_data, filename, rows=None)
+
+        transactions = stage("parse_transactions", parse_transactions, lines, rows=len(lines))
+        stage("read_transactions_mmap", read_transactions_mmap, filename, rows=None)
+        del lines
+
+        valid, _, _ = stage("validate_and_filter", validate_and_filter, transactions, rows=len(transactions))
+
+        for func in (calculate_total_revenue, region_wise_sales, top_selling_products, customer_analysis,
+                     daily_sales_trend, find_peak_sales_day, low_performing_products):
+            stage(func.__name__, func, valid, rows=len(valid))
+
+        results = stage("aggregate", aggregate, valid, rows=len(valid))
+
+        # the aggregator with the HyperLogLog / quantile / heavy-hitter sketches
+        stage("aggregate.sketches",
+              lambda: SalesAggregator(HEAVY_HITTER_CAPACITY, SKETCH_PRECISION).update(valid),
+              rows=len(valid))
+
+        # the customer and product group-bys spilled to disk under a small budget
+        def spill_aggregate():
+            spilled = SalesAggregator(memory_budget=SPILL_BUDGET_BYTES).update(valid)
+            try:
+                spilled.customer_analysis()
+                spilled.top_selling_products()
+                spilled.low_performing_products()
+            finally:
+                spilled.close()
+
+        stage("aggregate.spill", spill_aggregate, rows=len(valid))
+
+        # the same analytics on the columnar store
+        columns = stage("columnar.from_transactions", TransactionColumns.from_transactions, valid,
+                        rows=len(valid))
+        for func in (calculate_total_revenue, region_wise_sales, top_selling_products, customer_analysis,
+                     daily_sales_trend, find_peak_sales_day, low_performing_products):
+            stage("columnar." + func.__name__, getattr(columnar, func.__name__), columns, rows=len(valid))
+        del columns
+
+        # --parse-cache: a cold read parses the text and writes the cache, a warm one maps it
+        cache_dir = os.path.join(scratch, "parsed")
+
+        def cold_parse_cache():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            return read_parsed_columns(filename, cache_dir)
+
+        stage("parse_cache.cold", cold_parse_cache, rows=len(transactions))
+        cached, valid_mask, _ = stage("parse_cache.warm", read_parsed_columns, filename, cache_dir,
+                                      rows=len(transactions))
+        stage("parse_cache.select_valid", select_valid, cached, valid_mask, rows=len(transactions))
+        del cached, valid_mask
+
+        # --cube
+        cube = stage("cube.build", build_cube, valid, rows=len(valid))
+        cube_file = os.path.join(scratch, "sales.cube.npz")
+        stage("cube.save", save_cube, cube, cube_file, None, rows=len(valid))
+        cube = stage("cube.load", load_cube, cube_file, rows=len(valid))
+        stage("cube.daily_sales_trend", cube.daily_sales_trend, rows=len(valid))
+        del cube
+
+        # --db
+        db = SalesDatabase(os.path.join(scratch, "sales.db"))
+        try:
+            stage("sqlite.load", db.load, transactions, rows=len(transactions))
+            view, _, _ = stage("sqlite.validate_and_filter", db.validate_and_filter, rows=len(transactions))
+            stage("sqlite.aggregate", view.aggregate, rows=len(valid))
+            db.store_products(mapping)
+            stage("sqlite.iter_enriched", lambda: list(view.iter_enriched()), rows=len(valid))
+        finally:
+            db.close()
+
+        enriched = stage("enrich_sales_data", enrich_sales_data, valid, mapping,
+                         os.path.join(scratch, "enriched_sales_data.txt"), rows=len(valid))
+
+        stage("generate_sales_report",
+              lambda: generate_sales_report(valid, enriched, os.path.join(scratch, "sales_report.txt"), results),
+              rows=len(valid))
+
+    return {
+        "meta": {
+            "file": filename,
+            "rows": len(transactions),
+            "valid": len(valid),
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S")
+        },
+        "stages": stages
+    }
+
+
+def load_baseline(name):
+    path = os.path.join(BASELINE_DIR, name + ".json")
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        print("Baseline not found:", path)
+        return None
+
+
+def save_baseline(name, run):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = os.path.join(BASELINE_DIR, name + ".json")
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(run, file, indent=2)
+    print("Baseline saved to", path)
+
+
+def _change(now, before):
+    if now is None or not before:
+        return None
+    return (now - before) / before
+
+
+# Print the stage table; with a baseline, flag stages whose time or peak
+# memory grew by more than `threshold`. Returns the regressed stage names.
+
+def print_report(run, baseline=None, threshold=0.10):
+    regressions = []
+
+    print(f"\n{run['meta']['rows']} rows ({run['meta']['valid']} valid) from {run['meta']['file']}")
+    header = f"{'Stage':<36}{'Seconds':>10}{'Peak MB':>10}{'Rows/sec':>14}"
+    if baseline is not None:
+        header += f"{'Time vs base':>15}{'Mem vs base':>14}"
+    print(header)
+    print("-" * len(header))
+
+    for name, stats in run["stages"].items():
+        peak = f"{stats['peak_mb']:.2f}" if stats["peak_mb"] is not None else "-"
+        rate = f"{stats['rows_per_sec']:,.0f}" if stats["rows_per_sec"] else "-"
+        line = f"{name:<36}{stats['seconds']:>10.4f}{peak:>10}{rate:>14}"
+
+        if baseline is not None:
+            before = baseline["stages"].get(name)
+            time_change = _change(stats["seconds"], before and before["seconds"])
+            mem_change = _change(stats["peak_mb"], before and before["peak_mb"])
+
+            line += f"{_format_change(time_change):>15}{_format_change(mem_change):>14}"
+            if (time_change is not None and time_change > threshold) or \
+                    (mem_change is not None and mem_change > threshold):
+                regressions.append(name)
+                line += "  REGRESSION"
+
+        print(line)
+
+    if baseline is not None and baseline["meta"]["rows"] != run["meta"]["rows"]:
+        print(f"Note: baseline was recorded on {baseline['meta']['rows']} rows")
+
+    return regressions
+
+
+def _format_change(change):
+    return "-" if change is None else f"{change * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sales pipeline stages")
+    parser.add_argument("--input", default=None,
+                        help="sales file to benchmark (default: generate one with --rows)")
+    parser.add_argument("--rows", default="10K",
+                        help="rows to generate when --input is not given, e.g. 10K, 1M, 10M")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="timed runs per stage; the best is reported")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the extra tracemalloc run per stage")
+    parser.add_argument("--save-baseline", metavar="NAME",
+                        help="store this run as benchmarks/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME",
+                        help="compare against benchmarks/baselines/NAME.json")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown or memory growth reported as a regression")
+    parser.add_argument("--output", default=None,
+                        help="also write this run's results as JSON")
+    args = parser.parse_args()
+
+    filename = args.input
+    if filename is None:
+        filename = os.path.join(DATA_DIR, f"sales_{args.rows.lower()}_{args.seed}.txt")
+        if not os.path.exists(filename):
+            print(f"Generating {args.rows} rows into {filename}...")
+            generate_sales_data(filename, parse_rows(args.rows), seed=args.seed)
+
+    print("Running stages:")
+    run = run_benchmarks(filename, args.repeat, not args.no_memory)
+
+    baseline = load_baseline(args.compare) if args.compare else None
+    regressions = print_report(run, baseline, args.threshold)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(run, file, indent=2)
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, run)
+
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) regressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,16 @@
 
-from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+import argparse
+
+from utils.file_handler import (
+    parse_transactions,
+    validate_and_filter,
+    read_transactions_mmap,
+    iter_parse_transactions,
+    iter_validate_and_filter
+)
 from utils.data_processor import (
+    SalesAggregator,
+    aggregate,
     calculate_total_revenue,
     region_wise_sales,
     top_selling_products,
@@ -9,11 +19,423 @@ from utils.data_processor import (
     find_peak_sales_day,
     low_performing_products
 )
-from utils.api_handler import fetch_all_products, create_product_mapping, enrich_sales_data
+from utils.api_handler import fetch_all_products, create_product_mapping, enrich_sales_data, save_enriched_data
 from utils.report_generator import generate_sales_report
+from utils.checkpoint import run_incremental
+from utils.parallel import parallel_aggregate, aggregate_files
+from utils.ingest import read_inputs, iter_inputs, expand_inputs, is_plain_file, input_signature
+from utils.parse_cache import read_parsed_columns
+from utils import columnar
+from utils.columnar import select_valid, ColumnarResults
+from utils.index import TransactionIndex
+from utils.server import serve
+from utils.metrics import PipelineMetrics
+from utils.cube import load_or_build_cube, cube_path, CubeResults
+from utils.query import SalesQuery
+from utils.dedup import DuplicateFilter
+from utils.watch import watch
+from utils.result_cache import ResultCache, use_result_cache
+from utils.sqlite_store import SalesDatabase
+
+
+ANALYTICS = (calculate_total_revenue, region_wise_sales, top_selling_products, customer_analysis,
+             daily_sales_trend, find_peak_sales_day, low_performing_products)
+
+
+def ask_filters():
+    choice = input("Do you want to filter data? (y/n): ").strip().lower()
+
+    region = None
+    min_amt = None
+    max_amt = None
+
+    if choice == "y":
+        region = input("Enter region (or press Enter to skip): ").strip()
+        region = region if region else None
+
+        min_amt = input("Enter minimum amount (or press Enter to skip): ").strip()
+        min_amt = float(min_amt) if min_amt else None
+
+        max_amt = input("Enter maximum amount (or press Enter to skip): ").strip()
+        max_amt = float(max_amt) if max_amt else None
+
+    return region, min_amt, max_amt
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sales Analytics System")
+    parser.add_argument("--input", default="data/sales_data.txt",
+                        help="pipe-delimited sales file, or a directory / glob of them (.gz and .bz2 are "
+                             "streamed without unpacking)")
+    parser.add_argument("--stream", action="store_true",
+                        help="read, parse, validate and analyze in one bounded-memory pass")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="with --stream, shard the file (or split the input files) across this many processes")
+    parser.add_argument("--pushdown", action="store_true",
+                        help="with --stream, reject rows by region/amount from the raw line before parsing "
+                             "(invalid rows are then only counted among rows that match)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="drop rows whose TransactionID was already seen (Bloom filter + spilled ID index)")
+    parser.add_argument("--sketch-precision", type=int, default=None,
+                        help="with --stream, track distinct customers with HyperLogLog of this precision (4-18) "
+                             "and order-value quantiles per region")
+    parser.add_argument("--memory-budget", type=float, default=None, metavar="MB",
+                        help="with serial --stream, keep the customer and product group-bys under about this "
+                             "much memory, spilling hash partitions to temporary files beyond it")
+    parser.add_argument("--parse-cache", action="store_true",
+                        help="load parsed records from the binary cache when the input is unchanged")
+    parser.add_argument("--fast-parse", action="store_true",
+                        help="parse with the memory-mapped bytes-level parser")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only process lines appended since the last checkpoint")
+    parser.add_argument("--checkpoint", default="output/checkpoint.json",
+                        help="checkpoint file used by --incremental")
+    parser.add_argument("--cube", action="store_true",
+                        help="answer the summary from the Date x Region x Product cube stored next to the input")
+    parser.add_argument("--serve", action="store_true",
+                        help="keep the data in memory and answer JSON queries over HTTP")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address for --serve")
+    parser.add_argument("--port", type=int, default=8000,
+                        help="port for --serve")
+    parser.add_argument("--socket", default=None,
+                        help="with --serve, listen on this Unix socket instead of host:port")
+    parser.add_argument("--db", default=None, metavar="PATH",
+                        help="store the transactions in this SQLite database and run filters, analytics "
+                             "and enrichment as SQL (reloaded only when the input changes)")
+    parser.add_argument("--result-cache", default=None, metavar="DIR",
+                        help="memoize analytics results in memory and in DIR, keyed by the input and filters")
+    parser.add_argument("--result-cache-mb", type=int, default=512,
+                        help="size budget of the --result-cache directory (least recently used entries go first)")
+    parser.add_argument("--watch", action="store_true",
+                        help="tail the input file or directory and keep live aggregates and report")
+    parser.add_argument("--report-interval", type=float, default=5.0,
+                        help="with --watch, re-render the report at most this often (seconds)")
+    parser.add_argument("--window-days", type=int, default=7,
+                        help="with --watch, sliding window of sales days for the live revenue")
+    parser.add_argument("--live-report", default="output/live_report.txt",
+                        help="report file re-rendered by --watch")
+    parser.add_argument("--enriched-columns", default=None,
+                        help="also write the enriched rows as a columnar .npz file")
+    parser.add_argument("--metrics-json", default=None,
+                        help="write per-stage wall/CPU time, peak memory and rows/sec to this JSON file")
+    parser.add_argument("--metrics-prom", default=None,
+                        help="write the same metrics in Prometheus text format to this file")
+    parser.add_argument("--profile", default=None,
+                        help="comma-separated stages to run under cProfile (or 'all')")
+    parser.add_argument("--profile-dir", default="output/profiles",
+                        help="directory for the --profile dumps")
+    args = parser.parse_args()
+
+    if args.dedup and (args.workers > 1 or args.pushdown or args.incremental or args.cube or args.serve
+                       or args.watch or args.db):
+        parser.error("--dedup works with the default pipeline and serial --stream only")
+
+    if args.memory_budget and (not args.stream or args.workers > 1):
+        parser.error("--memory-budget works with serial --stream only")
+
+    # these modes cache or index by byte offset into a single plain file
+    if (args.parse_cache or args.fast_parse or args.incremental or args.cube or args.serve) \
+            and not is_plain_file(args.input):
+        parser.error("--parse-cache, --fast-parse, --incremental, --cube and --serve "
+                     "need --input to be a single uncompressed file")
+
+    return args
+
+
+def _duplicates_note(summary):
+    if "duplicates" not in summary:
+        return ""
+    return f" | Duplicates dropped: {summary['duplicates']}"
+
+
+# Streaming mode: rows flow read -> parse -> validate/filter -> aggregate
+# without ever holding the full dataset in memory.
+
+def run_streaming(args):
+    print("\n==============================")
+    print("  SALES ANALYTICS (STREAMING)")
+    print("==============================\n")
+
+    region, min_amt, max_amt = ask_filters()
+
+    print("\n[1/2] Streaming and analyzing sales data...")
+    options = {"sketch_precision": args.sketch_precision,
+               "memory_budget": args.memory_budget and int(args.memory_budget * 1024 * 1024)}
+
+    if args.workers > 1 and is_plain_file(args.input):
+        results, summary = parallel_aggregate(args.input, args.workers, region, min_amt, max_amt, options)
+    elif args.workers > 1:
+        results, summary = aggregate_files(expand_inputs(args.input), args.workers,
+                                           region, min_amt, max_amt, options)
+    elif args.pushdown:
+        query = SalesQuery(args.input).filter(region, min_amt, max_amt)
+        results = query.aggregate(**options)
+        summary = {"final_count": query.stats["matched"], "invalid": query.stats["invalid"]}
+        print(f"Skipped {query.stats['pushed_down']} non-matching rows before parsing")
+    else:
+        summary = {}
+        dedup = DuplicateFilter() if args.dedup else None
+        lines = iter_inputs(args.input)
+        transactions = iter_parse_transactions(lines)
+        valid_tx = iter_validate_and_filter(transactions, region, min_amt, max_amt, summary, dedup)
+        try:
+            results = SalesAggregator(**options).update(valid_tx)
+        finally:
+            if dedup is not None:
+                dedup.close()
+
+    print(f"✔ Valid: {summary['final_count']} | Invalid: {summary['invalid']}{_duplicates_note(summary)}\n")
+
+    try:
+        print("[2/2] Results")
+        if results.transaction_count == 0:
+            print("No transactions matched.")
+            return
+
+        peak_date, peak_revenue, peak_count = results.find_peak_sales_day()
+        print(f"Total Revenue: ₹{results.calculate_total_revenue():,.2f}")
+        print(f"Peak Day: {peak_date} (₹{peak_revenue:,.2f}, {peak_count} transactions)")
+
+        print("Region-wise Sales:")
+        for name, stats in results.region_wise_sales().items():
+            print(f"  {name} | ₹{stats['total_sales']:,.2f} | {stats['percentage']}%")
+
+        print("Top Products:")
+        for i, (name, qty, revenue) in enumerate(results.top_selling_products(), 1):
+            print(f"  {i} | {name} | {qty} | ₹{revenue:,.2f}")
+
+        print("Top Customers:")
+        for i, (cid, spent, orders) in enumerate(results.top_customers(), 1):
+            print(f"  {i} | {cid} | ₹{spent:,.2f} | {orders} orders")
+
+        if results.groups is not None and results.groups.spilling:
+            groups = results.groups
+            print(f"Customer/product group-bys went over the memory budget: spilled {groups.spilled_rows} rows, "
+                  f"merged {groups.partitions_merged} partitions")
+
+        if args.sketch_precision:
+            unique_customers = results.unique_customers_by_region()
+            print("Region Order Values (approximate):")
+            for name, stats in results.order_value_quantiles().items():
+                print(f"  {name} | ~{unique_customers[name]} customers | "
+                      f"median ₹{stats['median']:,.2f} | p95 ₹{stats['p95']:,.2f}")
+    finally:
+        results.close()
+
+
+# Incremental mode: resume from the saved checkpoint, parse only appended
+# lines and regenerate the report from the merged aggregates.
+
+def run_incremental_mode(args):
+    print("\n==============================")
+    print("  SALES ANALYTICS (INCREMENTAL)")
+    print("==============================\n")
+
+    print("[1/3] Fetching product data from API...")
+    product_mapping = create_product_mapping(fetch_all_products())
+    print(f"✔ Product mapping created ({len(product_mapping)} products)\n")
+
+    print("[2/3] Updating aggregates...")
+    results, stats = run_incremental(args.input, args.checkpoint, product_mapping)
+
+    if stats["rebuild_reason"]:
+        print(f"Full rebuild ({stats['rebuild_reason']})")
+    else:
+        print(f"Resumed from byte {stats['start_offset']}")
+    print(f"✔ New records: {stats['new_records']} | Valid: {stats['new_valid']} | Invalid: {stats['new_invalid']}\n")
+
+    print("[3/3] Generating report...")
+    if results.transaction_count == 0:
+        print("No valid transactions to report.")
+        return
+    generate_sales_report(None, None, results=results)
+    print("✔ Report saved to output/sales_report.txt\n")
+
+
+# Cube mode: summary sections and the report from the persisted aggregate
+# cube, rebuilt only when the data file changed
+
+def run_cube_mode(args):
+    print("\n==============================")
+    print("  SALES ANALYTICS (CUBE)")
+    print("==============================\n")
+
+    print("[1/3] Loading aggregate cube...")
+    cube, loaded = load_or_build_cube(args.input)
+    source = "loaded from" if loaded else "built and saved to"
+    print(f"✔ {len(cube)} cells {source} {cube_path(args.input)}\n")
+
+    print("[2/3] Results")
+    if len(cube) == 0:
+        print("No valid transactions.")
+        return
+
+    peak_date, peak_revenue, peak_count = cube.find_peak_sales_day()
+    print(f"Total Revenue: ₹{cube.calculate_total_revenue():,.2f}")
+    print(f"Peak Day: {peak_date} (₹{peak_revenue:,.2f}, {peak_count} transactions)")
+
+    region_stats = cube.region_wise_sales()
+    print("Region-wise Sales:")
+    for name, stats in region_stats.items():
+        print(f"  {name} | ₹{stats['total_sales']:,.2f} | {stats['percentage']}%")
+
+    print("Top Products:")
+    for i, (name, qty, revenue) in enumerate(cube.top_selling_products(), 1):
+        print(f"  {i} | {name} | {qty} | ₹{revenue:,.2f}")
+
+    top_region = next(iter(region_stats))
+    products = cube.drill_down("ProductName", Region=top_region)
+    print(f"Top Products in {top_region or '(no region)'} (approximate customers):")
+    best = sorted(products.items(), key=lambda x: x[1]["revenue"], reverse=True)[:5]
+    for (_, name), data in best:
+        print(f"  {name} | ₹{data['revenue']:,.2f} | {data['qty']} units | ~{data['unique_customers']} customers")
+
+    print("\n[3/3] Generating report...")
+    generate_sales_report(None, None, results=CubeResults(cube))
+    print("✔ Report saved to output/sales_report.txt\n")
+
+
+# Database mode: the same pipeline with rows stored in SQLite; filters,
+# analytics and the enrichment join run as SQL, and results match the
+# in-memory path
+
+def run_database_mode(args):
+    print("\n==============================")
+    print("  SALES ANALYTICS (SQLITE)")
+    print("==============================\n")
+
+    db = SalesDatabase(args.db)
+    try:
+        print("[1/7] Loading sales data into SQLite...")
+        signature = input_signature(args.input)
+        if db.is_loaded(signature):
+            print(f"✔ {args.db} is up to date with {args.input}\n")
+        else:
+            count = db.load(iter_parse_transactions(iter_inputs(args.input)), signature)
+            print(f"✔ Loaded {count} records into {args.db}\n")
+
+        print("[2/7] Filter Options Available:")
+        min_amount, max_amount = db.amount_range()
+        print("Regions:", ", ".join(sorted(db.regions())))
+        print(f"Amount Range: {int(min_amount or 0)} - {int(max_amount or 0)}\n")
+
+        region, min_amt, max_amt = ask_filters()
+
+        print("\n[3/7] Validating transactions...")
+        view, invalid_count, summary = db.validate_and_filter(region, min_amt, max_amt)
+        print(f"✔ Valid: {len(view)} | Invalid: {invalid_count}\n")
+
+        print("[4/7] Analyzing sales data...")
+        results = view.aggregate()
+        print("✔ Analysis complete\n")
+
+        print("[5/7] Fetching product data from API...")
+        product_mapping = create_product_mapping(fetch_all_products())
+        db.store_products(product_mapping)
+        print(f"✔ Stored {len(product_mapping)} products\n")
+
+        print("[6/7] Enriching sales data...")
+        save_enriched_data(view.iter_enriched(), "data/enriched_sales_data.txt")
+        checked, matched, failed = view.enrichment_stats()
+        results.enrichment_checked = checked
+        results.enriched_count = matched
+        results.failed_products = failed
+        print(f"✔ Enriched {matched} records ({round(matched / checked * 100, 2) if checked else 0}%)\n")
+
+        print("[7/7] Generating report...")
+        generate_sales_report(None, None, results=results)
+        print("✔ Report saved to output/sales_report.txt\n")
+    finally:
+        db.close()
+
+
+# Server mode: load, enrich and index once, then answer queries until stopped
+
+def run_server_mode(args):
+    print("\n==============================")
+    print("  SALES ANALYTICS (SERVER)")
+    print("==============================\n")
+
+    print("[1/2] Fetching product data from API...")
+    product_mapping = create_product_mapping(fetch_all_products())
+    print(f"✔ Product mapping created ({len(product_mapping)} products)\n")
+
+    print("[2/2] Loading sales data...")
+    serve(args.input, product_mapping, args.host, args.port, args.socket)
+
+
+# Watch mode: follow the file (or directory) as it is written and keep the
+# aggregates and report current
+
+def run_watch_mode(args):
+    print("\n==============================")
+    print("  SALES ANALYTICS (WATCH)")
+    print("==============================\n")
+
+    print(f"Watching {args.input} (report every {args.report_interval:g}s to {args.live_report}, Ctrl+C to stop)\n")
+    watch(args.input, args.live_report, args.report_interval, args.window_days)
+
+
+def create_metrics(args):
+    return PipelineMetrics(
+        trace_memory=bool(args.metrics_json or args.metrics_prom),
+        profile_stages=args.profile.split(",") if args.profile else (),
+        profile_dir=args.profile_dir
+    )
+
+
+def export_metrics(args, metrics):
+    metrics.stop()
+
+    if args.metrics_json or args.metrics_prom:
+        print("\nStage metrics:")
+        for line in metrics.summary_lines():
+            print(" ", line)
+
+    if args.metrics_json:
+        metrics.save_json(args.metrics_json)
+        print(f"Metrics saved to {args.metrics_json}")
+    if args.metrics_prom:
+        metrics.save_prometheus(args.metrics_prom)
+        print(f"Prometheus metrics saved to {args.metrics_prom}")
 
 
 def main():
+    args = parse_args()
+    metrics = create_metrics(args)
+
+    if args.stream or args.incremental or args.serve or args.cube or args.watch or args.db:
+        try:
+            if args.serve:
+                run_server_mode(args)
+            elif args.db:
+                with metrics.stage("sqlite"):
+                    run_database_mode(args)
+            elif args.watch:
+                run_watch_mode(args)
+            elif args.cube:
+                with metrics.stage("cube"):
+                    run_cube_mode(args)
+            elif args.incremental:
+                with metrics.stage("incremental"):
+                    run_incremental_mode(args)
+            else:
+                with metrics.stage("stream"):
+                    run_streaming(args)
+        except Exception as e:
+            print("\n❌ ERROR OCCURRED")
+            print("Reason:", str(e))
+            print("Pipeline terminated.")
+        finally:
+            export_metrics(args, metrics)
+        return
+
+    result_cache = None
+    if args.result_cache:
+        result_cache = ResultCache(args.result_cache, max_disk_bytes=args.result_cache_mb * 1024 * 1024)
+        use_result_cache(result_cache)
+
     try:
         print("\n==============================")
         print("      SALES ANALYTICS SYSTEM")
@@ -21,79 +443,121 @@ def main():
 
         # 1. Read sales data
         print("[1/10] Reading sales data...")
-        lines = read_sales_data("data/sales_data.txt")
-        print(f"✔ Successfully read {len(lines)} records\n")
+        columns = None
+        if args.parse_cache:
+            # the cached columns and validation mask go straight to the
+            # columnar analytics; rows are built for enrichment only
+            with metrics.stage("read") as stage:
+                columns, valid_mask, cache_hit = read_parsed_columns(args.input)
+                stage["rows_out"] = len(columns)
+            source = "binary cache" if cache_hit else "text (cache refreshed)"
+            print(f"✔ Loaded {len(columns)} parsed records from {source}\n")
+
+            print("[2/10] Parsing and cleaning data...")
+            transactions = columns
+        elif args.fast_parse:
+            stats = {}
+            with metrics.stage("read") as stage:
+                transactions = read_transactions_mmap(args.input, stats)
+                stage["rows_in"] = stats.get("lines", 0)
+                stage["rows_out"] = len(transactions)
+            print(f"✔ Read {stats.get('lines', 0)} records ({stats.get('encoding')}, "
+                  f"{stats.get('rows_per_sec', 0):,.0f} rows/sec)\n")
 
-        # 2. Parse & clean data
-        print("[2/10] Parsing and cleaning data...")
-        transactions = parse_transactions(lines)
+            print("[2/10] Parsing and cleaning data...")
+        else:
+            lines = metrics.call("read", read_inputs, args.input)
+            print(f"✔ Successfully read {len(lines)} records\n")
+
+            # 2. Parse & clean data
+            print("[2/10] Parsing and cleaning data...")
+            transactions = metrics.call("parse", parse_transactions, lines)
         print(f"✔ Parsed {len(transactions)} records\n")
 
-        # 3. Show filter options
-        regions = sorted(set(t["Region"] for t in transactions))
-        amounts = [t["Quantity"] * t["UnitPrice"] for t in transactions]
+        # 3. Show filter options (the index is reused by the filter step)
+        if columns is not None:
+            regions = columns.values["Region"]
+            min_amount, max_amount = columns.amount.min(), columns.amount.max()
+        else:
+            with metrics.stage("index", len(transactions)):
+                index = TransactionIndex(transactions)
+            regions, min_amount, max_amount = index.regions, index.min_amount, index.max_amount
 
         print("[3/10] Filter Options Available:")
-        print("Regions:", ", ".join(regions))
-        print(f"Amount Range: {int(min(amounts))} - {int(max(amounts))}\n")
+        print("Regions:", ", ".join(sorted(regions)))
+        print(f"Amount Range: {int(min_amount)} - {int(max_amount)}\n")
 
         # 4. Ask user for filters
-        choice = input("Do you want to filter data? (y/n): ").strip().lower()
-
-        region = None
-        min_amt = None
-        max_amt = None
-
-        if choice == "y":
-            region = input("Enter region (or press Enter to skip): ").strip()
-            region = region if region else None
-
-            min_amt = input("Enter minimum amount (or press Enter to skip): ").strip()
-            min_amt = float(min_amt) if min_amt else None
-
-            max_amt = input("Enter maximum amount (or press Enter to skip): ").strip()
-            max_amt = float(max_amt) if max_amt else None
+        region, min_amt, max_amt = ask_filters()
 
         # 5. Validate transactions
         print("\n[4/10] Validating transactions...")
-        valid_tx, invalid_count, summary = validate_and_filter(
-            transactions, region, min_amt, max_amt
-        )
+        with metrics.stage("validate", len(transactions)) as stage:
+            dedup = DuplicateFilter() if args.dedup else None
+            try:
+                if columns is not None:
+                    valid_tx, invalid_count, summary = select_valid(
+                        columns, valid_mask, region, min_amt, max_amt, dedup=dedup
+                    )
+                else:
+                    valid_tx, invalid_count, summary = validate_and_filter(
+                        transactions, region, min_amt, max_amt, index=index, dedup=dedup
+                    )
+            finally:
+                if dedup is not None:
+                    dedup.close()
+            stage["rows_out"] = len(valid_tx)
+
+        print(f"✔ Valid: {len(valid_tx)} | Invalid: {invalid_count}{_duplicates_note(summary)}\n")
 
-        print(f"✔ Valid: {len(valid_tx)} | Invalid: {invalid_count}\n")
+        if result_cache is not None and columns is None:
+            # the same input and filter choices give the same rows
+            result_cache.bind(valid_tx, input_signature(args.input), region, min_amt, max_amt, args.dedup)
 
         # 6. Perform analytics (Part 2)
         print("[5/10] Analyzing sales data...")
 
-        total_revenue = calculate_total_revenue(valid_tx)
-        region_stats = region_wise_sales(valid_tx)
-        top_products = top_selling_products(valid_tx)
-        customers = customer_analysis(valid_tx)
-        daily_trend = daily_sales_trend(valid_tx)
-        peak_day = find_peak_sales_day(valid_tx)
-        low_products = low_performing_products(valid_tx)
+        with metrics.stage("analytics", len(valid_tx)):
+            if columns is not None:
+                results = ColumnarResults(valid_tx)
+                analytics = [getattr(columnar, func.__name__) for func in ANALYTICS]
+                source = valid_tx
+            else:
+                results = metrics.call("aggregate", aggregate, valid_tx)
+                analytics = ANALYTICS
+                source = results
+            rows = results.transaction_count
+
+            for func in analytics:
+                metrics.call(func.__name__, func, source, rows_in=rows)
 
         print("✔ Analysis complete\n")
+        if result_cache is not None:
+            print(f"Result cache: {result_cache.summary()}\n")
 
         # 7. Fetch API data
         print("[6/10] Fetching product data from API...")
-        api_products = fetch_all_products()
+        api_products = metrics.call("fetch_all_products", fetch_all_products)
         print(f"✔ Fetched {len(api_products)} products\n")
 
         # 8. Create product mapping
         print("[7/10] Creating product mapping...")
-        product_mapping = create_product_mapping(api_products)
+        product_mapping = metrics.call("create_product_mapping", create_product_mapping, api_products)
         print("✔ Product mapping created\n")
 
         # 9. Enrich transactions
         print("[8/10] Enriching sales data...")
-        enriched_transactions = enrich_sales_data(valid_tx, product_mapping)
+        if columns is not None:
+            valid_tx = metrics.call("to_transactions", valid_tx.to_transactions)
+        enriched_transactions = metrics.call("enrich_sales_data", enrich_sales_data, valid_tx, product_mapping,
+                                             columns_file=args.enriched_columns)
         matched = sum(1 for t in enriched_transactions if t["API_Match"])
         print(f"✔ Enriched {matched} records ({round(matched/len(enriched_transactions)*100,2)}%)\n")
 
         # 10. Generate report
         print("[9/10] Generating report...")
-        generate_sales_report(valid_tx, enriched_transactions)
+        with metrics.stage("generate_sales_report", len(valid_tx)):
+            generate_sales_report(valid_tx, enriched_transactions, results=results)
         print("✔ Report saved to output/sales_report.txt\n")
 
         print("[10/10] Process Complete!")
@@ -106,6 +570,9 @@ def main():
         print("Reason:", str(e))
         print("Pipeline terminated.")
 
+    finally:
+        export_metrics(args, metrics)
+
 
 if __name__ == "__main__":
     main()
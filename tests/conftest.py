@@ -0,0 +1,34 @@
+import pytest
+
+from benchmarks.generate_data import generate_sales_data
+from helpers import analytics, valid_rows
+
+
+# A synthetic export in the sample file's format, dirty rows included
+# (whole-rupee prices, comma-formatted numbers, bad IDs, wrong field counts)
+
+@pytest.fixture(scope="session")
+def sales_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("data") / "sales.txt"
+    generate_sales_data(str(path), 3000, seed=11, products=60)
+    return str(path)
+
+
+# 200k rows, for the paths whose agreement with the list functions depends on
+# volume (spilled partitions, SQLite batches, partial sums)
+
+@pytest.fixture(scope="session")
+def large_sales_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("data") / "sales_200k.txt"
+    generate_sales_data(str(path), 200000, seed=3)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def large_rows(large_sales_file):
+    return valid_rows(large_sales_file)[0]
+
+
+@pytest.fixture(scope="session")
+def large_baseline(large_rows):
+    return analytics(large_rows)
@@ -0,0 +1,56 @@
+from utils.data_processor import (calculate_total_revenue, region_wise_sales, top_selling_products,
+                                  customer_analysis, top_customers, daily_sales_trend, find_peak_sales_day,
+                                  low_performing_products)
+from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+
+
+# Aggregator states with set-backed fields as sorted lists: sets have no order
+# of their own, and a set rebuilt from a saved list or a pickle can iterate
+# differently from one built row by row.
+
+def comparable(state):
+    for data in state["customers"].values():
+        data["products"] = sorted(data["products"])
+    for data in state["daily"].values():
+        if isinstance(data["customers"], list):
+            data["customers"] = sorted(data["customers"])
+    state["failed_products"] = sorted(state["failed_products"])
+    return state
+
+
+def sorted_products(analysis):
+    for data in analysis.values():
+        data["products_bought"] = sorted(data["products_bought"])
+    return analysis
+
+
+def comparable_customers(results):
+    return list(sorted_products(results.customer_analysis()).items())
+
+
+# Every data_processor analytic on `source`: the valid rows (the baseline
+# path) or a results object those functions dispatch to. Rankings are asked
+# for in full so ties and order are compared too.
+
+ALL = 10 ** 9
+
+
+def analytics(source):
+    return {
+        "total_revenue": calculate_total_revenue(source),
+        "regions": region_wise_sales(source),
+        "top_products": top_selling_products(source, ALL),
+        "customers": sorted_products(customer_analysis(source)),
+        "top_customers": top_customers(source, ALL),
+        "daily": daily_sales_trend(source),
+        "peak_day": find_peak_sales_day(source),
+        "low_products": low_performing_products(source)
+    }
+
+
+# Region / amount filters: none, region only, amount range only, both
+FILTERS = [(None, None, None), ("South", None, None), (None, 3000, 60000), ("North", 10000, None)]
+
+
+def valid_rows(path, region=None, min_amount=None, max_amount=None):
+    return validate_and_filter(parse_transactions(read_sales_data(path)), region, min_amount, max_amount)
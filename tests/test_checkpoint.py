@@ -0,0 +1,59 @@
+from helpers import comparable
+from utils.api_handler import iter_enriched
+from utils.checkpoint import run_incremental
+from utils.data_processor import SalesAggregator
+from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region\n"
+ROWS = [
+    "T001|2024-12-01|P101|Laptop|2|45000|C001|North",
+    "T002|2024-12-02|P102|Mouse|5|500|C002|South",
+    "T003|2024-12-03|P103|Keyboard|3|1500|C003|East",
+    "T004|2024-12-04|P104|Monitor|1|12000|C001|West",
+]
+
+
+def serial_results(path):
+    valid, _, _ = validate_and_filter(parse_transactions(read_sales_data(str(path))))
+    return SalesAggregator().update(iter_enriched(valid, {}))
+
+
+def test_unterminated_last_line_then_append(tmp_path):
+    data = tmp_path / "sales.txt"
+    checkpoint = str(tmp_path / "checkpoint.json")
+    enriched = tmp_path / "enriched.txt"
+
+    # last record has no trailing newline
+    data.write_text(HEADER + "\n".join(ROWS[:3]), encoding="utf-8")
+    results, stats = run_incremental(str(data), checkpoint, {}, str(enriched))
+    assert stats["new_valid"] == 3
+    assert comparable(results.to_state()) == comparable(serial_results(data).to_state())
+
+    # the append completes the partial line and adds another
+    with open(data, "a", encoding="utf-8") as file:
+        file.write("\n" + ROWS[3] + "\n")
+    results, stats = run_incremental(str(data), checkpoint, {}, str(enriched))
+    assert stats["rebuild_reason"] is None
+    assert stats["new_valid"] == 2
+    assert comparable(results.to_state()) == comparable(serial_results(data).to_state())
+
+    lines = enriched.read_text(encoding="utf-8").splitlines()
+    assert [line.split("|")[0] for line in lines[1:]] == ["T001", "T002", "T003", "T004"]
+
+
+def test_partial_line_grows_in_place(tmp_path):
+    data = tmp_path / "sales.txt"
+    checkpoint = str(tmp_path / "checkpoint.json")
+    enriched = str(tmp_path / "enriched.txt")
+
+    # a writer caught mid-line: the first run sees half of T002
+    data.write_text(HEADER + ROWS[0] + "\n" + ROWS[1][:20], encoding="utf-8")
+    run_incremental(str(data), checkpoint, {}, enriched)
+
+    with open(data, "a", encoding="utf-8") as file:
+        file.write(ROWS[1][20:] + "\n")
+    results, stats = run_incremental(str(data), checkpoint, {}, enriched)
+    assert stats["rebuild_reason"] is None
+    assert results.transaction_count == 2
+    assert comparable(results.to_state()) == comparable(serial_results(data).to_state())
@@ -0,0 +1,62 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from helpers import sorted_products
+from utils import columnar
+from utils import data_processor
+from utils.columnar import TransactionColumns
+from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter, is_valid_transaction
+
+
+ANALYTICS = ["calculate_total_revenue", "region_wise_sales", "top_selling_products", "customer_analysis",
+             "daily_sales_trend", "find_peak_sales_day", "low_performing_products"]
+
+
+def valid_rows(sales_file, region=None, min_amount=None, max_amount=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        valid, _, _ = validate_and_filter(parse_transactions(read_sales_data(sales_file)),
+                                          region, min_amount, max_amount)
+    return valid
+
+
+def assert_same_analytics(columns, rows):
+    for name in ANALYTICS:
+        expected = getattr(data_processor, name)(rows)
+        result = getattr(columnar, name)(columns)
+        if name == "customer_analysis":
+            expected, result = sorted_products(expected), sorted_products(result)
+            assert list(result.items()) == list(expected.items())
+        assert result == expected, name
+
+
+def test_columnar_analytics_match_data_processor(sales_file):
+    rows = valid_rows(sales_file)
+    assert_same_analytics(TransactionColumns.from_transactions(rows), rows)
+
+
+@pytest.mark.parametrize("region, min_amount, max_amount", [("North", None, None), (None, 5000, 50000)])
+def test_selected_columns_match_filtered_rows(sales_file, region, min_amount, max_amount):
+    parsed = parse_transactions(read_sales_data(sales_file))
+    columns = TransactionColumns.from_transactions(parsed)
+
+    mask = [is_valid_transaction(t) for t in parsed]
+    mask = np.array(mask) & columns.filter_mask(region, min_amount, max_amount)
+    selected = columns.select(mask)
+
+    rows = valid_rows(sales_file, region, min_amount, max_amount)
+    assert selected.to_transactions() == rows
+    assert_same_analytics(selected, rows)
+
+
+def test_dict_rows_encode_like_records(sales_file):
+    rows = valid_rows(sales_file)
+    records = TransactionColumns.from_transactions(rows)
+    dicts = TransactionColumns.from_transactions(t.copy() for t in rows)
+
+    assert dicts.values == records.values
+    for field, codes in records.codes.items():
+        assert (dicts.codes[field] == codes).all()
+    assert dicts.to_transactions() == rows
@@ -0,0 +1,85 @@
+import contextlib
+import io
+import shutil
+
+from helpers import ALL, valid_rows
+from utils.cube import build_cube, load_or_build_cube, CubeResults
+from utils.data_processor import (aggregate, SalesAggregator, calculate_total_revenue, region_wise_sales,
+                                  top_selling_products, daily_sales_trend, find_peak_sales_day,
+                                  low_performing_products)
+from utils.report_generator import generate_sales_report
+
+
+def assert_estimated(estimate, exact):
+    # precision 12 HyperLogLog: ~1.6% standard error, near exact when small
+    assert abs(estimate - exact) <= max(1, 0.05 * exact)
+
+
+def test_cube_matches_the_list_functions(sales_file):
+    rows, _, _ = valid_rows(sales_file)
+    cube = build_cube(rows)
+
+    assert cube.calculate_total_revenue() == calculate_total_revenue(rows)
+    assert cube.region_wise_sales() == region_wise_sales(rows)
+    assert cube.top_selling_products(ALL) == top_selling_products(rows, ALL)
+    assert cube.low_performing_products() == low_performing_products(rows)
+    assert cube.find_peak_sales_day() == find_peak_sales_day(rows)
+
+    expected = daily_sales_trend(rows)
+    daily = cube.daily_sales_trend()
+    assert list(daily) == sorted(expected)
+    for date, data in daily.items():
+        assert data["revenue"] == expected[date]["revenue"]
+        assert data["transaction_count"] == expected[date]["transaction_count"]
+        assert_estimated(data["unique_customers"], expected[date]["unique_customers"])
+
+
+def test_drill_down_and_dice_match_filtered_rows(sales_file):
+    rows, _, _ = valid_rows(sales_file)
+    cube = build_cube(rows)
+
+    north = [t for t in rows if t["Region"] == "North"]
+    products = cube.drill_down("ProductName", Region="North")
+    assert sorted((name, data["qty"], data["revenue"]) for (_, name), data in products.items()) == \
+        sorted(top_selling_products(north, ALL))
+
+    south_east = [t for t in rows if t["Region"] in ("South", "East")]
+    dice = cube.rollup(Region=["South", "East"])
+    assert dice["revenue"] == calculate_total_revenue(south_east)
+    assert dice["transaction_count"] == len(south_east)
+    assert_estimated(dice["unique_customers"], len({t["CustomerID"] for t in south_east}))
+    assert cube.slice(Region=["South", "East"]).rollup() == dice
+
+
+def test_saved_cube_is_reused_until_the_data_changes(sales_file, tmp_path):
+    path = str(tmp_path / "sales.txt")
+    shutil.copy(sales_file, path)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        built, loaded = load_or_build_cube(path)
+        assert not loaded
+        reused, loaded = load_or_build_cube(path)
+        assert loaded
+        assert reused.daily_sales_trend() == built.daily_sales_trend()
+
+        with open(path, "a", encoding="utf-8") as file:
+            file.write("T999999|2024-05-01|P101|Laptop|1|45000|C001|North\n")
+        rebuilt, loaded = load_or_build_cube(path)
+        assert not loaded
+        assert rebuilt.calculate_total_revenue() == built.calculate_total_revenue() + 45000
+
+
+def daily_header(results, output):
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_sales_report(None, [], str(output), results)
+    with open(output, encoding="utf-8") as file:
+        lines = file.read().splitlines()
+    return lines[lines.index("DAILY SALES TREND") + 2]
+
+
+def test_report_labels_estimated_customer_counts(sales_file, tmp_path):
+    rows, _, _ = valid_rows(sales_file)
+
+    assert daily_header(CubeResults(build_cube(rows)), tmp_path / "cube.txt").endswith("(approx.)")
+    assert daily_header(SalesAggregator(sketch_precision=12).update(rows), tmp_path / "hll.txt").endswith("(approx.)")
+    assert daily_header(aggregate(rows), tmp_path / "exact.txt").endswith("| Unique Customers")
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from helpers import analytics, valid_rows
+from utils.data_processor import SalesAggregator, aggregate, heavy_hitter_products, heavy_hitter_customers
+from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+
+
+OPTIONS = {"heavy_hitter_capacity": 8, "sketch_precision": 10, "quantile_accuracy": 0.02}
+
+
+def sample_rows():
+    valid, _, _ = validate_and_filter(parse_transactions(read_sales_data("data/sales_data.txt")))
+    return valid
+
+
+def test_sketch_state_round_trips_through_json():
+    results = SalesAggregator(**OPTIONS).update(sample_rows())
+    restored = SalesAggregator.from_state(json.loads(json.dumps(results.to_state())))
+
+    # set-backed fields may come back in another iteration order
+    state, expected = restored.to_state(), results.to_state()
+    for cid, data in expected.pop("customers").items():
+        assert sorted(state["customers"].pop(cid)["products"]) == sorted(data["products"])
+    assert state == dict(expected, customers={})
+    assert restored.daily_sales_trend() == results.daily_sales_trend()
+    assert restored.unique_customers_by_region() == results.unique_customers_by_region()
+    assert restored.order_value_quantiles() == results.order_value_quantiles()
+    assert restored.heavy_hitter_products() == results.heavy_hitter_products()
+
+
+def test_sketch_partials_merge_like_one_pass():
+    rows = sample_rows()
+    half = len(rows) // 2
+    whole = SalesAggregator(**OPTIONS).update(rows)
+    merged = SalesAggregator(**OPTIONS).update(rows[:half])
+    merged.merge(SalesAggregator(**OPTIONS).update(rows[half:]))
+
+    for date, data in whole.daily.items():
+        assert merged.daily[date]["customers"].registers == data["customers"].registers
+    assert merged.unique_customers_by_region() == whole.unique_customers_by_region()
+    assert merged.order_value_quantiles() == whole.order_value_quantiles()
+
+
+def test_merge_refuses_mixed_sketch_options():
+    rows = sample_rows()
+    with pytest.raises(ValueError):
+        SalesAggregator().update(rows).merge(SalesAggregator(sketch_precision=10).update(rows))
+
+
+def test_merge_copies_sketches_it_takes_over():
+    rows = sample_rows()
+    merged = SalesAggregator(**OPTIONS)
+    other = SalesAggregator(**OPTIONS).update(rows)
+    merged.merge(other)
+    before = merged.to_state()
+
+    other.update(rows)
+    assert merged.to_state() == before
+    for region, sketch in other.region_customers.items():
+        assert merged.region_customers[region] is not sketch
+
+
+def test_heavy_hitters_honour_the_aggregator_capacity():
+    rows = sample_rows()
+    results = SalesAggregator(**OPTIONS).update(rows)
+
+    assert heavy_hitter_products(results) == heavy_hitter_products(rows, capacity=8)
+    assert heavy_hitter_customers(results, 3, 8) == heavy_hitter_customers(rows, 3, capacity=8)
+    with pytest.raises(ValueError):
+        heavy_hitter_products(results, capacity=100)
+    with pytest.raises(ValueError):
+        heavy_hitter_customers(SalesAggregator().update(rows))
+
+
+def test_aggregate_matches_the_list_functions(sales_file):
+    rows, _, _ = valid_rows(sales_file)
+    assert analytics(aggregate(rows)) == analytics(rows)
+
+
+def test_aggregate_matches_at_volume(large_rows, large_baseline):
+    assert analytics(aggregate(large_rows)) == large_baseline
@@ -0,0 +1,66 @@
+import pytest
+
+from helpers import FILTERS
+from utils.dedup import DuplicateFilter
+from utils.file_handler import (read_sales_data, parse_transactions, is_valid_transaction, passes_filters,
+                                validate_and_filter, iter_validate_and_filter)
+
+
+def first_seen(transactions):
+    seen = set()
+    kept = []
+    for t in transactions:
+        if t["TransactionID"] not in seen:
+            seen.add(t["TransactionID"])
+            kept.append(t)
+    return kept
+
+
+# the export with a share of its rows re-sent later on, some twice
+@pytest.fixture
+def resent(sales_file):
+    transactions = parse_transactions(read_sales_data(sales_file))
+    return transactions + transactions[::7] + transactions[100:400] + transactions[::7]
+
+
+def small_filter(**options):
+    # small batches and spills, so duplicates are found in the Bloom filter,
+    # the pending set and the spilled runs alike
+    return DuplicateFilter(batch_rows=256, spill_rows=500, **options)
+
+
+def test_unique_keeps_first_occurrences(resent):
+    dedup = small_filter()
+    try:
+        assert dedup.unique(resent) == first_seen(resent)
+        assert dedup.duplicates == len(resent) - len(first_seen(resent))
+    finally:
+        dedup.close()
+
+
+def test_saturated_bloom_filter_stays_exact(resent):
+    dedup = small_filter(capacity=64, error_rate=0.2)
+    try:
+        assert list(dedup.iter_unique(resent)) == first_seen(resent)
+    finally:
+        dedup.close()
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_dedup_filtering_matches_the_baseline(resent, filters):
+    valid = [t for t in resent if is_valid_transaction(t)]
+    expected = [t for t in first_seen(valid) if passes_filters(t, *filters)]
+
+    dedup = small_filter()
+    rows, invalid, summary = validate_and_filter(resent, *filters, dedup=dedup)
+    dedup.close()
+
+    dedup = small_filter()
+    streamed_summary = {}
+    streamed = list(iter_validate_and_filter(iter(resent), *filters, summary=streamed_summary, dedup=dedup))
+    dedup.close()
+
+    assert rows == expected == streamed
+    assert invalid == len(resent) - len(valid)
+    assert summary["duplicates"] == len(valid) - len(first_seen(valid))
+    assert streamed_summary == summary
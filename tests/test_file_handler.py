@@ -0,0 +1,52 @@
+import bz2
+import gzip
+
+import pytest
+
+from helpers import FILTERS, analytics, valid_rows
+from utils.data_processor import SalesAggregator
+from utils.file_handler import (read_sales_data, parse_transactions, read_transactions_mmap, iter_sales_data,
+                                iter_parse_transactions, iter_validate_and_filter)
+from utils.ingest import read_inputs, iter_inputs
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_streaming_rows_and_summary_match_eager(sales_file, filters):
+    rows, _, summary = valid_rows(sales_file, *filters)
+
+    streamed_summary = {}
+    streamed = list(iter_validate_and_filter(iter_parse_transactions(iter_sales_data(sales_file)), *filters,
+                                             summary=streamed_summary))
+
+    assert streamed == rows
+    assert streamed_summary == summary
+
+
+def test_streaming_aggregate_matches_the_list_functions(sales_file):
+    rows, _, _ = valid_rows(sales_file)
+    results = SalesAggregator().update(
+        iter_validate_and_filter(iter_parse_transactions(iter_sales_data(sales_file))))
+
+    assert analytics(results) == analytics(rows)
+
+
+def test_mmap_parser_matches_parse_transactions(sales_file):
+    assert read_transactions_mmap(sales_file) == parse_transactions(read_sales_data(sales_file))
+
+
+def test_split_and_compressed_exports_read_as_one_file(sales_file, tmp_path):
+    with open(sales_file, encoding="utf-8") as file:
+        header, *lines = file.readlines()
+    third = len(lines) // 3
+
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    (exports / "day1.txt").write_text(header + "".join(lines[:third]), encoding="utf-8")
+    with gzip.open(exports / "day2.txt.gz", "wt", encoding="utf-8") as file:
+        file.write(header + "".join(lines[third:2 * third]))
+    with bz2.open(exports / "day3.txt.bz2", "wt", encoding="utf-8") as file:
+        file.write(header + "".join(lines[2 * third:]))
+
+    expected = read_sales_data(sales_file)
+    assert read_inputs(str(exports)) == expected
+    assert list(iter_inputs(str(exports / "day*"))) == expected
@@ -0,0 +1,22 @@
+import pytest
+
+from helpers import FILTERS
+from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+from utils.index import TransactionIndex
+
+
+@pytest.mark.parametrize("filters", FILTERS + [("Nowhere", None, None), (None, 10 ** 9, None), (None, 20000, 20000)])
+def test_index_answers_like_a_scan(sales_file, filters):
+    transactions = parse_transactions(read_sales_data(sales_file))
+    index = TransactionIndex(transactions)
+
+    assert validate_and_filter(transactions, *filters, index=index) == validate_and_filter(transactions, *filters)
+
+
+def test_index_reports_the_scan_options(sales_file):
+    transactions = parse_transactions(read_sales_data(sales_file))
+    index = TransactionIndex(transactions)
+    amounts = [t["Quantity"] * t["UnitPrice"] for t in transactions]
+
+    assert sorted(index.regions) == sorted({t["Region"] for t in transactions})
+    assert (index.min_amount, index.max_amount) == (min(amounts), max(amounts))
@@ -0,0 +1,90 @@
+import random
+import subprocess
+import sys
+
+from helpers import comparable, comparable_customers
+from utils.data_processor import SalesAggregator
+from utils.file_handler import detect_encoding, iter_sales_data, iter_parse_transactions, iter_validate_and_filter
+from utils.parallel import parallel_aggregate, aggregate_files, split_file, _process_shard, _merge_partials, _new_summary
+
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region\n"
+
+
+def write_sales(path, rows, seed):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(HEADER)
+        for i in range(rows):
+            product = rng.randint(1, 40)
+            file.write(f"T{seed}-{i}|2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}|P{product}|"
+                       f"Prod{product}|{rng.randint(1, 9)}|{rng.uniform(1, 2000):.2f}|C{rng.randint(1, 300)}|"
+                       f"{rng.choice(['North', 'South', 'East', 'West'])}\n")
+
+
+def serial_results(paths):
+    results = SalesAggregator()
+    for path in paths:
+        results.update(iter_validate_and_filter(iter_parse_transactions(iter_sales_data(str(path)))))
+    return results
+
+
+def assert_same(parallel, serial):
+    # to_state covers every sum, count and set, in key (first-seen) order
+    assert comparable(parallel.to_state()) == comparable(serial.to_state())
+    assert comparable_customers(parallel) == comparable_customers(serial)
+    assert parallel.region_wise_sales() == serial.region_wise_sales()
+    assert parallel.top_selling_products(10) == serial.top_selling_products(10)
+    assert parallel.low_performing_products(50) == serial.low_performing_products(50)
+
+
+def test_parallel_shards_match_serial(tmp_path):
+    path = tmp_path / "sales.txt"
+    write_sales(path, 5000, seed=1)
+
+    for workers in (2, 3, 4):
+        results, summary = parallel_aggregate(str(path), workers)
+        assert summary["final_count"] == 5000
+        assert_same(results, serial_results([path]))
+
+
+def test_shard_partials_merge_without_rows(tmp_path, monkeypatch):
+    path = tmp_path / "sales.txt"
+    write_sales(path, 5000, seed=3)
+    encoding = detect_encoding(str(path))
+
+    partials = [_process_shard((str(path), start, end, encoding, None, None, None, {}))
+                for start, end in split_file(str(path), 4)]
+    assert len(partials) == 4
+
+    # the parent only merges the shards' aggregates; it never sees a row
+    def no_rows(self, t):
+        raise AssertionError("rows replayed in the parent")
+    monkeypatch.setattr(SalesAggregator, "add", no_rows)
+
+    summary = _new_summary(None, None, None)
+    results = _merge_partials(iter(partials), summary, {})
+    monkeypatch.undo()
+
+    assert summary["final_count"] == 5000
+    assert_same(results, serial_results([path]))
+
+
+def test_parallel_files_match_serial(tmp_path):
+    paths = [tmp_path / f"sales_{i}.txt" for i in range(3)]
+    for i, path in enumerate(paths):
+        write_sales(path, 1500, seed=i)
+
+    results, _ = aggregate_files([str(path) for path in paths], 3)
+    assert_same(results, serial_results(paths))
+
+
+def test_workers_output_matches_serial(tmp_path):
+    path = tmp_path / "sales.txt"
+    write_sales(path, 5000, seed=7)
+
+    def run(*extra):
+        return subprocess.run([sys.executable, "main.py", "--stream", "--input", str(path), *extra],
+                              input="n\n", capture_output=True, text=True, check=True).stdout
+
+    assert run("--workers", "3") == run()
@@ -0,0 +1,71 @@
+import contextlib
+import io
+import shutil
+
+import pytest
+
+from benchmarks.generate_data import synthetic_product_mapping
+from utils.api_handler import iter_enriched
+from utils.columnar import select_valid, ColumnarResults
+from utils.data_processor import aggregate
+from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+from utils.parse_cache import read_parsed_columns
+from utils.report_generator import generate_sales_report
+
+
+def quietly(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+@pytest.fixture
+def source(sales_file, tmp_path):
+    path = tmp_path / "sales.txt"
+    shutil.copy(sales_file, path)
+    return str(path)
+
+
+def test_warm_load_hits_and_goes_stale(source, tmp_path):
+    cache_dir = str(tmp_path / "parsed")
+
+    cold, cold_valid, hit = read_parsed_columns(source, cache_dir)
+    assert not hit
+    warm, warm_valid, hit = read_parsed_columns(source, cache_dir)
+    assert hit
+    assert warm.to_transactions() == cold.to_transactions()
+    assert (warm_valid == cold_valid).all()
+
+    with open(source, "a", encoding="utf-8") as file:
+        file.write("T999999|2024-05-01|P101|Laptop|1|45000|C001|North\n")
+    _, _, hit = read_parsed_columns(source, cache_dir)
+    assert not hit
+
+
+@pytest.mark.parametrize("filters", [(None, None, None), ("South", None, None), (None, 3000, 60000)])
+def test_cached_mask_selects_the_validated_rows(source, tmp_path, filters):
+    cache_dir = str(tmp_path / "parsed")
+    read_parsed_columns(source, cache_dir)
+    columns, valid, _ = read_parsed_columns(source, cache_dir)
+
+    selected, invalid, summary = quietly(select_valid, columns, valid, *filters)
+    rows, expected_invalid, expected_summary = quietly(
+        validate_and_filter, parse_transactions(read_sales_data(source)), *filters)
+
+    assert selected.to_transactions() == rows
+    assert invalid == expected_invalid
+    assert summary == expected_summary
+
+
+def test_columnar_report_matches_aggregate_report(source, tmp_path):
+    columns, valid, _ = read_parsed_columns(source, str(tmp_path / "parsed"))
+    selected, _, _ = quietly(select_valid, columns, valid)
+    rows = selected.to_transactions()
+    enriched = list(iter_enriched(rows, synthetic_product_mapping(60)))
+
+    def report(results, name):
+        output = str(tmp_path / name)
+        quietly(generate_sales_report, None, enriched, output, results)
+        with open(output, encoding="utf-8") as file:
+            return [line for line in file if not line.startswith("Generated On")]
+
+    assert report(ColumnarResults(selected), "columnar.txt") == report(aggregate(rows), "rows.txt")
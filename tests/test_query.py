@@ -0,0 +1,33 @@
+import pytest
+
+from helpers import FILTERS, analytics, valid_rows
+from utils.data_processor import top_selling_products, top_customers
+from utils.query import SalesQuery
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_pushdown_selects_the_validated_rows(sales_file, filters):
+    rows, _, _ = valid_rows(sales_file, *filters)
+    query = SalesQuery(sales_file).filter(*filters)
+
+    assert query.collect() == rows
+    assert query.stats["matched"] == len(rows)
+    if filters != (None, None, None):
+        assert query.stats["pushed_down"] > 0
+
+
+def test_chained_filters_combine_with_and(sales_file):
+    rows, _, _ = valid_rows(sales_file, "North", 5000, 40000)
+    query = SalesQuery(sales_file).filter(region="North", min_amount=2000).filter(min_amount=5000, max_amount=90000)
+
+    assert query.filter(max_amount=40000).collect() == rows
+    assert SalesQuery(sales_file).filter(region="North").filter(region="South").collect() == []
+
+
+def test_query_aggregate_matches_the_list_functions(sales_file):
+    rows, _, _ = valid_rows(sales_file, "East")
+    query = SalesQuery(sales_file).filter(region="East")
+
+    assert analytics(query.aggregate()) == analytics(rows)
+    assert query.top_products(3) == top_selling_products(rows, 3)
+    assert query.top_customers(3) == top_customers(rows, 3)
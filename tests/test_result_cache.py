@@ -0,0 +1,74 @@
+import os
+
+from benchmarks.generate_data import generate_sales_data
+from utils.data_processor import calculate_total_revenue, top_selling_products
+from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+from utils.result_cache import ResultCache, use_result_cache
+
+
+def valid_rows(tmp_path, rows):
+    path = tmp_path / "sales.txt"
+    generate_sales_data(str(path), rows, seed=5, dirty_rate=0)
+    valid, _, _ = validate_and_filter(parse_transactions(read_sales_data(str(path))))
+    return valid
+
+
+def revenue(rows):
+    return sum(t["Quantity"] * t["UnitPrice"] for t in rows)
+
+
+def test_unbound_lists_are_not_memoized(tmp_path):
+    rows = valid_rows(tmp_path, 6400)
+    changed = [t.copy() for t in rows]
+    changed[1]["Quantity"] += 1
+
+    cache = ResultCache()
+    previous = use_result_cache(cache)
+    try:
+        assert calculate_total_revenue(rows) == revenue(rows)
+        assert calculate_total_revenue(changed) == revenue(changed)
+    finally:
+        use_result_cache(previous)
+
+    assert cache.stats["unbound"] == 2
+    assert cache.stats["misses"] == 0
+
+
+def test_bound_list_hits_memory_then_disk(tmp_path):
+    rows = valid_rows(tmp_path, 2000)
+    directory = str(tmp_path / "results")
+
+    cache = ResultCache(directory)
+    cache.bind(rows, "sales.txt", None)
+    previous = use_result_cache(cache)
+    try:
+        first = top_selling_products(rows)
+        assert top_selling_products(rows, 5) == first
+        assert cache.stats["misses"] == 1 and cache.stats["memory_hits"] == 1
+
+        # a new process: only the disk tier is left
+        cache = ResultCache(directory)
+        cache.bind(rows, "sales.txt", None)
+        use_result_cache(cache)
+        assert top_selling_products(rows) == first
+        assert cache.stats["disk_hits"] == 1
+    finally:
+        use_result_cache(previous)
+
+
+def test_unloadable_entry_is_a_miss(tmp_path):
+    rows = valid_rows(tmp_path, 500)
+    directory = str(tmp_path / "results")
+
+    cache = ResultCache(directory)
+    cache.bind(rows, "sales.txt")
+    cache.call(calculate_total_revenue.__wrapped__, rows)
+    for name in os.listdir(directory):
+        with open(os.path.join(directory, name), "wb") as file:
+            file.write(b"not a pickle")
+
+    cache = ResultCache(directory)
+    cache.bind(rows, "sales.txt")
+    assert cache.call(calculate_total_revenue.__wrapped__, rows) == revenue(rows)
+    assert cache.stats["misses"] == 1
+    assert cache.stats["disk_hits"] == 0
@@ -0,0 +1,123 @@
+import json
+import shutil
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from benchmarks.generate_data import synthetic_product_mapping
+from helpers import ALL, FILTERS, valid_rows
+from utils import data_processor
+from utils.api_handler import iter_enriched
+from utils.file_handler import read_sales_data, parse_transactions
+from utils.server import SalesDataStore, create_server
+
+
+ENDPOINTS = {
+    "total_revenue": data_processor.calculate_total_revenue,
+    "region_sales": data_processor.region_wise_sales,
+    "top_products": lambda rows: data_processor.top_selling_products(rows, ALL),
+    "top_customers": lambda rows: data_processor.top_customers(rows, ALL),
+    "customers": data_processor.customer_analysis,
+    "daily_trend": data_processor.daily_sales_trend,
+    "peak_day": data_processor.find_peak_sales_day,
+    "low_products": data_processor.low_performing_products
+}
+
+
+def as_json(value):
+    value = json.loads(json.dumps(value))
+    if isinstance(value, dict):
+        for data in value.values():
+            if isinstance(data, dict) and "products_bought" in data:
+                data["products_bought"] = sorted(data["products_bought"])
+    return value
+
+
+def params(filters, **extra):
+    names = ("region", "min_amount", "max_amount")
+    return dict({name: value for name, value in zip(names, filters) if value is not None}, **extra)
+
+
+def query_string(filters):
+    return "&".join(f"{name}={value}" for name, value in params(filters).items())
+
+
+@pytest.fixture(scope="module")
+def mapping():
+    return synthetic_product_mapping(60)
+
+
+@pytest.fixture
+def store(sales_file, mapping):
+    return SalesDataStore(sales_file, mapping)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_analytics_match_the_list_functions(store, sales_file, mapping, filters):
+    rows, _, _ = valid_rows(sales_file, *filters)
+
+    for name, func in ENDPOINTS.items():
+        body = store.handle(f"/analytics/{name}", params(filters, n=ALL))
+        assert as_json(json.loads(body)) == as_json(func(rows)), name
+
+    enriched = list(iter_enriched(rows, mapping))
+    matched = sum(1 for t in enriched if t["API_Match"])
+    assert json.loads(store.handle("/analytics/enrichment", params(filters))) == {
+        "enriched_count": matched,
+        "checked": len(enriched),
+        "success_rate": round(matched / len(enriched) * 100, 2) if enriched else 0,
+        "failed_products": sorted({t["ProductName"] for t in enriched if not t["API_Match"]})
+    }
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_filter_matches_validate_and_filter(store, sales_file, mapping, filters):
+    rows, _, summary = valid_rows(sales_file, *filters)
+    response = json.loads(store.handle("/filter", params(filters, limit=ALL)))
+
+    assert response["summary"] == as_json(summary)
+    assert response["transactions"] == as_json([dict(t) for t in iter_enriched(rows, mapping)])
+
+
+def test_options_match_the_parsed_file(store, sales_file):
+    transactions = parse_transactions(read_sales_data(sales_file))
+    amounts = [t["Quantity"] * t["UnitPrice"] for t in transactions]
+
+    assert json.loads(store.handle("/options", {})) == {
+        "regions": sorted({t["Region"] for t in transactions}),
+        "min_amount": min(amounts),
+        "max_amount": max(amounts)
+    }
+
+
+def test_http_responses_and_reload(sales_file, mapping, tmp_path):
+    path = str(tmp_path / "sales.txt")
+    shutil.copy(sales_file, path)
+    server = create_server(SalesDataStore(path, mapping), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def get(url):
+        try:
+            with urllib.request.urlopen(base + url) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    try:
+        rows, _, _ = valid_rows(path, *FILTERS[2])
+        assert get("/analytics/total_revenue?" + query_string(FILTERS[2])) == \
+            (200, data_processor.calculate_total_revenue(rows))
+        assert get("/analytics/top_products?n=x")[0] == 400
+        assert get("/analytics/nothing")[0] == 404
+        assert get("/health")[1]["rows"] == len(parse_transactions(read_sales_data(path)))
+
+        with open(path, "a", encoding="utf-8") as file:
+            file.write("T999999|2024-05-01|P101|Laptop|1|45000|C001|North\n")
+        assert get("/analytics/total_revenue")[1] == data_processor.calculate_total_revenue(valid_rows(path)[0])
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,23 @@
+import pytest
+
+from helpers import analytics, valid_rows
+from utils.data_processor import SalesAggregator
+
+
+def spilled_analytics(rows, memory_budget):
+    results = SalesAggregator(memory_budget=memory_budget).update(rows)
+    try:
+        assert results.groups.spilling and results.groups.spilled_rows > 0
+        return analytics(results)
+    finally:
+        results.close()
+
+
+@pytest.mark.parametrize("memory_budget", [64 * 1024, 4 * 1024])
+def test_spilled_group_bys_match_the_list_functions(sales_file, memory_budget):
+    rows, _, _ = valid_rows(sales_file)
+    assert spilled_analytics(rows, memory_budget) == analytics(rows)
+
+
+def test_matches_at_volume(large_rows, large_baseline):
+    assert spilled_analytics(large_rows, 2 * 1024 * 1024) == large_baseline
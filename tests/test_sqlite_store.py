@@ -0,0 +1,58 @@
+import pytest
+
+from benchmarks.generate_data import synthetic_product_mapping
+from helpers import FILTERS, analytics, valid_rows
+from utils.api_handler import iter_enriched
+from utils.file_handler import iter_sales_data, iter_parse_transactions
+from utils.sqlite_store import SalesDatabase
+
+
+def loaded_db(path, filename):
+    db = SalesDatabase(path)
+    db.load(iter_parse_transactions(iter_sales_data(filename)), "signature")
+    return db
+
+
+@pytest.fixture
+def db(sales_file, tmp_path):
+    db = loaded_db(str(tmp_path / "sales.db"), sales_file)
+    yield db
+    db.close()
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_view_matches_validate_and_filter(db, sales_file, filters):
+    rows, invalid, summary = valid_rows(sales_file, *filters)
+    view, view_invalid, view_summary = db.validate_and_filter(*filters)
+
+    assert list(view.iter_rows()) == rows
+    assert (len(view), view_invalid, view_summary) == (len(rows), invalid, summary)
+    assert analytics(view.aggregate()) == analytics(rows)
+
+
+def test_enrichment_join_matches_iter_enriched(db, sales_file):
+    mapping = synthetic_product_mapping(60)
+    db.store_products(mapping)
+    view, _, _ = db.validate_and_filter("West")
+    rows, _, _ = valid_rows(sales_file, "West")
+    expected = list(iter_enriched(rows, mapping))
+
+    assert list(view.iter_enriched()) == expected
+    checked, matched, failed = view.enrichment_stats()
+    assert checked == len(expected)
+    assert matched == sum(1 for t in expected if t["API_Match"])
+    assert failed == {t["ProductName"] for t in expected if not t["API_Match"]}
+
+
+def test_reload_is_keyed_by_signature(db):
+    assert db.is_loaded("signature")
+    assert not db.is_loaded("other")
+
+
+def test_matches_at_volume(large_sales_file, large_baseline, tmp_path):
+    db = loaded_db(str(tmp_path / "sales.db"), large_sales_file)
+    try:
+        view, _, _ = db.validate_and_filter()
+        assert analytics(view.aggregate()) == large_baseline
+    finally:
+        db.close()
@@ -0,0 +1,71 @@
+from datetime import date as Date
+
+from helpers import analytics, valid_rows
+from utils.file_handler import read_sales_data, iter_parse_transactions
+from utils.watch import LiveAggregates, FileTail, HOUR_BUCKET_SECONDS
+
+
+def amount(t):
+    return t["Quantity"] * t["UnitPrice"]
+
+
+def ordinal(day):
+    try:
+        return Date.fromisoformat(day).toordinal()
+    except ValueError:
+        return None
+
+
+def test_live_aggregates_match_the_list_functions(sales_file):
+    rows, invalid, summary = valid_rows(sales_file)
+    live = LiveAggregates()
+    live.update(iter_parse_transactions(read_sales_data(sales_file)), {})
+
+    assert analytics(live.results) == analytics(rows)
+    assert (live.total_input, live.invalid) == (summary["total_input"], invalid)
+
+
+def test_day_window_sums_the_last_days_of_sales(sales_file):
+    rows, _, _ = valid_rows(sales_file)
+    live = LiveAggregates(window_days=7)
+    live.update(iter_parse_transactions(read_sales_data(sales_file)), {})
+
+    latest = max(filter(None, map(ordinal, (t["Date"] for t in rows))))
+    recent = [t for t in rows if ordinal(t["Date"]) and latest - 7 < ordinal(t["Date"]) <= latest]
+    assert live.windows()["last_days"] == (sum(map(amount, recent)), len(recent))
+
+
+def test_hour_window_follows_arrival_time(sales_file):
+    rows, _, _ = valid_rows(sales_file)
+    rows = rows[:900]
+    start = 1700000000
+    arrivals = [start + i * 10 for i in range(len(rows))]
+
+    live = LiveAggregates()
+    for t, arrived in zip(rows, arrivals):
+        live.add(t, arrived)
+
+    for now in (arrivals[-1], arrivals[-1] + 1800, arrivals[-1] + 7200):
+        minute = now // HOUR_BUCKET_SECONDS
+        recent = [t for t, arrived in zip(rows, arrivals) if minute - 60 < arrived // HOUR_BUCKET_SECONDS <= minute]
+        assert live.windows(now)["last_hour"] == (sum(map(amount, recent)), len(recent))
+
+
+def test_tail_reads_appended_complete_lines(sales_file, tmp_path):
+    with open(sales_file, encoding="utf-8") as file:
+        text = file.read()
+    cut = text.index("\n", len(text) // 2) + 20
+    path = tmp_path / "live.txt"
+    path.write_text(text[:cut], encoding="utf-8")
+
+    tail = FileTail(str(path))
+    lines = list(tail.read_new())
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(text[cut:])
+    assert not tail.changed()
+    lines += tail.read_new()
+
+    assert lines == read_sales_data(sales_file)
+
+    path.write_text(text[:cut // 2], encoding="utf-8")
+    assert tail.changed()
@@ -1,31 +1,162 @@
 # pip install requests
 
+from concurrent.futures import ThreadPoolExecutor
 
-# Task 3.1 (a) Fetch All Products
+from utils.file_handler import Transaction
+from utils.product_cache import ProductCache
+
+
+PRODUCTS_URL = "https://dummyjson.com/products"
+PAGE_SIZE = 100
+MAX_WORKERS = 8
+REQUEST_TIMEOUT = 10
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+WRITE_BATCH_ROWS = 50000
+WRITE_BUFFER_BYTES = 1 << 20
+
+
+# Pooled HTTP session: keep-alive connections shared by every worker thread,
+# with retries and exponential backoff on connection errors and 429/5xx.
 
-def fetch_all_products():
+def create_session(max_workers=MAX_WORKERS, retries=MAX_RETRIES, backoff=RETRY_BACKOFF):
     import requests
-    
-    url = "https://dummyjson.com/products?limit=100"
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",)
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_product_page(session, url, skip, limit=PAGE_SIZE, timeout=REQUEST_TIMEOUT):
+    response = session.get(url, params={"limit": limit, "skip": skip}, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def iter_remaining_pages(session, url, first, page_size=PAGE_SIZE, max_workers=MAX_WORKERS,
+                         timeout=REQUEST_TIMEOUT):
+    total = first.get("total", len(first["products"]))
+    skips = range(page_size, total, page_size)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pages = pool.map(lambda skip: fetch_product_page(session, url, skip, page_size, timeout), skips)
+        for page in pages:
+            yield page["products"]
+
+
+# Walk every page of the products endpoint. The first page tells us the
+# catalog size; the remaining pages are fetched concurrently (at most
+# `max_workers` in flight) and yielded in page order.
+
+def iter_product_pages(url=PRODUCTS_URL, page_size=PAGE_SIZE, max_workers=MAX_WORKERS,
+                       timeout=REQUEST_TIMEOUT, retries=MAX_RETRIES, backoff=RETRY_BACKOFF):
+    with create_session(max_workers, retries, backoff) as session:
+        first = fetch_product_page(session, url, 0, page_size, timeout)
+        yield first["products"]
+        yield from iter_remaining_pages(session, url, first, page_size, max_workers, timeout)
+
+
+def iter_all_products(url=PRODUCTS_URL, page_size=PAGE_SIZE, max_workers=MAX_WORKERS,
+                      timeout=REQUEST_TIMEOUT, retries=MAX_RETRIES, backoff=RETRY_BACKOFF):
+    for page in iter_product_pages(url, page_size, max_workers, timeout, retries, backoff):
+        yield from page
+
+
+def _catalog_key(url, paginate, page_size):
+    if paginate:
+        return ProductCache.key(url, {"paginate": "all", "page_size": page_size})
+    return ProductCache.key(url)
+
+
+# Task 3.1 (a) Fetch All Products
+#
+# Served from the on-disk ProductCache while the snapshot is within its TTL.
+# Otherwise the first page (or, with paginate=False, the single URL) is
+# requested with the snapshot's If-None-Match / If-Modified-Since: a 304 keeps
+# the snapshot and restarts its TTL, a 200 fetches the remaining pages. The
+# first page carries the catalog total, so products added later still change
+# it. If the API is unreachable the last good snapshot is used.
+
+def fetch_all_products(url=PRODUCTS_URL, cache=None, use_cache=True, timeout=REQUEST_TIMEOUT,
+                       paginate=True, page_size=PAGE_SIZE, max_workers=MAX_WORKERS):
+    if use_cache and cache is None:
+        cache = ProductCache()
+
+    key = _catalog_key(url, paginate, page_size) if use_cache else None
+    entry = cache.get(key) if use_cache else None
+
+    if entry is not None and cache.is_fresh(entry):
+        print("Using cached product catalog")
+        return entry["products"]
+
+    headers = {}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
 
     try:
-        response = requests.get(url)
-        print("Status Code:", response.status_code)
-        
-        data = response.json()
-        print("Keys in response:", data.keys())
-        
+        with create_session(max_workers if paginate else 1) as session:
+            params = {"limit": page_size, "skip": 0} if paginate else None
+            response = session.get(url, params=params, headers=headers, timeout=timeout)
+            print("Status Code:", response.status_code)
+
+            if response.status_code == 304 and entry is not None:
+                cache.revalidated(key, entry)
+                print("Cached product catalog is still current")
+                return entry["products"]
+
+            response.raise_for_status()
+
+            data = response.json()
+            products = data["products"]
+            if paginate:
+                products = list(products)
+                for page in iter_remaining_pages(session, url, data, page_size, max_workers, timeout):
+                    products.extend(page)
+            else:
+                print("Keys in response:", data.keys())
+
+        if use_cache:
+            cache.put(key, url, products,
+                      response.headers.get("ETag"),
+                      response.headers.get("Last-Modified"))
+
         print("API Fetch Successful")
-        return data["products"]
+        return products
 
     except Exception as e:
         print("API Fetch Failed:", e)
+
+        if entry is not None:
+            print("Falling back to last cached product catalog")
+            return entry["products"]
+
         return []
 
 
 # Task 3.1 (b) Create Product Mapping
 
-def create_product_mapping(api_products):
+def create_product_mapping(api_products=None, url=PRODUCTS_URL, cache=None,
+                           paginate=True, page_size=PAGE_SIZE):
+
+    # Load straight from the cached snapshot when no product list is given.
+    # Any iterable works, e.g. iter_all_products() to build it page by page.
+    if api_products is None:
+        entry = (cache or ProductCache()).get(_catalog_key(url, paginate, page_size))
+        api_products = entry["products"] if entry is not None else []
 
     product_mapping = {}
 
@@ -48,50 +179,171 @@ def create_product_mapping(api_products):
 
 
 # Task 3.2 (a) Enrich Sales Data
+#
+# Each distinct ProductID is resolved against the product mapping once (a
+# hash join), giving a shared ProductMatch. Enriched rows are overlay views:
+# the original transaction plus a reference to its ProductMatch, read through
+# the same mapping interface as the transaction itself, with the API_* fields
+# added.
 
-def enrich_sales_data(transactions, product_mapping):
-    enriched = []
+_API_ATTRIBUTES = {
+    "API_Category": "category",
+    "API_Brand": "brand",
+    "API_Rating": "rating",
+    "API_Match": "matched"
+}
 
-    for t in transactions:
-        new_t = t.copy()
-
-        try:
-            product_id = int(t["ProductID"][1:])
-        except:
-            product_id = None
-
-        if product_id and product_id in product_mapping:
-            api_data = product_mapping[product_id]
-            new_t["API_Category"] = api_data.get("category")
-            new_t["API_Brand"] = api_data.get("brand")
-            new_t["API_Rating"] = api_data.get("rating")
-            new_t["API_Match"] = True
+
+class ProductMatch:
+    __slots__ = ("category", "brand", "rating", "matched", "suffix")
+
+    def __init__(self, api_data):
+        if api_data is not None:
+            self.category = api_data.get("category")
+            self.brand = api_data.get("brand")
+            self.rating = api_data.get("rating")
+            self.matched = True
         else:
-            new_t["API_Category"] = None
-            new_t["API_Brand"] = None
-            new_t["API_Rating"] = None
-            new_t["API_Match"] = False
+            self.category = None
+            self.brand = None
+            self.rating = None
+            self.matched = False
+
+        # the API columns of an enriched-file line, formatted once per product
+        self.suffix = f"|{self.category}|{self.brand}|{self.rating}|{self.matched}\n"
+
+
+def resolve_product(product_id, product_mapping):
+    # "P101" matches product 101; anything unparsable (or 0) never matches
+    try:
+        product_id = int(product_id[1:])
+    except:
+        product_id = None
+
+    if product_id and product_id in product_mapping:
+        return ProductMatch(product_mapping[product_id])
+    return ProductMatch(None)
+
+
+class EnrichedTransaction:
+    __slots__ = ("base", "product")
+
+    def __init__(self, base, product):
+        self.base = base
+        self.product = product
+
+    def __getitem__(self, key):
+        attribute = _API_ATTRIBUTES.get(key)
+        if attribute is None:
+            return self.base[key]
+        return getattr(self.product, attribute)
+
+    def __contains__(self, key):
+        return key in _API_ATTRIBUTES or key in self.base
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        return list(self.base.keys()) + list(_API_ATTRIBUTES)
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def copy(self):
+        return dict(self.items())
 
-        enriched.append(new_t)
+    def __eq__(self, other):
+        if isinstance(other, (EnrichedTransaction, dict)):
+            return self.items() == list(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.copy())
+
+
+def iter_enriched(transactions, product_mapping, matches=None):
+    # `matches` caches ProductID -> ProductMatch and can be shared across calls
+    if matches is None:
+        matches = {}
+
+    for t in transactions:
+        product_id = t["ProductID"]
+        match = matches.get(product_id)
+        if match is None:
+            match = matches[product_id] = resolve_product(product_id, product_mapping)
+        yield EnrichedTransaction(t, match)
+
+
+def enrich_sales_data(transactions, product_mapping, output_file="data/enriched_sales_data.txt",
+                      columns_file=None):
+    enriched = list(iter_enriched(transactions, product_mapping))
+
+    save_enriched_data(enriched, output_file)
+
+    # optional binary copy for columnar readers (needs numpy)
+    if columns_file is not None:
+        from utils.columnar import save_enriched_columns
+        save_enriched_columns(enriched, columns_file)
 
-    save_enriched_data(enriched)
     return enriched
 
 
+def _enriched_line(t):
+    if type(t) is EnrichedTransaction:
+        base = t.base
+
+        # parsed records: plain attribute reads instead of mapping lookups
+        if type(base) is Transaction:
+            return (
+                f"{base.TransactionID}|{base.Date}|{base.ProductID}|{base.ProductName}|"
+                f"{base.Quantity}|{base.UnitPrice}|{base.CustomerID}|{base.Region}"
+                + t.product.suffix
+            )
+
+        return (
+            f"{base['TransactionID']}|{base['Date']}|{base['ProductID']}|{base['ProductName']}|"
+            f"{base['Quantity']}|{base['UnitPrice']}|{base['CustomerID']}|{base['Region']}"
+            + t.product.suffix
+        )
+
+    return (
+        f"{t['TransactionID']}|{t['Date']}|{t['ProductID']}|{t['ProductName']}|"
+        f"{t['Quantity']}|{t['UnitPrice']}|{t['CustomerID']}|{t['Region']}|"
+        f"{t['API_Category']}|{t['API_Brand']}|{t['API_Rating']}|{t['API_Match']}\n"
+    )
 
 
-def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data.txt"):
-    with open(filename, "w", encoding="utf-8") as f:
+# Lines are formatted into batches and each batch goes out in one write
+# through a large buffer, instead of one write call per row.
 
-        header = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region|API_Category|API_Brand|API_Rating|API_Match\n"
-        f.write(header)
+def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data.txt", append=False,
+                       batch_rows=WRITE_BATCH_ROWS):
+    with open(filename, "a" if append else "w", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
 
+        if not append or f.tell() == 0:
+            header = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region|API_Category|API_Brand|API_Rating|API_Match\n"
+            f.write(header)
+
+        batch = []
         for t in enriched_transactions:
-            line = (
-                f"{t['TransactionID']}|{t['Date']}|{t['ProductID']}|{t['ProductName']}|"
-                f"{t['Quantity']}|{t['UnitPrice']}|{t['CustomerID']}|{t['Region']}|"
-                f"{t['API_Category']}|{t['API_Brand']}|{t['API_Rating']}|{t['API_Match']}\n"
-            )
-            f.write(line)
+            batch.append(_enriched_line(t))
+
+            if len(batch) >= batch_rows:
+                f.write("".join(batch))
+                batch = []
+
+        f.write("".join(batch))
 
     print("Enriched file saved successfully.")
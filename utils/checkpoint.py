@@ -0,0 +1,142 @@
+import json
+import os
+
+from utils.file_handler import iter_sales_data, iter_parse_transactions, iter_validate_and_filter, file_fingerprint
+from utils.data_processor import SalesAggregator
+from utils.api_handler import iter_enriched, save_enriched_data
+
+
+CHECKPOINT_VERSION = 3
+
+
+def load_checkpoint(path):
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            checkpoint = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (ValueError, OSError) as e:
+        print("Ignoring unreadable checkpoint:", e)
+        return None
+
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        return None
+
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # write-then-rename so a crash never leaves a half-written checkpoint
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(checkpoint, file)
+    os.replace(tmp_path, path)
+
+
+def _resume_point(filename, checkpoint):
+    if checkpoint is None:
+        return "no checkpoint"
+
+    if checkpoint["source"] != os.path.abspath(filename):
+        return "checkpoint is for a different file"
+
+    if os.path.getsize(filename) < checkpoint["offset"]:
+        return "file was truncated"
+
+    if file_fingerprint(filename, checkpoint["offset"]) != checkpoint["fingerprint"]:
+        return "file was rewritten"
+
+    return None
+
+
+# Incremental mode
+#
+# Restores the saved accumulators, parses only the lines appended since the
+# last run, merges them in and saves a new checkpoint. Falls back to a full
+# rebuild when the file no longer matches the checkpoint.
+#
+# A last line without a newline is counted in this run's results but kept
+# out of the checkpoint: the offset, aggregates and enriched file size are
+# saved before it, and the next run reads it again, so an append that
+# completes the line is parsed as one record instead of being glued on.
+
+def run_incremental(filename, checkpoint_path, product_mapping,
+                    enriched_file="data/enriched_sales_data.txt"):
+    checkpoint = load_checkpoint(checkpoint_path)
+    rebuild_reason = _resume_point(filename, checkpoint)
+
+    if rebuild_reason is None:
+        results = SalesAggregator.from_state(checkpoint["aggregates"])
+        offset = checkpoint["offset"]
+        encoding = checkpoint["encoding"]
+        total_input = checkpoint["total_input"]
+        invalid = checkpoint["invalid"]
+        _truncate(enriched_file, checkpoint["enriched_size"])
+    else:
+        results = SalesAggregator()
+        offset = 0
+        encoding = None
+        total_input = 0
+        invalid = 0
+
+    def enrich_and_aggregate(rows):
+        for enriched in iter_enriched(rows, product_mapping):
+            results.add(enriched)
+            yield enriched
+
+    progress = {}
+    summary = {}
+    lines = iter_sales_data(filename, offset, encoding, progress, complete_lines_only=True)
+    transactions = iter_validate_and_filter(iter_parse_transactions(lines), summary=summary)
+
+    # a full rebuild rewrites the enriched file, a resume appends to it
+    save_enriched_data(enrich_and_aggregate(transactions), enriched_file,
+                       append=rebuild_reason is None)
+
+    if "offset" not in progress:
+        return results, _stats(rebuild_reason, offset, offset, summary, {})
+
+    save_checkpoint(checkpoint_path, {
+        "version": CHECKPOINT_VERSION,
+        "source": os.path.abspath(filename),
+        "offset": progress["offset"],
+        "encoding": progress["encoding"],
+        "fingerprint": file_fingerprint(filename, progress["offset"]),
+        "total_input": total_input + summary.get("total_input", 0),
+        "invalid": invalid + summary.get("invalid", 0),
+        "enriched_size": os.path.getsize(enriched_file),
+        "aggregates": results.to_state()
+    })
+
+    # the unterminated last line, if any
+    tail_progress = {}
+    tail_summary = {}
+    lines = iter_sales_data(filename, progress["offset"], progress["encoding"], tail_progress)
+    transactions = iter_validate_and_filter(iter_parse_transactions(lines), summary=tail_summary)
+    save_enriched_data(enrich_and_aggregate(transactions), enriched_file, append=True)
+
+    end_offset = tail_progress.get("offset", progress["offset"])
+    return results, _stats(rebuild_reason, offset, end_offset, summary, tail_summary)
+
+
+def _truncate(filename, size):
+    try:
+        if os.path.getsize(filename) > size:
+            os.truncate(filename, size)
+    except FileNotFoundError:
+        pass
+
+
+def _stats(rebuild_reason, start_offset, end_offset, summary, tail_summary):
+    return {
+        "rebuild_reason": rebuild_reason,
+        "start_offset": start_offset,
+        "end_offset": end_offset,
+        "new_records": summary.get("total_input", 0) + tail_summary.get("total_input", 0),
+        "new_valid": summary.get("final_count", 0) + tail_summary.get("final_count", 0),
+        "new_invalid": summary.get("invalid", 0) + tail_summary.get("invalid", 0)
+    }
@@ -0,0 +1,440 @@
+# pip install numpy
+
+from operator import attrgetter
+
+import numpy as np
+
+from utils.file_handler import Transaction
+
+
+CATEGORICAL_FIELDS = ["Date", "ProductID", "ProductName", "CustomerID", "Region"]
+
+
+# Columnar transaction store
+#
+# Quantity and UnitPrice are kept as int64 / float64 arrays and every string
+# column except TransactionID is dictionary-encoded. Codes are dense and
+# numbered in order of first appearance, so code order matches the insertion
+# order of the dicts built by the row-based functions in data_processor.py.
+
+class TransactionColumns:
+
+    def __init__(self, transaction_ids, quantity, unit_price, codes, values):
+        self.transaction_ids = transaction_ids
+        self.quantity = quantity
+        self.unit_price = unit_price
+        self.codes = codes
+        self.values = values
+        self.amount = quantity * unit_price
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        if not isinstance(transactions, list):
+            transactions = list(transactions)
+
+        codes = {}
+        values = {}
+        for field in CATEGORICAL_FIELDS:
+            codes[field], values[field] = _encode(_column(transactions, field))
+
+        return cls(
+            np.array(_column(transactions, "TransactionID"), dtype=str),
+            np.array(_column(transactions, "Quantity"), dtype=np.int64),
+            np.array(_column(transactions, "UnitPrice"), dtype=np.float64),
+            codes,
+            values
+        )
+
+    def __len__(self):
+        return len(self.quantity)
+
+    def to_transactions(self):
+        columns = [self.transaction_ids.tolist()]
+        for field in CATEGORICAL_FIELDS:
+            values = np.array(self.values[field], dtype=object)
+            columns.append(values[self.codes[field]].tolist())
+
+        ids, dates, product_ids, names, customers, regions = columns
+        return list(map(Transaction, ids, dates, product_ids, names, self.quantity.tolist(),
+                        self.unit_price.tolist(), customers, regions))
+
+    # rows passing the region / amount filters, as passes_filters decides
+    def filter_mask(self, region=None, min_amount=None, max_amount=None):
+        mask = np.ones(len(self), dtype=bool)
+
+        if region is not None:
+            regions = self.values["Region"]
+            code = regions.index(region) if region in regions else -1
+            mask &= self.codes["Region"] == code
+        if min_amount is not None:
+            mask &= self.amount >= min_amount
+        if max_amount is not None:
+            mask &= self.amount <= max_amount
+
+        return mask
+
+    def select(self, mask):
+        mask = np.asarray(mask, dtype=bool)
+        if mask.all():
+            return self
+
+        codes = {}
+        values = {}
+
+        for field in CATEGORICAL_FIELDS:
+            subset = self.codes[field][mask]
+            uniq, first, inverse = np.unique(subset, return_index=True, return_inverse=True)
+
+            # renumber surviving codes by first appearance within the subset
+            order = np.argsort(first, kind="stable")
+            rank = np.empty(len(uniq), dtype=np.int32)
+            rank[order] = np.arange(len(uniq), dtype=np.int32)
+
+            codes[field] = rank[inverse.ravel()]
+            values[field] = [self.values[field][uniq[i]] for i in order]
+
+        return TransactionColumns(
+            self.transaction_ids[mask],
+            self.quantity[mask],
+            self.unit_price[mask],
+            codes,
+            values
+        )
+
+
+def _column(transactions, field):
+    # Transaction records are read attribute by attribute in C; dict rows
+    # (or a mix) go through the mapping interface
+    try:
+        return list(map(attrgetter(field), transactions))
+    except AttributeError:
+        return [t[field] for t in transactions]
+
+
+def _encode(column):
+    # codes numbered by first appearance
+    values = list(dict.fromkeys(column))
+    lookup = {value: code for code, value in enumerate(values)}
+    codes = np.fromiter(map(lookup.__getitem__, column), dtype=np.int32, count=len(column))
+    return codes, values
+
+
+def _sequential_sum(values):
+    # np.sum uses pairwise summation; a running sum matches the Python loops bit for bit
+    if len(values) == 0:
+        return 0
+    return float(np.cumsum(values)[-1])
+
+
+def _group_sum(codes, weights, k):
+    return np.bincount(codes, weights=weights, minlength=k)
+
+
+def _group_count(codes, k):
+    return np.bincount(codes, minlength=k)
+
+
+def _sorted_desc(values):
+    # stable, like sorted(..., reverse=True)
+    return np.argsort(-values, kind="stable")
+
+
+def _distinct_pairs(left, right, right_k):
+    # unique (left, right) code pairs ordered by first appearance
+    pairs = left.astype(np.int64) * right_k + right
+    uniq, first = np.unique(pairs, return_index=True)
+    uniq = uniq[np.argsort(first, kind="stable")]
+    return uniq // right_k, uniq % right_k
+
+
+# Task 2.1 (a) Calculate Total Revenue
+
+def calculate_total_revenue(columns):
+    return _sequential_sum(columns.amount)
+
+
+# Task 2.1 (b) Region-wise Sales Analysis
+
+def region_wise_sales(columns):
+    regions = columns.values["Region"]
+    codes = columns.codes["Region"]
+
+    total_revenue = calculate_total_revenue(columns)
+    sales = _group_sum(codes, columns.amount, len(regions))
+    counts = _group_count(codes, len(regions))
+
+    result = {}
+    for i in _sorted_desc(sales):
+        percent = (float(sales[i]) / total_revenue) * 100
+        result[regions[i]] = {
+            "total_sales": float(sales[i]),
+            "transaction_count": int(counts[i]),
+            "percentage": round(percent, 2)
+        }
+
+    return result
+
+
+def _product_totals(columns):
+    names = columns.values["ProductName"]
+    codes = columns.codes["ProductName"]
+
+    qty = np.rint(_group_sum(codes, columns.quantity, len(names))).astype(np.int64)
+    revenue = _group_sum(codes, columns.amount, len(names))
+    return names, qty, revenue
+
+
+# Task 2.1 (c) Top Selling Products
+
+def top_selling_products(columns, n=5):
+    names, qty, revenue = _product_totals(columns)
+
+    order = _sorted_desc(qty)[:n]
+    return [(names[i], int(qty[i]), float(revenue[i])) for i in order]
+
+
+# Task 2.1 (d) Customer Purchase Analysis
+
+def customer_analysis(columns):
+    customers = columns.values["CustomerID"]
+    codes = columns.codes["CustomerID"]
+    k = len(customers)
+
+    spent = _group_sum(codes, columns.amount, k)
+    counts = _group_count(codes, k)
+
+    names = columns.values["ProductName"]
+    products = [set() for _ in range(k)]
+    pair_cust, pair_prod = _distinct_pairs(codes, columns.codes["ProductName"], len(names))
+    for c, p in zip(pair_cust.tolist(), pair_prod.tolist()):
+        products[c].add(names[p])
+
+    result = {}
+    for i in _sorted_desc(spent):
+        total_spent = float(spent[i])
+        purchase_count = int(counts[i])
+
+        result[customers[i]] = {
+            "total_spent": total_spent,
+            "purchase_count": purchase_count,
+            "avg_order_value": round(total_spent / purchase_count, 2),
+            "products_bought": list(products[i])
+        }
+
+    return result
+
+
+# Top customers by total spent
+
+def top_customers(columns, n=5):
+    customers = columns.values["CustomerID"]
+    codes = columns.codes["CustomerID"]
+
+    spent = _group_sum(codes, columns.amount, len(customers))
+    counts = _group_count(codes, len(customers))
+
+    order = _sorted_desc(spent)[:n]
+    return [(customers[i], float(spent[i]), int(counts[i])) for i in order]
+
+
+# Task 2.2 (a) Daily Sales Trend
+
+def daily_sales_trend(columns):
+    dates = columns.values["Date"]
+    codes = columns.codes["Date"]
+    k = len(dates)
+
+    revenue = _group_sum(codes, columns.amount, k)
+    counts = _group_count(codes, k)
+
+    pair_date, _ = _distinct_pairs(codes, columns.codes["CustomerID"], len(columns.values["CustomerID"]))
+    unique_customers = _group_count(pair_date, k)
+
+    result = {}
+    for i in sorted(range(k), key=lambda i: dates[i]):
+        result[dates[i]] = {
+            "revenue": float(revenue[i]),
+            "transaction_count": int(counts[i]),
+            "unique_customers": int(unique_customers[i])
+        }
+
+    return result
+
+
+# Task 2.2 (b) Find Peak Sales Day
+
+def find_peak_sales_day(columns):
+    dates = columns.values["Date"]
+    codes = columns.codes["Date"]
+    k = len(dates)
+
+    if k == 0:
+        return (None, 0, 0)
+
+    revenue = _group_sum(codes, columns.amount, k)
+    counts = _group_count(codes, k)
+
+    order = np.array(sorted(range(k), key=lambda i: dates[i]), dtype=np.int64)
+    best = order[np.argmax(revenue[order])]
+
+    if revenue[best] <= 0:
+        return (None, 0, 0)
+
+    return (dates[best], float(revenue[best]), int(counts[best]))
+
+
+# Task 2.3 (a) Low Performing Products
+
+def low_performing_products(columns, threshold=10):
+    names, qty, revenue = _product_totals(columns)
+
+    low = np.flatnonzero(qty < threshold)
+    low = low[np.argsort(qty[low], kind="stable")]
+    return [(names[i], int(qty[i]), float(revenue[i])) for i in low]
+
+
+# Validation and filters on cached columns
+#
+# `valid` is the validation mask stored next to the columns (see
+# parse_cache.py). Mirrors validate_and_filter: the same two lines are
+# printed, duplicates are dropped among valid rows before the region/amount
+# filters, and the same summary is returned, with the selected columns in
+# place of the row list.
+
+def select_valid(columns, valid, region=None, min_amount=None, max_amount=None, dedup=None):
+    print("Available regions:", columns.values["Region"])
+    if len(columns):
+        print("Transaction amount range:", float(columns.amount.min()), "-", float(columns.amount.max()))
+
+    keep = np.array(valid, dtype=bool)
+    invalid_count = len(columns) - int(np.count_nonzero(keep))
+
+    duplicates = 0
+    if dedup is not None:
+        positions = np.flatnonzero(keep)
+        ids = columns.transaction_ids[positions].tolist()
+        flags = []
+        for start in range(0, len(ids), dedup.batch_rows):
+            flags.extend(dedup.mark(ids[start:start + dedup.batch_rows]))
+        repeated = positions[np.array(flags, dtype=bool)]
+        keep[repeated] = False
+        duplicates = len(repeated)
+
+    selected = columns.select(keep & columns.filter_mask(region, min_amount, max_amount))
+
+    filter_summary = {
+        "total_input": len(columns),
+        "invalid": invalid_count,
+        "filtered_by_region": region,
+        "filtered_by_amount": {
+            "min": min_amount,
+            "max": max_amount
+        },
+        "final_count": len(selected)
+    }
+    if dedup is not None:
+        filter_summary["duplicates"] = duplicates
+
+    return selected, invalid_count, filter_summary
+
+
+# Report adapter: the attributes and methods generate_sales_report reads,
+# answered by the vectorized analytics. Enrichment stats come from the
+# enriched rows passed to the report.
+
+class ColumnarResults:
+
+    product_hitters = None
+    approximate_customers = False
+    enriched_count = None
+    enrichment_checked = None
+    failed_products = ()
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.transaction_count = len(columns)
+
+        regions = columns.values["Region"]
+        sales = _group_sum(columns.codes["Region"], columns.amount, len(regions))
+        counts = _group_count(columns.codes["Region"], len(regions))
+        self.regions = {
+            region: {"total_sales": float(sales[i]), "transaction_count": int(counts[i])}
+            for i, region in enumerate(regions)
+        }
+        self.daily = daily_sales_trend(columns)
+
+    def calculate_total_revenue(self):
+        return calculate_total_revenue(self.columns)
+
+    def top_selling_products(self, n=5):
+        return top_selling_products(self.columns, n)
+
+    def low_performing_products(self, threshold=10):
+        return low_performing_products(self.columns, threshold)
+
+    def top_customers(self, n=5):
+        return top_customers(self.columns, n)
+
+    def daily_sales_trend(self):
+        return self.daily
+
+
+# Enriched rows in binary form
+#
+# One .npz holding the transaction columns plus the API columns. The API
+# values depend only on the product, so they are stored once per ProductID
+# code: match flag, category and brand (with presence masks, since the
+# mapping may hold None) and rating (NaN when missing).
+
+def save_enriched_columns(enriched, filename):
+    # overlay views (api_handler.EnrichedTransaction) expose the parsed row as .base
+    columns = TransactionColumns.from_transactions(getattr(t, "base", t) for t in enriched)
+
+    api = {}
+    for t in enriched:
+        product_id = t["ProductID"]
+        if product_id not in api:
+            api[product_id] = (t["API_Match"], t["API_Category"], t["API_Brand"], t["API_Rating"])
+
+    products = [api[product_id] for product_id in columns.values["ProductID"]]
+
+    arrays = {
+        "TransactionID": columns.transaction_ids,
+        "Quantity": columns.quantity,
+        "UnitPrice": columns.unit_price,
+        "API_Match": np.array([p[0] for p in products], dtype=bool),
+        "API_Category": np.array(["" if p[1] is None else str(p[1]) for p in products], dtype=str),
+        "API_Category.present": np.array([p[1] is not None for p in products], dtype=bool),
+        "API_Brand": np.array(["" if p[2] is None else str(p[2]) for p in products], dtype=str),
+        "API_Brand.present": np.array([p[2] is not None for p in products], dtype=bool),
+        "API_Rating": np.array([np.nan if p[3] is None else p[3] for p in products], dtype=np.float64)
+    }
+    for field in CATEGORICAL_FIELDS:
+        arrays[field + ".codes"] = columns.codes[field]
+        arrays[field + ".values"] = np.array(columns.values[field], dtype=str)
+
+    np.savez(filename, **arrays)
+
+
+# (columns, api) where api maps each API field to a per-product array indexed
+# by columns.codes["ProductID"]
+
+def load_enriched_columns(filename):
+    with np.load(filename) as data:
+        columns = TransactionColumns(
+            data["TransactionID"],
+            data["Quantity"],
+            data["UnitPrice"],
+            {field: data[field + ".codes"] for field in CATEGORICAL_FIELDS},
+            {field: data[field + ".values"].tolist() for field in CATEGORICAL_FIELDS}
+        )
+        api = {
+            "API_Match": data["API_Match"],
+            "API_Category": data["API_Category"],
+            "API_Category.present": data["API_Category.present"],
+            "API_Brand": data["API_Brand"],
+            "API_Brand.present": data["API_Brand.present"],
+            "API_Rating": data["API_Rating"]
+        }
+
+    return columns, api
@@ -0,0 +1,444 @@
+# pip install numpy
+
+import json
+import os
+
+import numpy as np
+
+from utils.file_handler import file_fingerprint, iter_sales_data, iter_parse_transactions, iter_validate_and_filter
+from utils.sketches import HyperLogLog, hash64, top_n
+
+
+DIMENSIONS = ("Date", "Region", "ProductName")
+CUBE_VERSION = 1
+DEFAULT_PRECISION = 12
+DENSE_BLOCK_BYTES = 1 << 24
+
+
+# Date x Region x ProductName aggregate cube
+#
+# One cell per distinct (date, region, product), stored column-wise: a code
+# array per dimension (values numbered by first appearance), quantity,
+# revenue and transaction count arrays, and a HyperLogLog of the cell's
+# customers kept sparse as flattened (cell offsets, register index, rank)
+# arrays. Cells are numbered in the order their combination first appeared,
+# so roll-ups list each group in the same first-appearance order as a scan of
+# the raw rows and the report sections break ties the same way. Revenue
+# roll-ups add per-cell subtotals, so they can differ from a row-by-row sum
+# in the last bits; customer counts are HyperLogLog estimates.
+
+class SalesCube:
+
+    def __init__(self, values, codes, qty, revenue, count, offsets, reg_index, reg_rank,
+                 precision=DEFAULT_PRECISION):
+        self.values = values
+        self.codes = codes
+        self.qty = qty
+        self.revenue = revenue
+        self.count = count
+        self.offsets = offsets
+        self.reg_index = reg_index
+        self.reg_rank = reg_rank
+        self.precision = precision
+        self._lookups = {}
+
+    @classmethod
+    def from_transactions(cls, transactions, precision=DEFAULT_PRECISION):
+        cell_ids = {}
+        registers = {}   # CustomerID -> (register index, rank), hashed once each
+        cells = []
+        qty = []
+        unit_price = []
+        reg_index = []
+        reg_rank = []
+
+        for t in transactions:
+            key = (t["Date"], t["Region"], t["ProductName"])
+            cell = cell_ids.get(key)
+            if cell is None:
+                cell = cell_ids[key] = len(cell_ids)
+
+            cid = t["CustomerID"]
+            register = registers.get(cid)
+            if register is None:
+                register = registers[cid] = HyperLogLog.register(hash64(cid), precision)
+
+            cells.append(cell)
+            qty.append(t["Quantity"])
+            unit_price.append(t["UnitPrice"])
+            reg_index.append(register[0])
+            reg_rank.append(register[1])
+
+        k = len(cell_ids)
+        cells = np.array(cells, dtype=np.int64)
+        qty = np.array(qty, dtype=np.int64)
+        amount = qty * np.array(unit_price, dtype=np.float64)
+
+        # per-cell register maxima: sort by (cell, index, rank), keep the last of each run
+        m = 1 << precision
+        reg_key = cells * m + np.array(reg_index, dtype=np.int64)
+        reg_rank = np.array(reg_rank, dtype=np.uint8)
+        order = np.lexsort((reg_rank, reg_key))
+        reg_key = reg_key[order]
+        last = np.ones(len(reg_key), dtype=bool)
+        last[:-1] = reg_key[1:] != reg_key[:-1]
+        reg_key = reg_key[last]
+
+        values = {dimension: [] for dimension in DIMENSIONS}
+        codes = {dimension: [] for dimension in DIMENSIONS}
+        lookups = {dimension: {} for dimension in DIMENSIONS}
+        for key in cell_ids:
+            for dimension, value in zip(DIMENSIONS, key):
+                lookup = lookups[dimension]
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(lookup)
+                    values[dimension].append(value)
+                codes[dimension].append(code)
+
+        offsets = np.zeros(k + 1, dtype=np.int64)
+        np.cumsum(np.bincount(reg_key // m, minlength=k), out=offsets[1:])
+
+        return cls(
+            values,
+            {dimension: np.array(codes[dimension], dtype=np.int32) for dimension in DIMENSIONS},
+            np.rint(np.bincount(cells, weights=qty, minlength=k)).astype(np.int64),
+            np.bincount(cells, weights=amount, minlength=k),
+            np.bincount(cells, minlength=k).astype(np.int64),
+            offsets,
+            (reg_key % m).astype(np.uint32),
+            reg_rank[order][last],
+            precision
+        )
+
+    def __len__(self):
+        return len(self.qty)
+
+    def _code(self, dimension, value):
+        lookup = self._lookups.get(dimension)
+        if lookup is None:
+            lookup = self._lookups[dimension] = {v: i for i, v in enumerate(self.values[dimension])}
+        return lookup.get(value, -1)
+
+    # Cells matching every filter. A filter value may be a single value or a
+    # list/set/tuple of values (a dice).
+    def _cells(self, filters):
+        mask = np.ones(len(self), dtype=bool)
+
+        for dimension, value in filters.items():
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"unknown cube dimension: {dimension}")
+            wanted = value if isinstance(value, (list, set, tuple, frozenset)) else [value]
+            mask &= np.isin(self.codes[dimension], [self._code(dimension, v) for v in wanted])
+
+        return np.flatnonzero(mask)
+
+    # Slice: a sub-cube holding only the matching cells
+    def slice(self, **filters):
+        cells = self._cells(filters)
+
+        lengths = np.diff(self.offsets)
+        keep = np.repeat(np.isin(np.arange(len(self)), cells), lengths)
+        offsets = np.zeros(len(cells) + 1, dtype=np.int64)
+        np.cumsum(lengths[cells], out=offsets[1:])
+
+        return SalesCube(
+            self.values,
+            {dimension: self.codes[dimension][cells] for dimension in DIMENSIONS},
+            self.qty[cells],
+            self.revenue[cells],
+            self.count[cells],
+            offsets,
+            self.reg_index[keep],
+            self.reg_rank[keep],
+            self.precision
+        )
+
+    # Roll-up: measures grouped by the given dimensions (all others summed
+    # out), keyed by a tuple of their values, or by the value itself for a
+    # single dimension. An empty `by` gives the grand total. Merging the
+    # customer sketches is the expensive part; distinct=False skips it.
+    def rollup(self, by=(), distinct=True, **filters):
+        if isinstance(by, str):
+            by = (by,)
+        for dimension in by:
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"unknown cube dimension: {dimension}")
+
+        cells = self._cells(filters)
+
+        if by:
+            combined = np.zeros(len(cells), dtype=np.int64)
+            for dimension in by:
+                combined = combined * len(self.values[dimension]) + self.codes[dimension][cells]
+
+            # groups numbered by first appearance, like dict insertion order
+            uniq, first, inverse = np.unique(combined, return_index=True, return_inverse=True)
+            order = np.argsort(first, kind="stable")
+            rank = np.empty(len(uniq), dtype=np.int64)
+            rank[order] = np.arange(len(uniq))
+            group = rank[inverse.ravel()]
+            k = len(uniq)
+            leaders = cells[first[order]]
+        else:
+            group = np.zeros(len(cells), dtype=np.int64)
+            k = 1
+
+        # bincount adds in cell order, exactly like a running sum per group
+        qty = np.rint(np.bincount(group, weights=self.qty[cells], minlength=k)).astype(np.int64)
+        revenue = np.bincount(group, weights=self.revenue[cells], minlength=k)
+        count = np.bincount(group, weights=self.count[cells], minlength=k)
+        customers = self._distinct_counts(cells, group, k) if distinct else None
+
+        groups = []
+        for g in range(k):
+            data = {
+                "qty": int(qty[g]),
+                "revenue": float(revenue[g]),
+                "transaction_count": int(count[g])
+            }
+            if distinct:
+                data["unique_customers"] = int(customers[g])
+            groups.append(data)
+
+        if not by:
+            return groups[0]
+
+        keys = zip(*[[self.values[dimension][code] for code in self.codes[dimension][leaders].tolist()]
+                     for dimension in by])
+        if len(by) == 1:
+            return {key[0]: data for key, data in zip(keys, groups)}
+        return {key: data for key, data in zip(keys, groups)}
+
+    def _distinct_counts(self, cells, group, k):
+        # union the cells' registers per group into dense register rows
+        # (a block of groups at a time) and estimate each row
+        m = 1 << self.precision
+        cell_group = np.full(len(self), -1, dtype=np.int64)
+        cell_group[cells] = group
+
+        reg_group = np.repeat(cell_group, np.diff(self.offsets))
+        keep = reg_group >= 0
+        order = np.argsort(reg_group[keep], kind="stable")
+        reg_group = reg_group[keep][order]
+        reg_index = self.reg_index[keep][order]
+        reg_rank = self.reg_rank[keep][order]
+
+        estimates = np.empty(k, dtype=np.float64)
+        block = max(1, DENSE_BLOCK_BYTES // m)
+        for start in range(0, k, block):
+            end = min(k, start + block)
+            lo, hi = np.searchsorted(reg_group, [start, end])
+
+            registers = np.zeros((end - start, m), dtype=np.uint8)
+            np.maximum.at(registers, (reg_group[lo:hi] - start, reg_index[lo:hi]), reg_rank[lo:hi])
+            estimates[start:end] = _hll_estimates(registers)
+
+        return np.rint(estimates).astype(np.int64)
+
+    # Drill-down: break one level further, e.g.
+    # drill_down("ProductName", Region="North") -> products within North
+    def drill_down(self, dimension, distinct=True, **path):
+        return self.rollup(tuple(path) + (dimension,), distinct, **path)
+
+    # Report sections derived from the cube, in the shapes data_processor returns
+
+    def calculate_total_revenue(self):
+        return self.rollup(distinct=False)["revenue"]
+
+    def region_wise_sales(self):
+        total_revenue = self.calculate_total_revenue()
+
+        result = {}
+        for region, data in self.rollup("Region", distinct=False).items():
+            result[region] = {
+                "total_sales": data["revenue"],
+                "transaction_count": data["transaction_count"],
+                "percentage": round((data["revenue"] / total_revenue) * 100, 2)
+            }
+
+        return dict(sorted(result.items(), key=lambda x: x[1]["total_sales"], reverse=True))
+
+    def top_selling_products(self, n=5):
+        products = ((name, data["qty"], data["revenue"])
+                    for name, data in self.rollup("ProductName", distinct=False).items())
+        return top_n(products, n, key=lambda x: x[1])
+
+    def low_performing_products(self, threshold=10):
+        result = [(name, data["qty"], data["revenue"])
+                  for name, data in self.rollup("ProductName", distinct=False).items()
+                  if data["qty"] < threshold]
+
+        result.sort(key=lambda x: x[1])
+        return result
+
+    def daily_sales_trend(self):
+        days = self.rollup("Date")
+
+        result = {}
+        for date in sorted(days):
+            result[date] = {
+                "revenue": days[date]["revenue"],
+                "transaction_count": days[date]["transaction_count"],
+                "unique_customers": days[date]["unique_customers"]
+            }
+
+        return result
+
+    def find_peak_sales_day(self):
+        max_date = None
+        max_revenue = 0
+        max_count = 0
+
+        days = self.rollup("Date", distinct=False)
+        for date in sorted(days):
+            data = days[date]
+            if data["revenue"] > max_revenue:
+                max_revenue = data["revenue"]
+                max_date = date
+                max_count = data["transaction_count"]
+
+        return (max_date, max_revenue, max_count)
+
+
+# Report adapter: the attributes and methods generate_sales_report reads,
+# answered from the cube. The cube has no customer or ProductID dimension, so
+# top customers and the API enrichment summary are reported as unavailable,
+# and the daily unique customers are HyperLogLog estimates.
+
+class CubeResults:
+
+    product_hitters = None
+    approximate_customers = True
+    enriched_count = None
+    enrichment_checked = None
+    failed_products = ()
+
+    def __init__(self, cube):
+        self.cube = cube
+        self.transaction_count = cube.rollup(distinct=False)["transaction_count"]
+        self.regions = {
+            region: {"total_sales": data["revenue"], "transaction_count": data["transaction_count"]}
+            for region, data in cube.rollup("Region", distinct=False).items()
+        }
+        self.daily = cube.rollup("Date", distinct=False)
+
+    def calculate_total_revenue(self):
+        return self.cube.calculate_total_revenue()
+
+    def top_selling_products(self, n=5):
+        return self.cube.top_selling_products(n)
+
+    def low_performing_products(self, threshold=10):
+        return self.cube.low_performing_products(threshold)
+
+    def top_customers(self, n=5):
+        return None
+
+    def daily_sales_trend(self):
+        return self.cube.daily_sales_trend()
+
+
+def _hll_estimates(registers):
+    # HyperLogLog.count() for each row of a register matrix
+    m = registers.shape[1]
+    zeros = np.count_nonzero(registers == 0, axis=1)
+    harmonic = np.ldexp(1.0, -registers.astype(np.int32)).sum(axis=1)
+
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimates = alpha * m * m / harmonic
+
+    # small-range correction: linear counting while registers are empty
+    small = (estimates <= 2.5 * m) & (zeros > 0)
+    estimates[small] = m * np.log(m / zeros[small])
+    return estimates
+
+
+def build_cube(transactions, precision=DEFAULT_PRECISION):
+    return SalesCube.from_transactions(transactions, precision)
+
+
+# Persistence
+#
+# The cube's arrays go into one .npz next to the data file, with the
+# precision and the source file's size, mtime and fingerprint stored as a
+# JSON string inside the archive. A cube whose source no longer matches is
+# rebuilt.
+
+def cube_path(filename):
+    return os.path.splitext(filename)[0] + ".cube.npz"
+
+
+def _source_meta(filename):
+    stat = os.stat(filename)
+    return {
+        "version": CUBE_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "fingerprint": file_fingerprint(filename, stat.st_size)
+    }
+
+
+def save_cube(cube, path, source_meta):
+    arrays = {
+        "meta": np.array(json.dumps({"precision": cube.precision, "source": source_meta})),
+        "qty": cube.qty,
+        "revenue": cube.revenue,
+        "count": cube.count,
+        "offsets": cube.offsets,
+        "reg_index": cube.reg_index,
+        "reg_rank": cube.reg_rank
+    }
+    for dimension in DIMENSIONS:
+        arrays[dimension + ".codes"] = cube.codes[dimension]
+        arrays[dimension + ".values"] = np.array(cube.values[dimension], dtype=str)
+
+    tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_cube(path, source_meta=None):
+    try:
+        with np.load(path) as data:
+            meta = json.loads(data["meta"].item())
+            if source_meta is not None and meta["source"] != source_meta:
+                return None
+
+            return SalesCube(
+                {dimension: data[dimension + ".values"].tolist() for dimension in DIMENSIONS},
+                {dimension: data[dimension + ".codes"] for dimension in DIMENSIONS},
+                data["qty"],
+                data["revenue"],
+                data["count"],
+                data["offsets"],
+                data["reg_index"],
+                data["reg_rank"],
+                meta["precision"]
+            )
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        print("Ignoring unreadable cube:", e)
+        return None
+
+
+# The cube for `filename` from disk when it matches the file, otherwise built
+# from `transactions` (the file's valid rows, streamed from the file when not
+# given) and saved. Returns (cube, loaded).
+
+def load_or_build_cube(filename, transactions=None, path=None, precision=DEFAULT_PRECISION):
+    if path is None:
+        path = cube_path(filename)
+    source_meta = _source_meta(filename)
+
+    cube = load_cube(path, source_meta)
+    if cube is not None and cube.precision == precision:
+        return cube, True
+
+    if transactions is None:
+        transactions = iter_validate_and_filter(iter_parse_transactions(iter_sales_data(filename)))
+
+    cube = build_cube(transactions, precision)
+    save_cube(cube, path, source_meta)
+    return cube, False
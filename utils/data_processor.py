@@ -1,6 +1,15 @@
+from utils.sketches import top_n, SpaceSaving, HyperLogLog, QuantileSketch
+from utils.result_cache import memoized
+from utils.spill_aggregate import SpillingGroupBy
+
+
 # Task 2.1 (a) Calculate Total Revenue
 
+@memoized
 def calculate_total_revenue(transactions):
+    if isinstance(transactions, SalesAggregator):
+        return transactions.calculate_total_revenue()
+
     total = 0
     for t in transactions:
         total += t["Quantity"] * t["UnitPrice"]
@@ -10,14 +19,19 @@ def calculate_total_revenue(transactions):
 
 # Task 2.1 (b) Region-wise Sales Analysis
 
+@memoized
 def region_wise_sales(transactions):
+    if isinstance(transactions, SalesAggregator):
+        return transactions.region_wise_sales()
+
     region_data = {}
 
-    total_revenue = calculate_total_revenue(transactions)
+    total_revenue = 0
 
     for t in transactions:
         region = t["Region"]
         amount = t["Quantity"] * t["UnitPrice"]
+        total_revenue += amount
 
         if region not in region_data:
             region_data[region] = {
@@ -45,7 +59,11 @@ def region_wise_sales(transactions):
 
 # Task 2.1 (c) Top Selling Products
 
+@memoized
 def top_selling_products(transactions, n=5):
+    if isinstance(transactions, SalesAggregator):
+        return transactions.top_selling_products(n)
+
     product_data = {}
 
     for t in transactions:
@@ -59,17 +77,20 @@ def top_selling_products(transactions, n=5):
         product_data[name]["qty"] += qty
         product_data[name]["revenue"] += revenue
 
-    result = []
-    for name, data in product_data.items():
-        result.append((name, data["qty"], data["revenue"]))
+    result = ((name, data["qty"], data["revenue"])
+              for name, data in product_data.items())
 
-    result.sort(key=lambda x: x[1], reverse=True)
-    return result[:n]
+    # bounded heap instead of a full sort to keep n entries
+    return top_n(result, n, key=lambda x: x[1])
 
 
 # Task 2.1 (d) Customer Purchase Analysis
 
+@memoized
 def customer_analysis(transactions):
+    if isinstance(transactions, SalesAggregator):
+        return transactions.customer_analysis()
+
     customers = {}
 
     for t in transactions:
@@ -107,9 +128,74 @@ def customer_analysis(transactions):
     return result
 
 
+# Top customers by total spent (bounded heap)
+
+@memoized
+def top_customers(transactions, n=5):
+    if isinstance(transactions, SalesAggregator):
+        return transactions.top_customers(n)
+
+    customers = {}
+
+    for t in transactions:
+        cid = t["CustomerID"]
+
+        if cid not in customers:
+            customers[cid] = {"total_spent": 0, "purchase_count": 0}
+
+        customers[cid]["total_spent"] += t["Quantity"] * t["UnitPrice"]
+        customers[cid]["purchase_count"] += 1
+
+    result = ((cid, data["total_spent"], data["purchase_count"])
+              for cid, data in customers.items())
+
+    return top_n(result, n, key=lambda x: x[1])
+
+
+# An aggregator answers from the sketches it was built with, so a capacity
+# other than theirs is refused rather than silently ignored.
+
+def _built_hitters(sketch, capacity):
+    if sketch is None:
+        raise ValueError("The aggregator was built without heavy_hitter_capacity")
+    if capacity is not None and capacity != sketch.capacity:
+        raise ValueError(f"The aggregator's heavy-hitter sketches have capacity {sketch.capacity}, not {capacity}")
+    return sketch
+
+
+# Approximate heavy hitters for key spaces too large to tabulate.
+# Single streaming pass with `capacity` counters; returns
+# (key, estimated_total, max_overestimate) tuples.
+
+@memoized
+def heavy_hitter_products(transactions, n=5, capacity=None):
+    if isinstance(transactions, SalesAggregator):
+        return _built_hitters(transactions.product_hitters, capacity).top(n)
+
+    sketch = SpaceSaving() if capacity is None else SpaceSaving(capacity)
+    for t in transactions:
+        sketch.update(t["ProductName"], t["Quantity"])
+    return sketch.top(n)
+
+
+@memoized
+def heavy_hitter_customers(transactions, n=5, capacity=None):
+    if isinstance(transactions, SalesAggregator):
+        return _built_hitters(transactions.customer_hitters, capacity).top(n)
+
+    sketch = SpaceSaving() if capacity is None else SpaceSaving(capacity)
+    for t in transactions:
+        sketch.update(t["CustomerID"], t["Quantity"] * t["UnitPrice"])
+    return sketch.top(n)
+
+
 # Task 2.2 (a) Daily Sales Trend
 
+@memoized
 def daily_sales_trend(transactions):
+    if isinstance(transactions, SalesAggregator):
+        return transactions.daily_sales_trend()
+
     daily = {}
 
     for t in transactions:
@@ -140,7 +226,11 @@ def daily_sales_trend(transactions):
 
 # Task 2.2 (b) Find Peak Sales Day
 
+@memoized
 def find_peak_sales_day(transactions):
+    if isinstance(transactions, SalesAggregator):
+        return transactions.find_peak_sales_day()
+
     daily = daily_sales_trend(transactions)
 
     max_date = None
@@ -160,7 +250,11 @@ def find_peak_sales_day(transactions):
 
 # Task 2.3 (a) Low Performing Products
 
+@memoized
 def low_performing_products(transactions, threshold=10):
+    if isinstance(transactions, SalesAggregator):
+        return transactions.low_performing_products(threshold)
+
     product_data = {}
 
     for t in transactions:
@@ -183,3 +277,470 @@ def low_performing_products(transactions, threshold=10):
     result.sort(key=lambda x: x[1])
     return result
 
+
+
+# Single-pass aggregation engine
+#
+# SalesAggregator accumulates every metric in one scan and is the results object
+# shared by main.py, the streaming mode and generate_sales_report. Each method
+# returns the same shape as the list-based function of the same name, and those
+# functions accept an aggregator in place of a transaction list.
+#
+# Revenue sums are exact: each amount is added as an integer count of
+# 2**-scale, where scale grows (rescaling the sums so far) until it covers the
+# finest float step seen, so whole-rupee data stays at scale 0. Integer sums
+# do not depend on the order of the additions, so partials built from any
+# split of the rows merge to the same totals. _settle() rounds them once to
+# the float fields, lazily at the start of every read and after update/merge.
+# They equal the list functions' running float sums whenever those are exact,
+# as with the whole-rupee prices of the sales files; otherwise they are the
+# correctly rounded total, which the running sum can miss in the last bits.
+
+class SalesAggregator:
+
+    def __init__(self, heavy_hitter_capacity=None, sketch_precision=None, quantile_accuracy=0.01,
+                 memory_budget=None):
+        self.total_revenue = 0
+        self.transaction_count = 0
+        self.regions = {}
+        self.products = {}
+        self.customers = {}
+        self.daily = {}
+
+        # exact sums behind total_revenue and the per-group revenue fields
+        self._scale = 0
+        self._revenue = 0
+        self._region_sales = {}
+        self._product_revenue = {}
+        self._customer_spent = {}
+        self._daily_revenue = {}
+        self._unsettled = False
+
+        # API enrichment stats, tracked when rows carry an API_Match flag
+        self.enrichment_checked = 0
+        self.enriched_count = 0
+        self.failed_products = set()
+
+        # optional Space-Saving sketches (products by quantity, customers by spend)
+        self.product_hitters = None
+        self.customer_hitters = None
+        if heavy_hitter_capacity:
+            self.product_hitters = SpaceSaving(heavy_hitter_capacity)
+            self.customer_hitters = SpaceSaving(heavy_hitter_capacity)
+
+        # optional sketch mode: per-day customer sets become HyperLogLogs, and
+        # distinct customers per region/product plus order-value quantiles per
+        # region are tracked with mergeable sketches
+        self.sketch_precision = sketch_precision
+        self.quantile_accuracy = quantile_accuracy
+        self.region_customers = {}
+        self.product_customers = {}
+        self.region_order_values = {}
+
+        # optional out-of-core customer/product group-bys: with a memory budget
+        # (bytes) they are kept by a SpillingGroupBy instead of the dicts below
+        self.groups = SpillingGroupBy(memory_budget) if memory_budget else None
+
+    # daily unique customers are HyperLogLog estimates when sketching
+    @property
+    def approximate_customers(self):
+        return bool(self.sketch_precision)
+
+    def _distinct(self):
+        if self.sketch_precision:
+            return HyperLogLog(self.sketch_precision)
+        return set()
+
+    def add(self, t):
+        region = t["Region"]
+        name = t["ProductName"]
+        cid = t["CustomerID"]
+        date = t["Date"]
+        qty = t["Quantity"]
+        amount = qty * t["UnitPrice"]
+
+        numerator, denominator = amount.as_integer_ratio()
+        bits = denominator.bit_length() - 1
+        if bits > self._scale:
+            self._rescale(bits)
+        exact = numerator << (self._scale - bits)
+
+        self._revenue += exact
+        self._unsettled = True
+        self.transaction_count += 1
+
+        if region not in self.regions:
+            self.regions[region] = {"total_sales": 0, "transaction_count": 0}
+            self._region_sales[region] = 0
+        self._region_sales[region] += exact
+        self.regions[region]["transaction_count"] += 1
+
+        if self.groups is not None:
+            self.groups.add(cid, name, qty, amount)
+        else:
+            if name not in self.products:
+                self.products[name] = {"qty": 0, "revenue": 0}
+                self._product_revenue[name] = 0
+            self.products[name]["qty"] += qty
+            self._product_revenue[name] += exact
+
+            if cid not in self.customers:
+                self.customers[cid] = {"total_spent": 0, "purchase_count": 0, "products": set()}
+                self._customer_spent[cid] = 0
+            self._customer_spent[cid] += exact
+            self.customers[cid]["purchase_count"] += 1
+            self.customers[cid]["products"].add(name)
+
+        if date not in self.daily:
+            self.daily[date] = {"revenue": 0, "transaction_count": 0, "customers": self._distinct()}
+            self._daily_revenue[date] = 0
+        self._daily_revenue[date] += exact
+        self.daily[date]["transaction_count"] += 1
+        self.daily[date]["customers"].add(cid)
+
+        if self.sketch_precision:
+            if region not in self.region_customers:
+                self.region_customers[region] = HyperLogLog(self.sketch_precision)
+                self.region_order_values[region] = QuantileSketch(self.quantile_accuracy)
+            self.region_customers[region].add(cid)
+            self.region_order_values[region].add(amount)
+
+            if name not in self.product_customers:
+                self.product_customers[name] = HyperLogLog(self.sketch_precision)
+            self.product_customers[name].add(cid)
+
+        if self.product_hitters is not None:
+            self.product_hitters.update(name, qty)
+            self.customer_hitters.update(cid, amount)
+
+        if "API_Match" in t:
+            self.enrichment_checked += 1
+            if t["API_Match"]:
+                self.enriched_count += 1
+            else:
+                self.failed_products.add(name)
+
+    def update(self, transactions):
+        for t in transactions:
+            self.add(t)
+        self._settle()
+        return self
+
+    def _exact_sums(self):
+        return ((self.regions, self._region_sales, "total_sales"),
+                (self.products, self._product_revenue, "revenue"),
+                (self.customers, self._customer_spent, "total_spent"),
+                (self.daily, self._daily_revenue, "revenue"))
+
+    def _rescale(self, scale):
+        shift = scale - self._scale
+        self._revenue <<= shift
+        for _, sums, _ in self._exact_sums():
+            for key in sums:
+                sums[key] <<= shift
+        self._scale = scale
+
+    def _settle(self):
+        if not self._unsettled:
+            return
+        self._unsettled = False
+
+        one = 1 << self._scale
+        self.total_revenue = self._revenue / one
+        for groups, sums, field in self._exact_sums():
+            for key, exact in sums.items():
+                groups[key][field] = exact / one
+
+    # Fold another aggregator's partial results into this one. Keys first seen
+    # in `other` are appended, so merging partials in input order keeps the
+    # same first-appearance order as a serial pass, and the exact sums make
+    # the totals independent of how the rows were split.
+    def merge(self, other):
+        if self.groups is not None or other.groups is not None:
+            raise ValueError("Aggregators with a memory budget cannot be merged")
+        if self._options() != other._options():
+            raise ValueError("Aggregators built with different sketch options cannot be merged")
+
+        if other._scale > self._scale:
+            self._rescale(other._scale)
+        shift = self._scale - other._scale
+
+        self._revenue += other._revenue << shift
+        self._unsettled = True
+        self.transaction_count += other.transaction_count
+
+        for region, data in other.regions.items():
+            if region not in self.regions:
+                self.regions[region] = {"total_sales": 0, "transaction_count": 0}
+                self._region_sales[region] = 0
+            self._region_sales[region] += other._region_sales[region] << shift
+            self.regions[region]["transaction_count"] += data["transaction_count"]
+
+        for name, data in other.products.items():
+            if name not in self.products:
+                self.products[name] = {"qty": 0, "revenue": 0}
+                self._product_revenue[name] = 0
+            self._product_revenue[name] += other._product_revenue[name] << shift
+            self.products[name]["qty"] += data["qty"]
+
+        for cid, data in other.customers.items():
+            if cid not in self.customers:
+                self.customers[cid] = {"total_spent": 0, "purchase_count": 0, "products": set()}
+                self._customer_spent[cid] = 0
+            self._customer_spent[cid] += other._customer_spent[cid] << shift
+            self.customers[cid]["purchase_count"] += data["purchase_count"]
+            self.customers[cid]["products"] |= data["products"]
+
+        for date, data in other.daily.items():
+            if date not in self.daily:
+                self.daily[date] = {"revenue": 0, "transaction_count": 0, "customers": self._distinct()}
+                self._daily_revenue[date] = 0
+            self._daily_revenue[date] += other._daily_revenue[date] << shift
+            self.daily[date]["transaction_count"] += data["transaction_count"]
+            self.daily[date]["customers"] |= data["customers"]
+
+        self.enrichment_checked += other.enrichment_checked
+        self.enriched_count += other.enriched_count
+        self.failed_products |= other.failed_products
+
+        if self.product_hitters is not None and other.product_hitters is not None:
+            self.product_hitters.merge(other.product_hitters)
+            self.customer_hitters.merge(other.customer_hitters)
+
+        for sketches, other_sketches in ((self.region_customers, other.region_customers),
+                                         (self.product_customers, other.product_customers),
+                                         (self.region_order_values, other.region_order_values)):
+            for key, sketch in other_sketches.items():
+                if key in sketches:
+                    sketches[key].merge(sketch)
+                else:
+                    # a copy, so updating one aggregator never changes the other
+                    sketches[key] = type(sketch).from_state(sketch.to_state())
+
+        self._settle()
+        return self
+
+    def _options(self):
+        return {
+            "heavy_hitter_capacity": self.product_hitters.capacity if self.product_hitters is not None else None,
+            "sketch_precision": self.sketch_precision,
+            "quantile_accuracy": self.quantile_accuracy
+        }
+
+    # JSON-friendly snapshot of every accumulator (sets become lists, sketches
+    # their own state dicts)
+    def to_state(self):
+        if self.groups is not None:
+            raise ValueError("Aggregators with a memory budget cannot be saved")
+        self._settle()
+
+        if self.sketch_precision:
+            distinct_state = HyperLogLog.to_state
+        else:
+            distinct_state = list
+
+        state = {
+            "options": self._options(),
+            "total_revenue": self.total_revenue,
+            "transaction_count": self.transaction_count,
+            "regions": self.regions,
+            "products": self.products,
+            "customers": {
+                cid: dict(data, products=list(data["products"]))
+                for cid, data in self.customers.items()
+            },
+            "daily": {
+                date: dict(data, customers=distinct_state(data["customers"]))
+                for date, data in self.daily.items()
+            },
+            "exact_sums": {
+                "scale": self._scale,
+                "total_revenue": self._revenue,
+                "regions": self._region_sales,
+                "products": self._product_revenue,
+                "customers": self._customer_spent,
+                "daily": self._daily_revenue
+            },
+            "enrichment_checked": self.enrichment_checked,
+            "enriched_count": self.enriched_count,
+            "failed_products": list(self.failed_products)
+        }
+
+        if self.sketch_precision:
+            state["region_customers"] = {k: v.to_state() for k, v in self.region_customers.items()}
+            state["product_customers"] = {k: v.to_state() for k, v in self.product_customers.items()}
+            state["region_order_values"] = {k: v.to_state() for k, v in self.region_order_values.items()}
+        if self.product_hitters is not None:
+            state["product_hitters"] = self.product_hitters.to_state()
+            state["customer_hitters"] = self.customer_hitters.to_state()
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        results = cls(**state.get("options", {}))
+        if results.sketch_precision:
+            distinct = HyperLogLog.from_state
+        else:
+            distinct = set
+
+        results.total_revenue = state["total_revenue"]
+        results.transaction_count = state["transaction_count"]
+        results.regions = state["regions"]
+        results.products = state["products"]
+        results.customers = {
+            cid: dict(data, products=set(data["products"]))
+            for cid, data in state["customers"].items()
+        }
+        results.daily = {
+            date: dict(data, customers=distinct(data["customers"]))
+            for date, data in state["daily"].items()
+        }
+
+        sums = state["exact_sums"]
+        results._scale = sums["scale"]
+        results._revenue = sums["total_revenue"]
+        results._region_sales = dict(sums["regions"])
+        results._product_revenue = dict(sums["products"])
+        results._customer_spent = dict(sums["customers"])
+        results._daily_revenue = dict(sums["daily"])
+
+        results.enrichment_checked = state["enrichment_checked"]
+        results.enriched_count = state["enriched_count"]
+        results.failed_products = set(state["failed_products"])
+
+        if results.sketch_precision:
+            results.region_customers = {k: HyperLogLog.from_state(v) for k, v in state["region_customers"].items()}
+            results.product_customers = {k: HyperLogLog.from_state(v) for k, v in state["product_customers"].items()}
+            results.region_order_values = {k: QuantileSketch.from_state(v)
+                                           for k, v in state["region_order_values"].items()}
+        if results.product_hitters is not None:
+            results.product_hitters = SpaceSaving.from_state(state["product_hitters"])
+            results.customer_hitters = SpaceSaving.from_state(state["customer_hitters"])
+        return results
+
+    def calculate_total_revenue(self):
+        self._settle()
+        return self.total_revenue
+
+    def region_wise_sales(self):
+        self._settle()
+        region_data = {}
+
+        for region, data in self.regions.items():
+            percent = (data["total_sales"] / self.total_revenue) * 100
+            region_data[region] = {
+                "total_sales": data["total_sales"],
+                "transaction_count": data["transaction_count"],
+                "percentage": round(percent, 2)
+            }
+
+        return dict(sorted(region_data.items(),
+                           key=lambda x: x[1]["total_sales"],
+                           reverse=True))
+
+    def top_selling_products(self, n=5):
+        self._settle()
+        if self.groups is not None:
+            return self.groups.top_selling_products(n)
+
+        result = ((name, data["qty"], data["revenue"])
+                  for name, data in self.products.items())
+
+        return top_n(result, n, key=lambda x: x[1])
+
+    def top_customers(self, n=5):
+        self._settle()
+        if self.groups is not None:
+            return self.groups.top_customers(n)
+
+        result = ((cid, data["total_spent"], data["purchase_count"])
+                  for cid, data in self.customers.items())
+
+        return top_n(result, n, key=lambda x: x[1])
+
+    # Sketch mode only: approximate distinct customers and order-value quantiles
+
+    def unique_customers_by_region(self):
+        return {region: len(sketch) for region, sketch in self.region_customers.items()}
+
+    def unique_customers_by_product(self):
+        return {name: len(sketch) for name, sketch in self.product_customers.items()}
+
+    def order_value_quantiles(self):
+        return {
+            region: {"median": sketch.quantile(0.5), "p95": sketch.quantile(0.95)}
+            for region, sketch in self.region_order_values.items()
+        }
+
+    def heavy_hitter_products(self, n=5):
+        return self.product_hitters.top(n)
+
+    def heavy_hitter_customers(self, n=5):
+        return self.customer_hitters.top(n)
+
+    def customer_analysis(self):
+        self._settle()
+        if self.groups is not None:
+            return self.groups.customer_analysis()
+
+        result = {}
+
+        for cid, data in self.customers.items():
+            avg = data["total_spent"] / data["purchase_count"]
+
+            result[cid] = {
+                "total_spent": data["total_spent"],
+                "purchase_count": data["purchase_count"],
+                "avg_order_value": round(avg, 2),
+                "products_bought": list(data["products"])
+            }
+
+        return dict(sorted(result.items(),
+                           key=lambda x: x[1]["total_spent"],
+                           reverse=True))
+
+    def daily_sales_trend(self):
+        self._settle()
+        result = {}
+        for date in sorted(self.daily):
+            result[date] = {
+                "revenue": self.daily[date]["revenue"],
+                "transaction_count": self.daily[date]["transaction_count"],
+                "unique_customers": len(self.daily[date]["customers"])
+            }
+
+        return result
+
+    def find_peak_sales_day(self):
+        max_date = None
+        max_revenue = 0
+        max_count = 0
+
+        for date, data in self.daily_sales_trend().items():
+            if data["revenue"] > max_revenue:
+                max_revenue = data["revenue"]
+                max_date = date
+                max_count = data["transaction_count"]
+
+        return (max_date, max_revenue, max_count)
+
+    def low_performing_products(self, threshold=10):
+        self._settle()
+        if self.groups is not None:
+            return self.groups.low_performing_products(threshold)
+
+        result = [(name, data["qty"], data["revenue"])
+                  for name, data in self.products.items()
+                  if data["qty"] < threshold]
+
+        result.sort(key=lambda x: x[1])
+        return result
+
+    def close(self):
+        if self.groups is not None:
+            self.groups.close()
+
+
+@memoized
+def aggregate(transactions, heavy_hitter_capacity=None, sketch_precision=None):
+    return SalesAggregator(heavy_hitter_capacity, sketch_precision).update(transactions)
@@ -0,0 +1,288 @@
+# pip install numpy
+import math
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+DEFAULT_CAPACITY = 1000000
+DEFAULT_ERROR_RATE = 0.001
+GROWTH = 2
+TIGHTENING = 0.5
+BATCH_ROWS = 10000
+SPILL_ROWS = 100000
+
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+# Bloom filter over Python's string hash
+#
+# IDs are checked and added a batch at a time: hash() gives h1 per ID, a
+# multiply/xor-shift of it gives h2, and the k bit positions are
+# h1 + i * h2 (double hashing) computed for the whole batch in numpy. str
+# hashes are salted per process, so a filter is only meaningful inside the
+# process that built it, which is all the streaming dedup needs.
+
+class BloomFilter:
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, h1, h2):
+        steps = np.arange(self.hashes, dtype=np.uint64)
+        return (h1[:, None] + steps * h2[:, None]) % np.uint64(self.size)
+
+    def contains(self, h1, h2):
+        pos = self._positions(h1, h2)
+        hits = (self.bits[pos >> np.uint64(3)] >> (pos & np.uint64(7)).astype(np.uint8)) & 1
+        return hits.all(axis=1)
+
+    def add(self, h1, h2):
+        pos = self._positions(h1, h2).ravel()
+        np.bitwise_or.at(self.bits, pos >> np.uint64(3),
+                         np.left_shift(1, (pos & np.uint64(7)).astype(np.uint8)).astype(np.uint8))
+        self.count += len(h1)
+
+
+# Scalable Bloom filter: when the current filter reaches its capacity a new
+# one twice as large is added with half the error rate, so the combined
+# false-positive rate stays under `error_rate` however many IDs arrive, and
+# memory grows with the data (about 1.8 bytes per ID at 0.1%).
+
+class ScalableBloomFilter:
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        self.filters = [BloomFilter(capacity, error_rate * (1 - TIGHTENING))]
+
+    def contains(self, h1, h2):
+        found = np.zeros(len(h1), dtype=bool)
+        for bloom in self.filters:
+            found |= bloom.contains(h1, h2)
+        return found
+
+    def add(self, h1, h2):
+        while len(h1):
+            last = self.filters[-1]
+            room = last.capacity - last.count
+            if room <= 0:
+                self.filters.append(BloomFilter(last.capacity * GROWTH, last.error_rate * TIGHTENING))
+                continue
+            last.add(h1[:room], h2[:room])
+            h1, h2 = h1[room:], h2[room:]
+
+    @property
+    def nbytes(self):
+        return sum(bloom.bits.nbytes for bloom in self.filters)
+
+
+def _transaction_ids(batch):
+    # Transaction records expose fields as attributes, which is cheaper than
+    # their mapping interface; dict rows only have the latter
+    try:
+        return [tx.TransactionID for tx in batch]
+    except AttributeError:
+        return [tx["TransactionID"] for tx in batch]
+
+
+def _hashes(ids):
+    h1 = np.array([hash(tid) for tid in ids], dtype=np.int64).view(np.uint64)
+    h2 = h1 * _MIX
+    h2 ^= h2 >> np.uint64(29)
+    return h1, h2 | np.uint64(1)
+
+
+# Spilled ID index
+#
+# Exact set of IDs kept as sorted runs of fixed-width bytes in .npy files
+# under a temporary directory and read back memory-mapped, so lookups page
+# from disk instead of holding every ID in memory. Small runs are merged
+# binary-counter style (each run at least twice the next), keeping the run
+# count logarithmic; runs that reach MAX_MERGE_ROWS are left alone so a merge
+# never needs more than that much memory.
+
+MAX_MERGE_ROWS = 4000000
+
+
+class SpilledIdIndex:
+
+    def __init__(self, directory=None):
+        self.owns_directory = directory is None
+        self.directory = tempfile.mkdtemp(prefix="sales-ids-") if directory is None else directory
+        self.runs = []
+        self._next = 0
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def add(self, ids):
+        run = np.sort(np.array([tid.encode("utf-8") for tid in ids], dtype=bytes))
+        while self.runs and len(self.runs[-1]) <= len(run) * 2 and len(self.runs[-1]) + len(run) <= MAX_MERGE_ROWS:
+            # both halves are sorted, which the stable (run-merging) sort exploits
+            run = np.sort(np.concatenate([np.asarray(self.runs.pop()), run]), kind="stable")
+        self.runs.append(self._save(run))
+        self._cleanup()
+
+    def _save(self, run):
+        path = os.path.join(self.directory, f"run-{self._next}.npy")
+        self._next += 1
+        np.save(path, run)
+        return np.load(path, mmap_mode="r")
+
+    def _cleanup(self):
+        live = {os.path.basename(run.filename) for run in self.runs}
+        for name in os.listdir(self.directory):
+            if name.startswith("run-") and name not in live:
+                os.remove(os.path.join(self.directory, name))
+
+    def contains(self, ids):
+        keys = np.array([tid.encode("utf-8") for tid in ids], dtype=bytes)
+        found = np.zeros(len(keys), dtype=bool)
+        if not len(keys):
+            return found
+        lengths = np.char.str_len(keys)
+
+        for run in self.runs:
+            # a key wider than the run cannot be in it (and must not be truncated)
+            fits = lengths <= run.dtype.itemsize
+            candidates = keys[fits].astype(run.dtype)
+            positions = np.minimum(np.searchsorted(run, candidates), len(run) - 1)
+            found[fits] |= run[positions] == candidates
+        return found
+
+    def close(self):
+        self.runs = []
+        if self.owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# Duplicate TransactionID detection
+#
+# mark(ids) records a batch of IDs and flags the ones seen before (earlier in
+# the batch or in any earlier batch). New IDs are almost always answered by
+# the Bloom filter alone; "maybe seen" answers (real duplicates and rare
+# false positives) are confirmed exactly, in one vectorised lookup per
+# batch, against the IDs already spilled to the index. IDs not spilled yet
+# are kept in a set of at most `spill_rows` entries, so every earlier ID is
+# visible and memory stays bounded.
+
+class DuplicateFilter:
+
+    def __init__(self, directory=None, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE,
+                 batch_rows=BATCH_ROWS, spill_rows=SPILL_ROWS):
+        self.bloom = ScalableBloomFilter(capacity, error_rate)
+        self.index = SpilledIdIndex(directory)
+        self.batch_rows = batch_rows
+        self.spill_rows = spill_rows
+        self.pending = set()
+
+        self.ids = 0
+        self.duplicates = 0
+        self.false_positives = 0
+
+    def mark(self, ids):
+        if not ids:
+            return []
+
+        h1, h2 = _hashes(ids)
+        maybe = self.bloom.contains(h1, h2)
+
+        pending = self.pending
+        stored = set()
+        if maybe.any():
+            candidates = [ids[i] for i in np.flatnonzero(maybe) if ids[i] not in pending]
+            stored = {tid for tid, hit in zip(candidates, self.index.contains(candidates)) if hit}
+
+        if len(set(ids)) == len(ids):
+            # no repeats inside the batch: an ID that missed the Bloom filter
+            # is new, so only the "maybe" positions need looking at
+            flags = [False] * len(ids)
+            for i in np.flatnonzero(maybe).tolist():
+                if ids[i] in pending or ids[i] in stored:
+                    flags[i] = True
+                else:
+                    self.false_positives += 1
+            new = np.flatnonzero(~maybe)
+            if True in flags:
+                pending.update(tid for tid, duplicate in zip(ids, flags) if not duplicate)
+            else:
+                pending.update(ids)
+        else:
+            maybe = maybe.tolist()
+            flags = []
+            new = []
+            for i, tid in enumerate(ids):
+                if tid in pending or tid in stored:
+                    flags.append(True)
+                    continue
+
+                if maybe[i]:
+                    self.false_positives += 1
+                else:
+                    new.append(i)
+
+                pending.add(tid)
+                flags.append(False)
+
+        if len(new):
+            self.bloom.add(h1[new], h2[new])
+
+        duplicates = sum(flags)
+        self.duplicates += duplicates
+        self.ids += len(ids) - duplicates
+
+        if len(pending) >= self.spill_rows:
+            self.flush()
+        return flags
+
+    def seen(self, transaction_id):
+        return self.mark([transaction_id])[0]
+
+    def flush(self):
+        if self.pending:
+            self.index.add(self.pending)
+            self.pending.clear()
+
+    def unique(self, transactions):
+        kept = []
+        for start in range(0, len(transactions), self.batch_rows):
+            batch = transactions[start:start + self.batch_rows]
+            flags = self.mark(_transaction_ids(batch))
+            kept.extend(tx for tx, duplicate in zip(batch, flags) if not duplicate)
+        return kept
+
+    def iter_unique(self, transactions, summary=None):
+        # buffers batch_rows rows at a time; order is preserved
+        batch = []
+        for tx in transactions:
+            batch.append(tx)
+            if len(batch) >= self.batch_rows:
+                yield from self._emit(batch, summary)
+                batch = []
+        if batch:
+            yield from self._emit(batch, summary)
+
+    def _emit(self, batch, summary):
+        flags = self.mark(_transaction_ids(batch))
+        if summary is not None:
+            summary["duplicates"] = summary.get("duplicates", 0) + sum(flags)
+        return [tx for tx, duplicate in zip(batch, flags) if not duplicate]
+
+    def stats(self):
+        return {
+            "ids": self.ids,
+            "duplicates": self.duplicates,
+            "false_positives": self.false_positives,
+            "bloom_bytes": self.bloom.nbytes,
+            "bloom_filters": len(self.bloom.filters)
+        }
+
+    def close(self):
+        self.pending.clear()
+        self.index.close()
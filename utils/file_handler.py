@@ -1,7 +1,18 @@
+import gc
+import hashlib
+import mmap
+import os
+import time
+from sys import intern
+
+
+ENCODINGS = ["utf-8", "latin-1", "cp1252"]
+FINGERPRINT_BLOCK = 65536
+
+
 def read_sales_data(filename):
-    encodings = ["utf-8", "latin-1", "cp1252"]
 
-    for enc in encodings:
+    for enc in ENCODINGS:
         try:
             with open(filename, "r", encoding=enc) as file:
                 lines = file.readlines()
@@ -27,56 +38,282 @@ def read_sales_data(filename):
     return []
 
 
-def parse_transactions(raw_lines):
+# Fingerprint of the first `offset` bytes: the head block plus the block just
+# before `offset`. A truncated or rewritten file will not match.
 
-    transactions = []
+def file_fingerprint(filename, offset, block_size=FINGERPRINT_BLOCK):
+    digest = hashlib.sha256()
+    digest.update(str(offset).encode())
 
-    for line in raw_lines:
-        fields = line.split('|')
+    with open(filename, "rb") as file:
+        digest.update(file.read(min(block_size, offset)))
 
-        # Skip incorrect number of fields
-        if len(fields) != 8:
-            continue
+        tail_start = max(0, offset - block_size)
+        file.seek(tail_start)
+        digest.update(file.read(offset - tail_start))
+
+    return digest.hexdigest()
+
+
+# Streaming mode: yield cleaned lines one at a time instead of readlines()
 
-        transaction_id = fields[0]
-        date = fields[1]
-        product_id = fields[2]
-        product_name = fields[3]
-        quantity = fields[4]
-        unit_price = fields[5]
-        customer_id = fields[6]
-        region = fields[7]
+def detect_encoding(filename, sample_size=65536):
+    with open(filename, "rb") as file:
+        sample = file.read(sample_size)
 
-        # Clean commas in product name
-        product_name = product_name.replace(",", "")
+    return sample_encoding(sample, truncated=len(sample) == sample_size)
 
-        # Clean numeric fields
-        quantity = quantity.replace(",", "")
-        unit_price = unit_price.replace(",", "")
 
+def sample_encoding(sample, truncated=False):
+    for enc in ENCODINGS:
         try:
-            quantity = int(quantity)
-            unit_price = float(unit_price)
-        except:
+            sample.decode(enc)
+            return enc
+        except UnicodeDecodeError as e:
+            # A multi-byte character cut off by the sample boundary is fine
+            if e.reason == "unexpected end of data" and truncated:
+                return enc
             continue
 
-        transaction = {
-            "TransactionID": transaction_id,
-            "Date": date,
-            "ProductID": product_id,
-            "ProductName": product_name,
-            "Quantity": quantity,
-            "UnitPrice": unit_price,
-            "CustomerID": customer_id,
-            "Region": region
-        }
+    return None
+
+
+def iter_sales_data(filename, offset=0, encoding=None, progress=None, complete_lines_only=False, end=None):
+    # offset > 0 resumes mid-file (no header to skip) and `end` stops before the
+    # line starting at that byte; `progress` receives the detected encoding and
+    # the byte offset just past the last line yielded
+    if progress is None:
+        progress = {}
+
+    try:
+        if encoding is None:
+            encoding = detect_encoding(filename)
+    except FileNotFoundError:
+        print("File not found:", filename)
+        return
+
+    if encoding is None:
+        print("Unable to read file with supported encodings")
+        return
+
+    progress["encoding"] = encoding
+    progress["offset"] = offset
+
+    with open(filename, "rb") as file:
+        file.seek(offset)
+
+        if offset == 0:
+            file.readline()   # skip header
+            progress["offset"] = file.tell()
+
+        for raw in file:
+            if end is not None and progress["offset"] >= end:
+                break
+
+            # A trailing line without newline may still be mid-write
+            if complete_lines_only and not raw.endswith(b"\n"):
+                break
+
+            progress["offset"] += len(raw)
+
+            try:
+                line = raw.decode(encoding)
+            except UnicodeDecodeError:
+                line = raw.decode("latin-1")
+
+            line = line.strip()
+            if line != "":
+                yield line
+
+
+# Compact transaction record
+#
+# A __slots__ object instead of a per-row dict. It supports the read-only
+# mapping interface (t["Field"], get, keys, items, `in`) used throughout
+# data_processor.py and report_generator.py; copy() returns a plain dict for
+# callers that need to add fields.
+
+TRANSACTION_FIELDS = ("TransactionID", "Date", "ProductID", "ProductName",
+                      "Quantity", "UnitPrice", "CustomerID", "Region")
+_FIELD_SET = frozenset(TRANSACTION_FIELDS)
+
+
+class Transaction:
+    __slots__ = TRANSACTION_FIELDS
+
+    def __init__(self, transaction_id, date, product_id, product_name,
+                 quantity, unit_price, customer_id, region):
+        self.TransactionID = transaction_id
+        self.Date = date
+        self.ProductID = product_id
+        self.ProductName = product_name
+        self.Quantity = quantity
+        self.UnitPrice = unit_price
+        self.CustomerID = customer_id
+        self.Region = region
+
+    def __getitem__(self, key):
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
 
-        transactions.append(transaction)
+    def __setitem__(self, key, value):
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in _FIELD_SET
+
+    def __iter__(self):
+        return iter(TRANSACTION_FIELDS)
+
+    def __len__(self):
+        return len(TRANSACTION_FIELDS)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in _FIELD_SET else default
+
+    def keys(self):
+        return list(TRANSACTION_FIELDS)
+
+    def values(self):
+        return [getattr(self, field) for field in TRANSACTION_FIELDS]
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in TRANSACTION_FIELDS]
+
+    def copy(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, (Transaction, dict)):
+            return self.items() == list(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.copy())
+
+
+def parse_line(line):
+    fields = line.split('|')
+
+    # Skip incorrect number of fields
+    if len(fields) != 8:
+        return None
+
+    transaction_id = fields[0]
+    date = fields[1]
+    product_id = fields[2]
+    product_name = fields[3]
+    quantity = fields[4]
+    unit_price = fields[5]
+    customer_id = fields[6]
+    region = fields[7]
+
+    # Clean commas in product name
+    product_name = product_name.replace(",", "")
+
+    # Clean numeric fields
+    quantity = quantity.replace(",", "")
+    unit_price = unit_price.replace(",", "")
+
+    try:
+        quantity = int(quantity)
+        unit_price = float(unit_price)
+    except:
+        return None
+
+    # Categorical fields repeat across millions of rows: share one string each
+    return Transaction(
+        transaction_id,
+        intern(date),
+        intern(product_id),
+        intern(product_name),
+        quantity,
+        unit_price,
+        intern(customer_id),
+        intern(region)
+    )
+
+
+def parse_transactions(raw_lines):
+
+    transactions = []
+
+    for line in raw_lines:
+        transaction = parse_line(line)
+
+        if transaction is not None:
+            transactions.append(transaction)
 
     return transactions
 
 
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+def iter_parse_transactions(raw_lines):
+    for line in raw_lines:
+        transaction = parse_line(line)
+
+        if transaction is not None:
+            yield transaction
+
+
+def is_valid_transaction(tx):
+    # Validation rules
+    if tx["Quantity"] <= 0 or tx["UnitPrice"] <= 0:
+        return False
+
+    if not tx["TransactionID"].startswith("T"):
+        return False
+
+    if not tx["ProductID"].startswith("P"):
+        return False
+
+    if not tx["CustomerID"].startswith("C"):
+        return False
+
+    return True
+
+
+def passes_filters(tx, region=None, min_amount=None, max_amount=None):
+    amount = tx["Quantity"] * tx["UnitPrice"]
+
+    # Apply filters
+    if region is not None and tx["Region"] != region:
+        return False
+
+    if min_amount is not None and amount < min_amount:
+        return False
+
+    if max_amount is not None and amount > max_amount:
+        return False
+
+    return True
+
+
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None, index=None, dedup=None):
+    # A TransactionIndex built over the same transactions answers from its
+    # precomputed partitions instead of rescanning (it has no notion of
+    # duplicates, so `dedup` takes the scanning path)
+    if index is not None and dedup is None:
+        print("Available regions:", index.regions)
+        print("Transaction amount range:", index.min_amount, "-", index.max_amount)
+
+        valid_transactions = index.query(region, min_amount, max_amount)
+        filter_summary = {
+            "total_input": index.total_input,
+            "invalid": index.invalid_count,
+            "filtered_by_region": region,
+            "filtered_by_amount": {
+                "min": min_amount,
+                "max": max_amount
+            },
+            "final_count": len(valid_transactions)
+        }
+        return valid_transactions, index.invalid_count, filter_summary
+
     valid_transactions = []
     invalid_count = 0
 
@@ -93,47 +330,211 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     print("Available regions:", list(regions))
     print("Transaction amount range:", min(amounts), "-", max(amounts))
 
-    for tx in transactions:
-        # Validation rules
-        if tx["Quantity"] <= 0 or tx["UnitPrice"] <= 0:
-            invalid_count += 1
-            continue
+    if dedup is not None:
+        # same rule as iter_validate_and_filter: dedup valid rows, then filter
+        checked = [tx for tx in transactions if is_valid_transaction(tx)]
+        invalid_count = total_input - len(checked)
+        unique = dedup.unique(checked)
+        duplicates = len(checked) - len(unique)
+        valid_transactions = [tx for tx in unique if passes_filters(tx, region, min_amount, max_amount)]
+    else:
+        for tx in transactions:
+            if not is_valid_transaction(tx):
+                invalid_count += 1
+                continue
+
+            if passes_filters(tx, region, min_amount, max_amount):
+                valid_transactions.append(tx)
 
-        if not tx["TransactionID"].startswith("T"):
-            invalid_count += 1
-            continue
+    filter_summary = {
+        "total_input": total_input,
+        "invalid": invalid_count,
+        "filtered_by_region": region,
+        "filtered_by_amount": {
+            "min": min_amount,
+            "max": max_amount
+        },
+        "final_count": len(valid_transactions)
+    }
+    if dedup is not None:
+        filter_summary["duplicates"] = duplicates
 
-        if not tx["ProductID"].startswith("P"):
-            invalid_count += 1
-            continue
+    return valid_transactions, invalid_count, filter_summary
 
-        if not tx["CustomerID"].startswith("C"):
-            invalid_count += 1
-            continue
 
-        amount = tx["Quantity"] * tx["UnitPrice"]
+# Fast path: read and parse straight from a memory-mapped file
+#
+# The encoding is detected once from a sample, fields are split as bytes and
+# the numeric columns go to int()/float() as bytes after dropping thousands
+# separators (bytes.replace is cheaper than testing for a comma first). Each
+# distinct categorical value is decoded and interned once. Skip rules match
+# parse_transactions: wrong field count or unparseable numbers.
+
+def read_transactions_mmap(filename, stats=None, sample_size=65536):
+    if stats is None:
+        stats = {}
+
+    start = time.perf_counter()
+
+    try:
+        file = open(filename, "rb")
+    except FileNotFoundError:
+        print("File not found:", filename)
+        return []
+
+    with file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return []
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            sample = mm[:sample_size]
+            encoding = sample_encoding(sample, truncated=len(sample) == sample_size)
+
+            if encoding is None:
+                print("Unable to read file with supported encodings")
+                return []
+
+            # millions of new acyclic objects would otherwise trigger repeated
+            # full garbage-collector passes over the growing list
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                transactions = _parse_mapped_lines(mm, encoding, stats)
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+
+    elapsed = time.perf_counter() - start
+    stats["encoding"] = encoding
+    stats["seconds"] = elapsed
+    stats["rows"] = len(transactions)
+    stats["rows_per_sec"] = len(transactions) / elapsed if elapsed > 0 else 0.0
+
+    print(f"Parsed {len(transactions)} rows in {elapsed:.2f}s ({stats['rows_per_sec']:,.0f} rows/sec)")
+    return transactions
+
+
+class _StringTable(dict):
+    # bytes -> interned str; hits are plain dict lookups, misses decode once
+
+    def __init__(self, encoding, transform=None):
+        super().__init__()
+        self.encoding = encoding
+        self.transform = transform
+
+    def decode(self, raw):
+        try:
+            return raw.decode(self.encoding)
+        except UnicodeDecodeError:
+            return raw.decode("latin-1")
 
-        # Apply filters
-        if region is not None and tx["Region"] != region:
+    def __missing__(self, raw):
+        value = self.decode(raw)
+        if self.transform is not None:
+            value = self.transform(value)
+        value = self[raw] = intern(value)
+        return value
+
+
+def _parse_mapped_lines(mm, encoding, stats):
+    strings = _StringTable(encoding)
+    names = _StringTable(encoding, lambda name: name.replace(",", ""))
+
+    transactions = []
+    append = transactions.append
+    lines = 0
+    skipped = 0
+
+    readline = mm.readline
+    readline()   # skip header
+
+    for line in iter(readline, b""):
+        line = line.strip()
+        if not line:
             continue
 
-        if min_amount is not None and amount < min_amount:
+        lines += 1
+        fields = line.split(b"|")
+
+        # Skip incorrect number of fields
+        if len(fields) != 8:
+            skipped += 1
             continue
 
-        if max_amount is not None and amount > max_amount:
+        try:
+            quantity = int(fields[4].replace(b",", b""))
+            unit_price = float(fields[5].replace(b",", b""))
+        except ValueError:
+            skipped += 1
             continue
 
-        valid_transactions.append(tx)
+        try:
+            transaction_id = fields[0].decode(encoding)
+        except UnicodeDecodeError:
+            transaction_id = fields[0].decode("latin-1")
+
+        append(Transaction(
+            transaction_id,
+            strings[fields[1]],
+            strings[fields[2]],
+            names[fields[3]],
+            quantity,
+            unit_price,
+            strings[fields[6]],
+            strings[fields[7]]
+        ))
+
+    stats["lines"] = lines
+    stats["skipped"] = skipped
+    return transactions
+
 
-    filter_summary = {
-        "total_input": total_input,
-        "invalid": invalid_count,
+# Streaming mode: validate and filter lazily, filling `summary` as rows go by
+
+def iter_validate_and_filter(transactions, region=None, min_amount=None, max_amount=None, summary=None,
+                             dedup=None):
+    if summary is None:
+        summary = {}
+
+    summary.update({
+        "total_input": 0,
+        "invalid": 0,
         "filtered_by_region": region,
         "filtered_by_amount": {
             "min": min_amount,
             "max": max_amount
         },
-        "final_count": len(valid_transactions)
-    }
+        "final_count": 0
+    })
+
+    if dedup is not None:
+        # duplicates are counted among valid rows, before the region/amount
+        # filters, so a re-sent row is dropped whichever filter it would match
+        summary["duplicates"] = 0
+        transactions = dedup.iter_unique(_iter_valid(transactions, summary), summary)
+        for tx in transactions:
+            if passes_filters(tx, region, min_amount, max_amount):
+                summary["final_count"] += 1
+                yield tx
+        return
 
-    return valid_transactions, invalid_count, filter_summary
+    for tx in transactions:
+        summary["total_input"] += 1
+
+        if not is_valid_transaction(tx):
+            summary["invalid"] += 1
+            continue
+
+        if passes_filters(tx, region, min_amount, max_amount):
+            summary["final_count"] += 1
+            yield tx
+
+
+def _iter_valid(transactions, summary):
+    for tx in transactions:
+        summary["total_input"] += 1
+
+        if is_valid_transaction(tx):
+            yield tx
+        else:
+            summary["invalid"] += 1
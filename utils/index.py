@@ -0,0 +1,75 @@
+from bisect import bisect_left, bisect_right
+
+from utils.file_handler import is_valid_transaction
+
+
+# Region / amount index over parsed transactions
+#
+# Built once after parsing. Valid rows are partitioned by region (plus one
+# partition holding every region), and each partition keeps its amounts
+# sorted next to the matching row positions, so a region + amount-range filter
+# is two bisects plus the k matching rows. The region list, amount range and
+# invalid count that validate_and_filter reports are computed here once.
+
+class TransactionIndex:
+
+    def __init__(self, transactions):
+        self.transactions = transactions
+        self.total_input = len(transactions)
+        self.invalid_count = 0
+
+        regions = set()
+        min_amount = None
+        max_amount = None
+        rows_by_region = {}
+        all_rows = []
+
+        for position, tx in enumerate(transactions):
+            amount = tx["Quantity"] * tx["UnitPrice"]
+            regions.add(tx["Region"])
+
+            if min_amount is None or amount < min_amount:
+                min_amount = amount
+            if max_amount is None or amount > max_amount:
+                max_amount = amount
+
+            if not is_valid_transaction(tx):
+                self.invalid_count += 1
+                continue
+
+            rows_by_region.setdefault(tx["Region"], []).append((amount, position))
+            all_rows.append((amount, position))
+
+        self.regions = list(regions)
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+
+        self._partitions = {region: self._partition(rows) for region, rows in rows_by_region.items()}
+        self._all = self._partition(all_rows)
+
+    @staticmethod
+    def _partition(rows):
+        ordered = [position for _, position in rows]
+        rows = sorted(rows)
+        return {
+            "ordered": ordered,
+            "amounts": [amount for amount, _ in rows],
+            "positions": [position for _, position in rows]
+        }
+
+    # Valid transactions matching the filters, in their original order
+    def query(self, region=None, min_amount=None, max_amount=None):
+        partition = self._all if region is None else self._partitions.get(region)
+        if partition is None:
+            return []
+
+        if min_amount is None and max_amount is None:
+            positions = partition["ordered"]
+        else:
+            amounts = partition["amounts"]
+            lo = bisect_left(amounts, min_amount) if min_amount is not None else 0
+            hi = bisect_right(amounts, max_amount) if max_amount is not None else len(amounts)
+            positions = sorted(partition["positions"][lo:hi])
+
+        transactions = self.transactions
+        return [transactions[position] for position in positions]
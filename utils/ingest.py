@@ -0,0 +1,234 @@
+import bz2
+import glob
+import gzip
+import os
+import queue
+import threading
+
+from utils.file_handler import read_sales_data, iter_sales_data, sample_encoding, file_fingerprint
+
+
+COMPRESSED_OPENERS = {".gz": gzip.open, ".bz2": bz2.open}
+MAGIC_OPENERS = [(b"\x1f\x8b", gzip.open), (b"BZh", bz2.open)]
+READER_THREADS = 4
+QUEUE_BATCHES = 8
+CHUNK_BYTES = 1 << 20
+SAMPLE_SIZE = 65536
+
+
+# Multi-file input
+#
+# --input may name one file, a directory (every regular file in it, sorted
+# by name) or a glob pattern (sorted matches). Files ending in .gz / .bz2 (or
+# starting with their magic bytes) are decompressed while streaming, never
+# to disk.
+
+def expand_inputs(path):
+    if os.path.isdir(path):
+        files = [os.path.join(path, name) for name in sorted(os.listdir(path))]
+        return [f for f in files if os.path.isfile(f)]
+
+    if glob.has_magic(path):
+        return [f for f in sorted(glob.glob(path)) if os.path.isfile(f)]
+
+    return [path]
+
+
+def _opener(filename):
+    opener = COMPRESSED_OPENERS.get(os.path.splitext(filename)[1].lower())
+    if opener is not None:
+        return opener
+
+    with open(filename, "rb") as file:
+        head = file.read(3)
+    for magic, opener in MAGIC_OPENERS:
+        if head.startswith(magic):
+            return opener
+    return open
+
+
+def is_plain_file(path):
+    # a single uncompressed file (or a missing one, which the plain readers report)
+    if os.path.isdir(path) or glob.has_magic(path):
+        return False
+    return not os.path.isfile(path) or _opener(path) is open
+
+
+def open_sales_file(filename):
+    return _opener(filename)(filename, "rb")
+
+
+def read_header(filename):
+    with open_sales_file(filename) as file:
+        sample = file.read(SAMPLE_SIZE)
+
+    encoding = sample_encoding(sample, truncated=len(sample) == SAMPLE_SIZE) or "latin-1"
+    return sample.split(b"\n", 1)[0].decode(encoding, errors="replace").strip(), encoding
+
+
+# Every non-empty file must start with the same header line; returns the
+# header and each file's detected encoding (empty files are dropped).
+
+def check_headers(files):
+    header = None
+    first_file = None
+    encodings = {}
+
+    for filename in files:
+        file_header, encoding = read_header(filename)
+        if file_header == "":
+            print("Skipping empty file:", filename)
+            continue
+
+        if header is None:
+            header = file_header
+            first_file = filename
+        elif file_header != header:
+            raise ValueError(f"Header mismatch: {filename} has '{file_header}', "
+                             f"expected '{header}' (from {first_file})")
+
+        encodings[filename] = encoding
+
+    return header, encodings
+
+
+def iter_file_lines(filename, encoding=None, chunk_bytes=CHUNK_BYTES):
+    # batches of cleaned lines (header skipped), like iter_sales_data but for
+    # any supported compression; whole chunks are decoded at once and only a
+    # chunk that fails falls back to the per-line latin-1 rule
+    if encoding is None:
+        encoding = read_header(filename)[1]
+
+    with open_sales_file(filename) as file:
+        file.readline()   # skip header
+
+        while True:
+            chunk = file.read(chunk_bytes)
+            if not chunk:
+                break
+            if not chunk.endswith(b"\n"):
+                chunk += file.readline()   # finish the last line
+
+            try:
+                raw_lines = chunk.decode(encoding).split("\n")
+            except UnicodeDecodeError:
+                raw_lines = [_decode_line(raw, encoding) for raw in chunk.split(b"\n")]
+
+            batch = [line for line in map(str.strip, raw_lines) if line != ""]
+            if batch:
+                yield batch
+
+
+def _decode_line(raw, encoding):
+    try:
+        return raw.decode(encoding)
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
+
+
+# Parallel readers
+#
+# Up to `readers` files are read and decompressed ahead by background threads
+# (zlib and bz2 release the GIL while decompressing), each into its own
+# bounded queue of line batches. The consumer drains the queues in file
+# order, so the combined stream is the files concatenated, and memory stays
+# bounded at about readers * queue_batches * CHUNK_BYTES of text.
+
+_DONE = object()
+
+
+def _read_into(filename, encoding, batches, stop):
+    try:
+        for batch in iter_file_lines(filename, encoding):
+            while not stop.is_set():
+                try:
+                    batches.put(batch, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if stop.is_set():
+                return
+        item = _DONE
+    except Exception as e:
+        item = e
+
+    while not stop.is_set():
+        try:
+            batches.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+def iter_sales_files(files, readers=READER_THREADS, queue_batches=QUEUE_BATCHES):
+    _, encodings = check_headers(files)
+    files = [f for f in files if f in encodings]
+
+    stop = threading.Event()
+    pending = list(files)
+    started = []
+
+    def start_next():
+        filename = pending.pop(0)
+        batches = queue.Queue(maxsize=queue_batches)
+        thread = threading.Thread(target=_read_into, args=(filename, encodings[filename], batches, stop),
+                                  daemon=True)
+        thread.start()
+        started.append((filename, batches))
+
+    try:
+        while pending and len(started) < readers:
+            start_next()
+
+        while started:
+            filename, batches = started.pop(0)
+            if pending:
+                start_next()
+
+            while True:
+                item = batches.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield from item
+    finally:
+        # lets readers blocked on a full queue exit if the consumer stops early
+        stop.set()
+
+
+# Entry points used by main.py: a single plain file keeps the original
+# readers; anything else goes through the multi-file reader.
+
+def read_inputs(path, readers=READER_THREADS):
+    if is_plain_file(path):
+        return read_sales_data(path)
+
+    files = expand_inputs(path)
+    if not files:
+        print("No input files match:", path)
+        return []
+    return list(iter_sales_files(files, readers))
+
+
+def iter_inputs(path, readers=READER_THREADS):
+    if is_plain_file(path):
+        return iter_sales_data(path)
+
+    files = expand_inputs(path)
+    if not files:
+        print("No input files match:", path)
+        return iter([])
+    return iter_sales_files(files, readers)
+
+
+# Identifies the current contents of an input (for caches keyed by it): path,
+# size, mtime and head/tail fingerprint of every file it expands to.
+
+def input_signature(path):
+    signature = []
+    for filename in expand_inputs(path):
+        stat = os.stat(filename)
+        signature.append((os.path.abspath(filename), stat.st_size, stat.st_mtime_ns,
+                          file_fingerprint(filename, stat.st_size)))
+    return tuple(signature)
@@ -0,0 +1,194 @@
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+METRIC_PREFIX = "sales_pipeline_stage"
+
+# (field, metric suffix, help text) exported for every stage
+PROMETHEUS_FIELDS = [
+    ("wall_seconds", "wall_seconds", "Wall-clock time spent in the stage"),
+    ("cpu_seconds", "cpu_seconds", "Process CPU time spent in the stage"),
+    ("peak_memory_bytes", "peak_memory_bytes", "Peak traced Python memory the stage allocated above its start"),
+    ("rows_in", "rows_in", "Rows passed into the stage"),
+    ("rows_out", "rows_out", "Rows produced by the stage"),
+    ("rows_per_sec", "rows_per_second", "Stage throughput in rows per second"),
+    ("calls", "calls", "Number of times the stage ran"),
+]
+
+
+# Per-stage pipeline instrumentation
+#
+# Each stage records wall time, CPU time, rows in/out and rows/sec, plus its
+# peak memory when tracing is on: the tracemalloc peak while it ran minus the
+# traced memory when it started, so memory still held by earlier stages is
+# not counted again. Stages may nest (a pipeline step around the individual
+# data_processor calls); a nested stage's peak also counts towards its
+# parent. A stage that runs more than once accumulates
+# into the same record. Stages named in `profile_stages` (or all of them with
+# "all") are run under cProfile and dumped to `profile_dir/<stage>.prof`.
+
+class PipelineMetrics:
+
+    def __init__(self, trace_memory=False, profile_stages=(), profile_dir="output/profiles"):
+        self.trace_memory = trace_memory
+        self.profile_stages = set(profile_stages)
+        self.profile_dir = profile_dir
+        self.stages = {}
+        self.started = time.time()
+
+        self._stack = []
+        self._profiling = False
+        self._started_tracing = False
+
+    def _should_profile(self, name):
+        return not self._profiling and ("all" in self.profile_stages or name in self.profile_stages)
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        # the yielded dict takes "rows_out" (and may override "rows_in")
+        record = {"rows_in": rows_in, "rows_out": None}
+        self._entry(name)   # stages are listed in the order they start
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            if self._stack:
+                parent = self._stack[-1]
+                parent["_peak"] = max(parent["_peak"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            record["_start"] = tracemalloc.get_traced_memory()[0]
+        record["_peak"] = 0
+        self._stack.append(record)
+
+        profiler = None
+        if self._should_profile(name):
+            profiler = cProfile.Profile()
+            self._profiling = True
+            profiler.enable()
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+
+            if profiler is not None:
+                profiler.disable()
+                self._profiling = False
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{name}.prof"))
+
+            self._stack.pop()
+            peak = None
+            if self.trace_memory:
+                # absolute peaks go up to the parent; the stage reports its growth
+                absolute_peak = max(record["_peak"], tracemalloc.get_traced_memory()[1])
+                tracemalloc.reset_peak()
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent["_peak"] = max(parent["_peak"], absolute_peak)
+                peak = max(0, absolute_peak - record["_start"])
+
+            self._record(name, wall, cpu, peak, record["rows_in"], record["rows_out"])
+
+    def call(self, name, func, *args, rows_in=None, **kwargs):
+        # rows in defaults to len() of the first argument and rows out to
+        # len() of the result, when those are row collections
+        if rows_in is None and args and hasattr(args[0], "__len__") and not isinstance(args[0], str):
+            rows_in = len(args[0])
+
+        with self.stage(name, rows_in) as record:
+            result = func(*args, **kwargs)
+            if hasattr(result, "__len__"):
+                record["rows_out"] = len(result)
+
+        return result
+
+    def _entry(self, name):
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = {
+                "wall_seconds": 0.0,
+                "cpu_seconds": 0.0,
+                "peak_memory_bytes": None,
+                "rows_in": None,
+                "rows_out": None,
+                "rows_per_sec": None,
+                "calls": 0
+            }
+        return entry
+
+    def _record(self, name, wall, cpu, peak, rows_in, rows_out):
+        entry = self._entry(name)
+        entry["wall_seconds"] += wall
+        entry["cpu_seconds"] += cpu
+        entry["calls"] += 1
+
+        if peak is not None:
+            entry["peak_memory_bytes"] = max(entry["peak_memory_bytes"] or 0, peak)
+        if rows_in is not None:
+            entry["rows_in"] = (entry["rows_in"] or 0) + rows_in
+        if rows_out is not None:
+            entry["rows_out"] = (entry["rows_out"] or 0) + rows_out
+
+        rows = entry["rows_in"] if entry["rows_in"] is not None else entry["rows_out"]
+        if rows is not None and entry["wall_seconds"] > 0:
+            entry["rows_per_sec"] = rows / entry["wall_seconds"]
+
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def to_dict(self):
+        return {
+            "started": self.started,
+            "trace_memory": self.trace_memory,
+            "stages": self.stages
+        }
+
+    def save_json(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def prometheus_text(self):
+        lines = []
+
+        for field, suffix, help_text in PROMETHEUS_FIELDS:
+            metric = f"{METRIC_PREFIX}_{suffix}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+
+            for name, entry in self.stages.items():
+                if entry[field] is not None:
+                    lines.append(f'{metric}{{stage="{_escape_label(name)}"}} {entry[field]}')
+
+        return "\n".join(lines) + "\n"
+
+    def save_prometheus(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.prometheus_text())
+
+    def summary_lines(self):
+        lines = []
+        for name, entry in self.stages.items():
+            line = f"{name:<28} {entry['wall_seconds']:>9.4f}s wall {entry['cpu_seconds']:>9.4f}s cpu"
+            if entry["peak_memory_bytes"] is not None:
+                line += f" {entry['peak_memory_bytes'] / 1024 / 1024:>9.2f} MB"
+            if entry["rows_per_sec"] is not None:
+                line += f" {entry['rows_per_sec']:>14,.0f} rows/sec"
+            lines.append(line)
+        return lines
+
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
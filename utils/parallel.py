@@ -0,0 +1,147 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.file_handler import detect_encoding, iter_sales_data, iter_parse_transactions, iter_validate_and_filter
+from utils.data_processor import SalesAggregator
+from utils.ingest import check_headers, iter_file_lines
+
+
+# Split the data section of the file (everything after the header) into
+# `shards` byte ranges whose boundaries fall on line starts.
+
+def split_file(filename, shards):
+    size = os.path.getsize(filename)
+
+    with open(filename, "rb") as file:
+        file.readline()   # skip header
+        data_start = file.tell()
+
+        boundaries = [data_start]
+        for i in range(1, shards):
+            pos = data_start + (size - data_start) * i // shards
+            if pos <= boundaries[-1]:
+                continue
+
+            # step back one byte so a boundary already on a line start is kept
+            file.seek(pos - 1)
+            file.readline()
+            pos = file.tell()
+
+            if boundaries[-1] < pos < size:
+                boundaries.append(pos)
+
+        boundaries.append(size)
+
+    return [(boundaries[i], boundaries[i + 1])
+            for i in range(len(boundaries) - 1)
+            if boundaries[i] < boundaries[i + 1]]
+
+
+def _process_shard(task):
+    filename, start, end, encoding, region, min_amount, max_amount, options = task
+
+    summary = {}
+    lines = iter_sales_data(filename, start, encoding, end=end)
+    transactions = iter_validate_and_filter(iter_parse_transactions(lines),
+                                            region, min_amount, max_amount, summary)
+    results = SalesAggregator(**options).update(transactions)
+
+    return results, summary
+
+
+# Parallel mode
+#
+# Each shard is read, parsed, validated and aggregated in its own process and
+# sends back only its partial SalesAggregator. The partials are merged in file
+# order, so key order, counts and distinct sets match the serial streaming
+# path, and the aggregator's exact sums make the revenue totals match too; the
+# parent's work grows with the number of groups, not rows.
+
+def parallel_aggregate(filename, workers=None, region=None, min_amount=None, max_amount=None,
+                       aggregator_options=None):
+    workers = workers or os.cpu_count() or 1
+    summary = _new_summary(region, min_amount, max_amount)
+
+    try:
+        encoding = detect_encoding(filename)
+    except FileNotFoundError:
+        print("File not found:", filename)
+        return SalesAggregator(), summary
+
+    if encoding is None:
+        print("Unable to read file with supported encodings")
+        return SalesAggregator(), summary
+
+    options = aggregator_options or {}
+    tasks = [(filename, start, end, encoding, region, min_amount, max_amount, options)
+             for start, end in split_file(filename, workers)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = _merge_partials(pool.map(_process_shard, tasks), summary, options)
+
+    return results, summary
+
+
+def _new_summary(region, min_amount, max_amount):
+    return {
+        "total_input": 0,
+        "invalid": 0,
+        "filtered_by_region": region,
+        "filtered_by_amount": {
+            "min": min_amount,
+            "max": max_amount
+        },
+        "final_count": 0
+    }
+
+
+def _merge_partials(partials, summary, options):
+    results = None
+
+    # the first shard's partial is the base the others are merged into
+    for partial, part_summary in partials:
+        if results is None:
+            results = partial
+        else:
+            results.merge(partial)
+        summary["total_input"] += part_summary.get("total_input", 0)
+        summary["invalid"] += part_summary.get("invalid", 0)
+        summary["final_count"] += part_summary.get("final_count", 0)
+
+    if results is None:
+        results = SalesAggregator(**options)
+    return results
+
+
+def _process_file(task):
+    filename, encoding, region, min_amount, max_amount, options = task
+
+    summary = {}
+    lines = (line for batch in iter_file_lines(filename, encoding) for line in batch)
+    transactions = iter_validate_and_filter(iter_parse_transactions(lines),
+                                            region, min_amount, max_amount, summary)
+    results = SalesAggregator(**options).update(transactions)
+
+    return results, summary
+
+
+# Multi-file parallel mode
+#
+# For a directory / glob / compressed input: one task per file (compressed
+# files cannot be split into byte ranges), merged in file order like the
+# shards above.
+
+def aggregate_files(files, workers=None, region=None, min_amount=None, max_amount=None,
+                    aggregator_options=None):
+    workers = workers or os.cpu_count() or 1
+    summary = _new_summary(region, min_amount, max_amount)
+    options = aggregator_options or {}
+
+    _, encodings = check_headers(files)
+    tasks = [(filename, encodings[filename], region, min_amount, max_amount, options)
+             for filename in files if filename in encodings]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = _merge_partials(pool.map(_process_file, tasks), summary, options)
+
+    return results, summary
@@ -0,0 +1,125 @@
+# pip install numpy
+
+import hashlib
+import json
+import os
+import shutil
+from sys import intern
+
+import numpy as np
+
+from utils.file_handler import (
+    iter_sales_data,
+    iter_parse_transactions,
+    is_valid_transaction,
+    file_fingerprint
+)
+from utils.columnar import TransactionColumns, CATEGORICAL_FIELDS
+
+
+DEFAULT_CACHE_DIR = ".cache/parsed"
+CACHE_VERSION = 1
+
+
+# Binary parsed-data cache
+#
+# Each source file gets a directory of .npy arrays (one per typed column, one
+# code array plus one string dictionary per categorical column, and the
+# validation mask) and a meta.json holding the source's path, size, mtime and
+# head/tail fingerprint. Arrays are opened with mmap_mode="r", so a warm load
+# only maps the files instead of decoding and splitting text again.
+
+def _entry_dir(filename, cache_dir):
+    key = hashlib.sha256(os.path.abspath(filename).encode()).hexdigest()[:32]
+    return os.path.join(cache_dir, key)
+
+
+def _source_meta(filename):
+    stat = os.stat(filename)
+    return {
+        "version": CACHE_VERSION,
+        "source": os.path.abspath(filename),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "fingerprint": file_fingerprint(filename, stat.st_size)
+    }
+
+
+def load_parsed_cache(filename, cache_dir=DEFAULT_CACHE_DIR):
+    entry = _entry_dir(filename, cache_dir)
+
+    try:
+        with open(os.path.join(entry, "meta.json"), "r", encoding="utf-8") as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    # stale entries are dropped as soon as the source no longer matches
+    if meta.get("source_meta") != _source_meta(filename):
+        shutil.rmtree(entry, ignore_errors=True)
+        return None
+
+    def load(name, mmap=True):
+        return np.load(os.path.join(entry, name + ".npy"), mmap_mode="r" if mmap else None)
+
+    try:
+        columns = TransactionColumns(
+            load("TransactionID"),
+            load("Quantity"),
+            load("UnitPrice"),
+            {field: load(field + ".codes") for field in CATEGORICAL_FIELDS},
+            {field: [intern(v) for v in load(field + ".values", mmap=False).tolist()]
+             for field in CATEGORICAL_FIELDS}
+        )
+        valid = load("valid")
+    except (OSError, ValueError) as e:
+        print("Ignoring unreadable parse cache:", e)
+        return None
+
+    return columns, valid
+
+
+def save_parsed_cache(filename, columns, valid, cache_dir=DEFAULT_CACHE_DIR):
+    entry = _entry_dir(filename, cache_dir)
+    tmp_entry = f"{entry}.tmp-{os.getpid()}"
+    os.makedirs(tmp_entry, exist_ok=True)
+
+    def save(name, array):
+        np.save(os.path.join(tmp_entry, name + ".npy"), array)
+
+    save("TransactionID", columns.transaction_ids)
+    save("Quantity", columns.quantity)
+    save("UnitPrice", columns.unit_price)
+    for field in CATEGORICAL_FIELDS:
+        save(field + ".codes", columns.codes[field])
+        save(field + ".values", np.array(columns.values[field], dtype=str))
+    save("valid", valid)
+
+    with open(os.path.join(tmp_entry, "meta.json"), "w", encoding="utf-8") as file:
+        json.dump({"source_meta": _source_meta(filename), "rows": len(columns)}, file)
+
+    shutil.rmtree(entry, ignore_errors=True)
+    os.replace(tmp_entry, entry)
+
+
+# Parsed columns plus the validation mask, from the cache when it is current,
+# otherwise by parsing the text file once and refreshing the cache.
+
+def read_parsed_columns(filename, cache_dir=DEFAULT_CACHE_DIR):
+    cached = load_parsed_cache(filename, cache_dir)
+    if cached is not None:
+        return cached[0], cached[1], True
+
+    transactions = []
+    valid = []
+    for t in iter_parse_transactions(iter_sales_data(filename)):
+        transactions.append(t)
+        valid.append(is_valid_transaction(t))
+
+    columns = TransactionColumns.from_transactions(transactions)
+    valid = np.array(valid, dtype=bool)
+
+    if os.path.exists(filename):
+        save_parsed_cache(filename, columns, valid, cache_dir)
+
+    return columns, valid, False
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import time
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+
+DEFAULT_CACHE_DIR = ".cache/products"
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 20
+
+
+# File-backed product catalog cache
+#
+# One JSON snapshot per endpoint + query, stored with the validators the server
+# sent (ETag / Last-Modified). A snapshot's mtime is bumped on every read, so
+# eviction drops the least recently used snapshots beyond `max_entries`.
+
+class ProductCache:
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    @staticmethod
+    def key(url, params=None):
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query) + sorted((params or {}).items())
+        normalized = f"{parts.scheme}://{parts.netloc}{parts.path}?{urlencode(sorted(query))}"
+        return hashlib.sha256(normalized.encode()).hexdigest()[:32]
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, key):
+        path = self._path(key)
+
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                entry = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (ValueError, OSError) as e:
+            print("Ignoring corrupt cache entry:", e)
+            return None
+
+        os.utime(path)   # mark as recently used
+        return entry
+
+    def is_fresh(self, entry):
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    def put(self, key, url, products, etag=None, last_modified=None):
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        entry = {
+            "url": url,
+            "fetched_at": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "products": products
+        }
+
+        path = self._path(key)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(entry, file)
+        os.replace(tmp_path, path)
+
+        self.evict()
+        return entry
+
+    def revalidated(self, key, entry):
+        # server answered 304 Not Modified: keep the snapshot, restart its TTL
+        return self.put(key, entry["url"], entry["products"], entry.get("etag"), entry.get("last_modified"))
+
+    def evict(self):
+        try:
+            names = [name for name in os.listdir(self.cache_dir) if name.endswith(".json")]
+        except FileNotFoundError:
+            return
+
+        if len(names) <= self.max_entries:
+            return
+
+        paths = [os.path.join(self.cache_dir, name) for name in names]
+        paths.sort(key=os.path.getmtime, reverse=True)
+
+        for path in paths[self.max_entries:]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,129 @@
+from utils.file_handler import parse_line, is_valid_transaction, passes_filters
+from utils.data_processor import SalesAggregator
+from utils.ingest import iter_inputs
+
+
+# Lazy sales query
+#
+# SalesQuery(filename).filter(region="North", min_amount=1000).top_products(5)
+#
+# filter() only records predicates and returns a new query; nothing is read
+# until a terminal operation (collect, iteration, aggregate, top_products,
+# top_customers). Region and amount predicates are pushed down to the raw
+# line: the region is checked against the last field before any parsing,
+# and the amount is computed from the two numeric fields before a record is
+# built, so non-matching rows never become Transactions. Rows that pass are
+# parsed and validated exactly as parse_transactions + validate_and_filter
+# would, so the matching rows (and their order) are the same as the eager
+# path. The eager summary counts invalid rows among all rows; here `stats`
+# can only count them among rows that got past the pushed-down predicates.
+
+class SalesQuery:
+
+    def __init__(self, filename, region=None, min_amount=None, max_amount=None, empty=False):
+        self.filename = filename
+        self.region = region
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+        self.empty = empty
+        self.stats = {}
+
+    def filter(self, region=None, min_amount=None, max_amount=None):
+        # predicates combine with AND: the tighter bound wins, and two
+        # different regions can never both match
+        new_region = self.region
+        empty = self.empty
+
+        if region is not None:
+            if new_region is not None and new_region != region:
+                empty = True
+            new_region = region
+
+        if min_amount is not None and self.min_amount is not None:
+            min_amount = max(min_amount, self.min_amount)
+        if max_amount is not None and self.max_amount is not None:
+            max_amount = min(max_amount, self.max_amount)
+
+        return SalesQuery(
+            self.filename,
+            new_region,
+            min_amount if min_amount is not None else self.min_amount,
+            max_amount if max_amount is not None else self.max_amount,
+            empty
+        )
+
+    def explain(self):
+        steps = [f"scan {self.filename}"]
+
+        if self.empty:
+            steps.append("contradictory region filters: no rows")
+            return "\n".join(steps)
+
+        if self.region is not None:
+            steps.append(f"pushdown: raw Region field == {self.region!r} (before split/parse)")
+        if self.min_amount is not None or self.max_amount is not None:
+            steps.append(f"pushdown: raw Quantity * UnitPrice within "
+                         f"[{self.min_amount}, {self.max_amount}] (before building records)")
+        steps.append("parse matching lines")
+        steps.append("validate (is_valid_transaction)")
+        return "\n".join(steps)
+
+    def __iter__(self):
+        stats = self.stats = {"lines": 0, "pushed_down": 0, "parsed": 0, "invalid": 0, "matched": 0}
+        if self.empty:
+            return
+
+        region = self.region
+        region_suffix = "|" + region if region is not None else None
+        min_amount = self.min_amount
+        max_amount = self.max_amount
+        check_amount = min_amount is not None or max_amount is not None
+
+        for line in iter_inputs(self.filename):
+            stats["lines"] += 1
+
+            # Region is the last field: a suffix test rejects most rows
+            # without splitting the line at all
+            if region_suffix is not None and not line.endswith(region_suffix):
+                stats["pushed_down"] += 1
+                continue
+
+            if check_amount:
+                fields = line.split('|')
+                if len(fields) != 8:
+                    continue
+                try:
+                    amount = int(fields[4].replace(",", "")) * float(fields[5].replace(",", ""))
+                except ValueError:
+                    continue
+
+                if (min_amount is not None and amount < min_amount) or \
+                        (max_amount is not None and amount > max_amount):
+                    stats["pushed_down"] += 1
+                    continue
+
+            tx = parse_line(line)
+            if tx is None:
+                continue
+            stats["parsed"] += 1
+
+            if not is_valid_transaction(tx):
+                stats["invalid"] += 1
+                continue
+
+            # the pushed-down checks are prefilters; this keeps the eager semantics
+            if passes_filters(tx, region, min_amount, max_amount):
+                stats["matched"] += 1
+                yield tx
+
+    def collect(self):
+        return list(self)
+
+    def aggregate(self, **options):
+        return SalesAggregator(**options).update(self)
+
+    def top_products(self, n=5):
+        return self.aggregate().top_selling_products(n)
+
+    def top_customers(self, n=5):
+        return self.aggregate().top_customers(n)
@@ -2,102 +2,59 @@
 import os
 from datetime import datetime
 
+from utils.data_processor import aggregate
 
-def generate_sales_report(transactions, enriched_transactions, output_file="output/sales_report.txt"):
+
+def generate_sales_report(transactions, enriched_transactions, output_file="output/sales_report.txt", results=None):
 
     os.makedirs("output", exist_ok=True)
 
-    total_transactions = len(transactions)
+    # All section stats come from one aggregation pass
+    if results is None:
+        results = aggregate(transactions)
+
+    total_transactions = results.transaction_count
 
     # Overall Summary
-    total_revenue = sum(t["Quantity"] * t["UnitPrice"] for t in transactions)
+    total_revenue = results.calculate_total_revenue()
     avg_order_value = total_revenue / total_transactions if total_transactions else 0
 
-    dates = [t["Date"] for t in transactions]
-    start_date = min(dates)
-    end_date = max(dates)
-
-    # Region Performance
-    region_stats = {}
-    for t in transactions:
-        region = t["Region"]
-        amount = t["Quantity"] * t["UnitPrice"]
-
-        if region not in region_stats:
-            region_stats[region] = {"sales": 0, "count": 0}
-
-        region_stats[region]["sales"] += amount
-        region_stats[region]["count"] += 1
-
-    # sort regions by sales descending
-    region_stats = dict(sorted(region_stats.items(),
-                               key=lambda x: x[1]["sales"],
-                               reverse=True))
-
-    # Product Performance
-    product_stats = {}
-    for t in transactions:
-        name = t["ProductName"]
-        qty = t["Quantity"]
-        revenue = qty * t["UnitPrice"]
+    start_date = min(results.daily)
+    end_date = max(results.daily)
 
-        if name not in product_stats:
-            product_stats[name] = {"qty": 0, "revenue": 0}
-
-        product_stats[name]["qty"] += qty
-        product_stats[name]["revenue"] += revenue
+    # Region Performance (sorted by sales descending)
+    region_stats = dict(sorted(
+        ((region, {"sales": data["total_sales"], "count": data["transaction_count"]})
+         for region, data in results.regions.items()),
+        key=lambda x: x[1]["sales"],
+        reverse=True))
 
     # Top 5 products
-    top_products = sorted(product_stats.items(),
-                          key=lambda x: x[1]["qty"],
-                          reverse=True)[:5]
+    top_products = results.top_selling_products(5)
 
     # Low performing products (qty < 10)
-    low_products = [(name, stats["qty"], stats["revenue"])
-                    for name, stats in product_stats.items()
-                    if stats["qty"] < 10]
-
-    low_products.sort(key=lambda x: x[1])
+    low_products = results.low_performing_products(10)
 
     # Customer Performance
-    customer_stats = {}
-    for t in transactions:
-        cid = t["CustomerID"]
-        amount = t["Quantity"] * t["UnitPrice"]
-
-        if cid not in customer_stats:
-            customer_stats[cid] = {"spent": 0, "orders": 0}
-
-        customer_stats[cid]["spent"] += amount
-        customer_stats[cid]["orders"] += 1
-
-    top_customers = sorted(customer_stats.items(),
-                            key=lambda x: x[1]["spent"],
-                            reverse=True)[:5]
+    top_customers = results.top_customers(5)
 
     # Daily Trend
-    daily_stats = {}
-    for t in transactions:
-        date = t["Date"]
-        amount = t["Quantity"] * t["UnitPrice"]
-        cid = t["CustomerID"]
-
-        if date not in daily_stats:
-            daily_stats[date] = {"revenue": 0, "transactions": 0, "customers": set()}
-
-        daily_stats[date]["revenue"] += amount
-        daily_stats[date]["transactions"] += 1
-        daily_stats[date]["customers"].add(cid)
-
-    daily_stats = dict(sorted(daily_stats.items()))
-
-    # API Enrichment
-    enriched_count = sum(1 for t in enriched_transactions if t["API_Match"])
-    success_rate = (enriched_count / len(enriched_transactions)) * 100 if enriched_transactions else 0
-
-    failed_products = list(set(
-        t["ProductName"] for t in enriched_transactions if not t["API_Match"]
-    ))
+    daily_stats = results.daily_sales_trend()
+
+    # API Enrichment (taken from the results object when no row list is given;
+    # None when the results source does not track it)
+    if enriched_transactions is None:
+        enriched_count = results.enriched_count
+        checked = results.enrichment_checked
+        success_rate = (enriched_count / checked) * 100 if checked else 0
+        failed_products = list(results.failed_products)
+    else:
+        enriched_count = sum(1 for t in enriched_transactions if t["API_Match"])
+        success_rate = (enriched_count / len(enriched_transactions)) * 100 if enriched_transactions else 0
+
+        failed_products = list(set(
+            t["ProductName"] for t in enriched_transactions if not t["API_Match"]
+        ))
 
     # Write Report
     with open(output_file, "w") as file:
@@ -131,8 +88,8 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         file.write("-" * 50 + "\n")
         file.write("Rank | Product | Quantity Sold | Revenue\n")
 
-        for i, (name, stats) in enumerate(top_products, 1):
-            file.write(f"{i} | {name} | {stats['qty']} | ₹{stats['revenue']:,.2f}\n")
+        for i, (name, qty, revenue) in enumerate(top_products, 1):
+            file.write(f"{i} | {name} | {qty} | ₹{revenue:,.2f}\n")
 
         file.write("\n")
 
@@ -141,18 +98,40 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         file.write("-" * 50 + "\n")
         file.write("Rank | CustomerID | Total Spent | Orders\n")
 
-        for i, (cid, stats) in enumerate(top_customers, 1):
-            file.write(f"{i} | {cid} | ₹{stats['spent']:,.2f} | {stats['orders']}\n")
+        if top_customers is None:
+            file.write("Not available for these results\n")
+        else:
+            for i, (cid, spent, orders) in enumerate(top_customers, 1):
+                file.write(f"{i} | {cid} | ₹{spent:,.2f} | {orders}\n")
 
         file.write("\n")
 
+        # Approximate heavy hitters, when the results were built with sketches
+        if results.product_hitters is not None:
+            file.write("HEAVY HITTERS (APPROXIMATE)\n")
+            file.write("-" * 50 + "\n")
+            file.write("Rank | Product | Est. Quantity | Max Overcount\n")
+
+            for i, (name, qty, error) in enumerate(results.heavy_hitter_products(5), 1):
+                file.write(f"{i} | {name} | {qty} | {error}\n")
+
+            file.write("Rank | CustomerID | Est. Spent | Max Overcount\n")
+
+            for i, (cid, spent, error) in enumerate(results.heavy_hitter_customers(5), 1):
+                file.write(f"{i} | {cid} | ₹{spent:,.2f} | ₹{error:,.2f}\n")
+
+            file.write("\n")
+
         # Daily Trend
         file.write("DAILY SALES TREND\n")
         file.write("-" * 50 + "\n")
-        file.write("Date | Revenue | Transactions | Unique Customers\n")
+        if results.approximate_customers:
+            file.write("Date | Revenue | Transactions | Unique Customers (approx.)\n")
+        else:
+            file.write("Date | Revenue | Transactions | Unique Customers\n")
 
         for date, stats in daily_stats.items():
-            file.write(f"{date} | ₹{stats['revenue']:,.2f} | {stats['transactions']} | {len(stats['customers'])}\n")
+            file.write(f"{date} | ₹{stats['revenue']:,.2f} | {stats['transaction_count']} | {stats['unique_customers']}\n")
 
         file.write("\n")
 
@@ -172,8 +151,11 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         # API Summary
         file.write("API ENRICHMENT SUMMARY\n")
         file.write("-" * 50 + "\n")
-        file.write(f"Total Records Enriched: {enriched_count}\n")
-        file.write(f"Success Rate: {success_rate:.2f}%\n")
+        if enriched_count is None:
+            file.write("Not available for these results\n")
+        else:
+            file.write(f"Total Records Enriched: {enriched_count}\n")
+            file.write(f"Success Rate: {success_rate:.2f}%\n")
 
         if failed_products:
             file.write("Products Not Enriched:\n")
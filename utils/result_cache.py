@@ -0,0 +1,224 @@
+import functools
+import gc
+import hashlib
+import inspect
+import os
+import pickle
+from collections import OrderedDict
+
+
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_DISK_BYTES = 512 * 1024 * 1024
+CACHE_VERSION = 3   # bump when the classes of cached results change shape
+
+
+# Result cache for data_processor functions
+#
+# Keys are (function, dataset key, bound arguments with defaults applied), so
+# top_selling_products(rows) and top_selling_products(rows, 5) share an entry.
+# The dataset key is whatever the caller bound to the row list with bind()
+# (main.py binds the source file's size/mtime/fingerprint plus the filter
+# choices), so a bound list must not change afterwards. Lists that were not
+# bound are never memoized: telling two of them apart would take a pass over
+# every row, which costs as much as most of the analytics.
+#
+# Two tiers: an in-memory LRU and, with `directory`, pickle files on disk
+# that survive across runs. Each tier evicts least recently used entries
+# once its byte budget is exceeded (entry size is the pickled size). Cached
+# values are shared, so callers must treat them as read-only.
+
+class ResultCache:
+
+    def __init__(self, directory=None, max_memory_bytes=DEFAULT_MEMORY_BYTES, max_disk_bytes=DEFAULT_DISK_BYTES):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._bound = {}
+
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0,
+                      "unbound": 0}
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # the list object is kept referenced so its id() is not reused
+    def bind(self, transactions, *key_parts):
+        self._bound[id(transactions)] = (transactions, repr(key_parts))
+
+    # None for a list that was not bound
+    def dataset_key(self, transactions):
+        bound = self._bound.get(id(transactions))
+        if bound is not None and bound[0] is transactions:
+            return bound[1]
+        return None
+
+    def key(self, name, dataset_key, arguments):
+        raw = repr((CACHE_VERSION, name, dataset_key, arguments))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return True, self._memory[key][0]
+
+        if self.directory:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as file:
+                    data = file.read()
+                value = _unpickle(data)
+            except FileNotFoundError:
+                pass
+            except Exception:
+                # truncated, or pickled from classes that have since been
+                # renamed or changed: a miss, and the entry goes
+                _remove(path)
+            else:
+                os.utime(path)   # mtime is the disk tier's LRU clock
+                self.stats["disk_hits"] += 1
+                self._remember(key, value, len(data))
+                return True, value
+
+        self.stats["misses"] += 1
+        return False, None
+
+    def put(self, key, value):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(key, value, len(data))
+
+        if self.directory and len(data) <= self.max_disk_bytes:
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+            self._evict_disk()
+
+    def _remember(self, key, value, size):
+        if size > self.max_memory_bytes:
+            return
+
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key)[1]
+        self._memory[key] = (value, size)
+        self._memory_bytes += size
+
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self.stats["evictions"] += 1
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pkl")
+
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pkl"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.stats["disk_evictions"] += 1
+
+    def call(self, func, transactions, *args, **kwargs):
+        dataset_key = self.dataset_key(transactions)
+        if dataset_key is None:
+            self.stats["unbound"] += 1
+            return func(transactions, *args, **kwargs)
+
+        arguments = _bound_arguments(func, transactions, args, kwargs)
+        key = self.key(func.__qualname__, dataset_key, arguments)
+
+        hit, value = self.get(key)
+        if hit:
+            return value
+
+        value = func(transactions, *args, **kwargs)
+        self.put(key, value)
+        return value
+
+    def summary(self):
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        rate = hits / lookups * 100 if lookups else 0
+        return (f"{hits}/{lookups} hits ({rate:.0f}%: {self.stats['memory_hits']} memory, "
+                f"{self.stats['disk_hits']} disk), {self.stats['evictions']} memory / "
+                f"{self.stats['disk_evictions']} disk evictions, {self.stats['unbound']} unbound calls, "
+                f"{len(self._memory)} entries in {self._memory_bytes / 1024 / 1024:.2f} MB")
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _unpickle(data):
+    # an aggregator unpickles into many new containers; skip the collector
+    # passes they would trigger, as read_transactions_mmap does
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.loads(data)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _bound_arguments(func, transactions, args, kwargs):
+    bound = _signature(func).bind(transactions, *args, **kwargs)
+    bound.apply_defaults()
+    return tuple((name, value) for name, value in bound.arguments.items() if value is not transactions)
+
+
+@functools.lru_cache(maxsize=None)
+def _signature(func):
+    return inspect.signature(func)
+
+
+# Active cache
+#
+# data_processor's list-based functions are wrapped with memoized(); they go
+# through the active cache, if any, when given a list of rows. Aggregator
+# inputs already answer from precomputed totals and are passed straight
+# through, as is everything while no cache is active.
+
+_active = None
+
+
+def use_result_cache(cache):
+    global _active
+    previous = _active
+    _active = cache
+    return previous
+
+
+def active_result_cache():
+    return _active
+
+
+def memoized(func):
+    @functools.wraps(func)
+    def wrapper(transactions, *args, **kwargs):
+        cache = _active
+        if cache is None or not isinstance(transactions, list):
+            return func(transactions, *args, **kwargs)
+        return cache.call(func, transactions, *args, **kwargs)
+
+    return wrapper
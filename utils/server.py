@@ -0,0 +1,293 @@
+import json
+import os
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from utils.file_handler import read_transactions_mmap
+from utils.data_processor import aggregate
+from utils.api_handler import iter_enriched
+from utils.index import TransactionIndex
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+MAX_CACHED_QUERIES = 256
+
+
+# Analytics served under /analytics/<name>. Each takes the aggregated results
+# for the requested filter and the parsed query parameters.
+
+ANALYSES = {
+    "total_revenue": lambda results, params: results.calculate_total_revenue(),
+    "region_sales": lambda results, params: results.region_wise_sales(),
+    "top_products": lambda results, params: results.top_selling_products(params.get("n", 5)),
+    "top_customers": lambda results, params: results.top_customers(params.get("n", 5)),
+    "customers": lambda results, params: results.customer_analysis(),
+    "daily_trend": lambda results, params: results.daily_sales_trend(),
+    "peak_day": lambda results, params: results.find_peak_sales_day(),
+    "low_products": lambda results, params: results.low_performing_products(params.get("threshold", 10)),
+    "enrichment": lambda results, params: {
+        "enriched_count": results.enriched_count,
+        "checked": results.enrichment_checked,
+        "success_rate": round(results.enriched_count / results.enrichment_checked * 100, 2)
+        if results.enrichment_checked else 0,
+        "failed_products": sorted(results.failed_products)
+    }
+}
+
+
+class QueryError(ValueError):
+    pass
+
+
+class NotFound(Exception):
+    pass
+
+
+def _parse_params(query):
+    params = {}
+
+    for key, values in parse_qs(query, keep_blank_values=True).items():
+        value = values[-1]
+
+        if key == "region":
+            params["region"] = value if value else None
+        elif key in ("min_amount", "max_amount"):
+            try:
+                params[key] = float(value) if value else None
+            except ValueError:
+                raise QueryError(f"{key} must be a number")
+        elif key in ("n", "threshold", "limit"):
+            try:
+                params[key] = int(value)
+            except ValueError:
+                raise QueryError(f"{key} must be an integer")
+        else:
+            raise QueryError(f"unknown parameter: {key}")
+
+    return params
+
+
+# Resident sales data
+#
+# The file is parsed, enriched and indexed once. Every request first checks
+# the file's size and mtime and reloads when either changed. Aggregates are
+# cached per filter and encoded responses per (path, parameters), so a
+# repeated query is a dict lookup; both caches are dropped on reload.
+
+class SalesDataStore:
+
+    def __init__(self, filename, product_mapping=None, max_cached=MAX_CACHED_QUERIES):
+        self.filename = filename
+        self.product_mapping = product_mapping or {}
+        self.max_cached = max_cached
+
+        self.index = None
+        self.source_state = None
+        self.loaded_at = None
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._aggregates = OrderedDict()
+        self._responses = OrderedDict()
+
+        self.reload()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def reload(self):
+        state = self._stat()
+        transactions = read_transactions_mmap(self.filename)
+        enriched = list(iter_enriched(transactions, self.product_mapping))
+
+        index = TransactionIndex(enriched)
+
+        with self._lock:
+            self.index = index
+            self.source_state = state
+            self.loaded_at = time.time()
+            self._aggregates.clear()
+            self._responses.clear()
+
+    def refresh_if_changed(self):
+        if self._stat() == self.source_state:
+            return
+
+        # one thread reloads; the others wait for it and then find it current
+        with self._reload_lock:
+            if self._stat() != self.source_state:
+                print(f"{self.filename} changed, reloading")
+                self.reload()
+
+    def _remember(self, cache, key, value):
+        cache[key] = value
+        if len(cache) > self.max_cached:
+            cache.popitem(last=False)
+
+    def _results(self, index, region, min_amount, max_amount):
+        key = (region, min_amount, max_amount)
+
+        with self._lock:
+            results = self._aggregates.get(key)
+            if results is not None and index is self.index:
+                self._aggregates.move_to_end(key)
+                return results
+
+        results = aggregate(index.query(region, min_amount, max_amount))
+
+        with self._lock:
+            if index is self.index:
+                self._remember(self._aggregates, key, results)
+        return results
+
+    def handle(self, path, params):
+        key = (path, tuple(sorted(params.items())))
+
+        with self._lock:
+            index = self.index
+            body = self._responses.get(key)
+            if body is not None:
+                self._responses.move_to_end(key)
+                self.hits += 1
+                return body
+            self.misses += 1
+
+        payload = self._answer(index, path, params)
+        body = json.dumps(payload).encode("utf-8")
+
+        with self._lock:
+            if index is self.index:
+                self._remember(self._responses, key, body)
+        return body
+
+    def _answer(self, index, path, params):
+        region = params.get("region")
+        min_amount = params.get("min_amount")
+        max_amount = params.get("max_amount")
+
+        if path == "/options":
+            return {
+                "regions": sorted(index.regions),
+                "min_amount": index.min_amount,
+                "max_amount": index.max_amount
+            }
+
+        if path == "/filter":
+            rows = index.query(region, min_amount, max_amount)
+            return {
+                "summary": {
+                    "total_input": index.total_input,
+                    "invalid": index.invalid_count,
+                    "filtered_by_region": region,
+                    "filtered_by_amount": {"min": min_amount, "max": max_amount},
+                    "final_count": len(rows)
+                },
+                "transactions": [dict(t) for t in rows[:params.get("limit", 100)]]
+            }
+
+        if path.startswith("/analytics/"):
+            name = path[len("/analytics/"):]
+            if name not in ANALYSES:
+                raise NotFound(path)
+
+            results = self._results(index, region, min_amount, max_amount)
+            return ANALYSES[name](results, params)
+
+        raise NotFound(path)
+
+    def health(self):
+        with self._lock:
+            return {
+                "status": "ok",
+                "file": self.filename,
+                "rows": self.index.total_input,
+                "loaded_at": self.loaded_at,
+                "cached_queries": len(self._responses),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+class SalesRequestHandler(BaseHTTPRequestHandler):
+    store = None
+    quiet = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+
+        if url.path == "/health":
+            self._send(200, json.dumps(self.store.health()).encode("utf-8"))
+            return
+
+        try:
+            params = _parse_params(url.query)
+            self.store.refresh_if_changed()
+            body = self.store.handle(url.path, params)
+        except QueryError as e:
+            self._send(400, json.dumps({"error": str(e)}).encode("utf-8"))
+        except NotFound:
+            self._send(404, json.dumps({"error": f"not found: {url.path}"}).encode("utf-8"))
+        except Exception as e:
+            self._send(500, json.dumps({"error": str(e)}).encode("utf-8"))
+        else:
+            self._send(200, body)
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return "unix"
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def create_server(store, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None, quiet=True):
+    handler = type("Handler", (SalesRequestHandler,), {"store": store, "quiet": quiet})
+
+    if socket_path is not None:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        return ThreadingUnixHTTPServer(socket_path, handler)
+
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(filename, product_mapping=None, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None, quiet=True):
+    store = SalesDataStore(filename, product_mapping)
+    server = create_server(store, host, port, socket_path, quiet)
+
+    where = socket_path if socket_path is not None else f"http://{host}:{server.server_address[1]}"
+    print(f"Serving {store.index.total_input} records from {filename} on {where}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        server.server_close()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.remove(socket_path)
@@ -0,0 +1,251 @@
+import hashlib
+import heapq
+import math
+
+
+# Exact top-N with a bounded heap: O(k log n) instead of sorting all k keys.
+# heapq.nlargest breaks ties by input order, exactly like
+# sorted(items, key=key, reverse=True)[:n].
+
+def top_n(items, n, key):
+    return heapq.nlargest(n, items, key=key)
+
+
+# Space-Saving heavy hitters (Metwally et al.), weighted variant
+#
+# Keeps at most `capacity` counters. A new key arriving when all counters are
+# taken replaces the smallest one and inherits its count as error, so every
+# reported count overestimates the true total by at most its `error`, which is
+# itself at most total_weight / capacity. Any key whose true total exceeds
+# total_weight / capacity is guaranteed to be monitored.
+
+class SpaceSaving:
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counters = {}
+        self.total_weight = 0
+        self._heap = []   # (count, key) entries, stale ones skipped lazily
+
+    def update(self, key, weight=1):
+        self.total_weight += weight
+        counter = self.counters.get(key)
+
+        if counter is not None:
+            counter[0] += weight
+        elif len(self.counters) < self.capacity:
+            counter = self.counters[key] = [weight, 0]
+        else:
+            min_count, min_key = self._pop_min()
+            del self.counters[min_key]
+            counter = self.counters[key] = [min_count + weight, min_count]
+
+        heapq.heappush(self._heap, (counter[0], key))
+
+        # drop stale heap entries before they outnumber live counters
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c[0], k) for k, c in self.counters.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            count, key = heapq.heappop(self._heap)
+            counter = self.counters.get(key)
+            if counter is not None and counter[0] == count:
+                return count, key
+
+    def _floor(self):
+        # a key this sketch is not monitoring can have a true total of at most
+        # the smallest count when every counter is taken (zero otherwise)
+        if len(self.counters) < self.capacity or not self.counters:
+            return 0
+        return min(count for count, _ in self.counters.values())
+
+    def merge(self, other):
+        # mergeable summaries (Agarwal et al.): a key missing from one side is
+        # charged that side's floor so estimates stay upper bounds, then trimmed
+        floor_self = self._floor()
+        floor_other = other._floor()
+
+        combined = {}
+        for key in list(self.counters) + [k for k in other.counters if k not in self.counters]:
+            count_self, error_self = self.counters.get(key, (floor_self, floor_self))
+            count_other, error_other = other.counters.get(key, (floor_other, floor_other))
+            combined[key] = [count_self + count_other, error_self + error_other]
+
+        kept = heapq.nlargest(self.capacity, combined.items(), key=lambda x: x[1][0])
+        self.counters = {key: counter for key, counter in kept}
+        self.total_weight += other.total_weight
+        self._heap = [(c[0], k) for k, c in self.counters.items()]
+        heapq.heapify(self._heap)
+        return self
+
+    @property
+    def error_bound(self):
+        return self.total_weight / self.capacity
+
+    # (key, estimated_total, max_overestimate), largest first
+    def top(self, n):
+        best = heapq.nlargest(n, self.counters.items(), key=lambda x: x[1][0])
+        return [(key, count, error) for key, (count, error) in best]
+
+    def to_state(self):
+        return {
+            "capacity": self.capacity,
+            "total_weight": self.total_weight,
+            "counters": [[key, count, error] for key, (count, error) in self.counters.items()]
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(state["capacity"])
+        sketch.total_weight = state["total_weight"]
+        sketch.counters = {key: [count, error] for key, count, error in state["counters"]}
+        sketch._heap = [(c[0], k) for k, c in sketch.counters.items()]
+        heapq.heapify(sketch._heap)
+        return sketch
+
+
+# Stable 64-bit hash (the same in every process, unlike hash()), used to
+# place values in HyperLogLog registers.
+
+def hash64(value):
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+
+
+# HyperLogLog distinct counter
+#
+# 2**precision one-byte registers; standard error is about
+# 1.04 / sqrt(2**precision) (precision 12 -> ~1.6% in 4 KiB). It mimics the
+# parts of the set API the aggregators use (add, |=, len), so it can stand in
+# for a set of CustomerIDs. Sketches with the same precision merge by taking
+# the register-wise maximum.
+
+class HyperLogLog:
+
+    def __init__(self, precision=12):
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    @staticmethod
+    def register(h, precision):
+        # (register index, rank) a 64-bit hash updates
+        index = h >> (64 - precision)
+        rest = h & ((1 << (64 - precision)) - 1)
+        return index, (64 - precision) - rest.bit_length() + 1
+
+    def add(self, value):
+        index, rank = self.register(hash64(value), self.precision)
+
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("cannot merge HyperLogLog sketches of different precision")
+
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    __ior__ = merge
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+
+        # small-range correction: linear counting while registers are empty
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+
+        return estimate
+
+    def __len__(self):
+        return int(round(self.count()))
+
+    def to_state(self):
+        return {"precision": self.precision, "registers": self.registers.hex()}
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(state["precision"])
+        sketch.registers = bytearray.fromhex(state["registers"])
+        return sketch
+
+
+# Relative-error quantile sketch (DDSketch-style)
+#
+# Positive values fall into logarithmic buckets of ratio
+# gamma = (1 + accuracy) / (1 - accuracy), so any reported quantile is within
+# `accuracy` relative error of a true value at that rank. Non-positive values
+# are counted in a zero bucket. Merging adds bucket counts, so partial sketches
+# from chunks or processes combine losslessly.
+
+class QuantileSketch:
+
+    def __init__(self, accuracy=0.01):
+        if not 0 < accuracy < 1:
+            raise ValueError("QuantileSketch accuracy must be between 0 and 1")
+
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+
+        if value <= 0:
+            self.zero_count += 1
+            return
+
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other):
+        if other.accuracy != self.accuracy:
+            raise ValueError("cannot merge quantile sketches of different accuracy")
+
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_state(self):
+        return {
+            "accuracy": self.accuracy,
+            "buckets": sorted(self.buckets.items()),
+            "zero_count": self.zero_count,
+            "count": self.count
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(state["accuracy"])
+        sketch.buckets = {index: count for index, count in state["buckets"]}
+        sketch.zero_count = state["zero_count"]
+        sketch.count = state["count"]
+        return sketch
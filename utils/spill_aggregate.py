@@ -0,0 +1,306 @@
+import heapq
+import os
+import pickle
+import shutil
+import tempfile
+
+from utils.sketches import top_n
+
+
+DEFAULT_MEMORY_BYTES = 256 * 1024 * 1024
+PARTITIONS = 16
+WRITE_BATCH_ROWS = 2000
+MAX_DEPTH = 3
+
+# rough in-memory cost of one group (key, state list, dict slot) and of one
+# name in a customer's product list
+GROUP_BYTES = 300
+MEMBER_BYTES = 100
+
+
+# Hash-partitioned spill files
+#
+# One append-only file per partition holding pickled batches of records;
+# records are buffered per partition and written WRITE_BATCH_ROWS at a time.
+# read(partition) returns them in the order they were appended.
+
+class SpillFiles:
+
+    def __init__(self, directory, name, count=PARTITIONS):
+        self.paths = [os.path.join(directory, f"{name}-{i}.pkl") for i in range(count)]
+        self.buffers = [[] for _ in range(count)]
+        self.started = [False] * count
+
+    def append(self, partition, record):
+        buffer = self.buffers[partition]
+        buffer.append(record)
+        if len(buffer) >= WRITE_BATCH_ROWS:
+            self._write(partition)
+
+    def _write(self, partition):
+        with open(self.paths[partition], "ab" if self.started[partition] else "wb") as file:
+            pickle.dump(self.buffers[partition], file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.started[partition] = True
+        self.buffers[partition] = []
+
+    def read(self, partition):
+        if self.buffers[partition]:
+            self._write(partition)
+        if not self.started[partition]:
+            return
+
+        with open(self.paths[partition], "rb") as file:
+            while True:
+                try:
+                    batch = pickle.load(file)
+                except EOFError:
+                    return
+                yield from batch
+
+
+# Out-of-core customer and product group-bys
+#
+# Hybrid hash aggregation: groups live in dicts until the estimated memory
+# use passes `memory_bytes`. From then on no new group is admitted. Rows of
+# groups not in memory are appended, raw, to the partition their key hashes
+# to, and the per-customer product lists held in memory are parked in the
+# same partitions and dropped, since they are what keeps growing. Groups in
+# memory keep aggregating. At the end every partition is aggregated on its
+# own (spilling again, one level down with a different hash, if it still
+# does not fit) and the partitions' sorted results are merged.
+#
+# The results equal customer_analysis, top_customers, top_selling_products
+# and low_performing_products on the same rows. All of a group's rows are
+# summed in one place in input order, so the float sums round the same way.
+# Each group carries the input position of its first row and groups come out
+# in that order, which is the dict order the in-memory versions build.
+# Product sets are rebuilt by adding names in first-purchase order. Python's
+# str hash is salted per process, so spill files are only meaningful to the
+# process that wrote them.
+
+class SpillingGroupBy:
+
+    def __init__(self, memory_bytes=DEFAULT_MEMORY_BYTES, directory=None, level=0):
+        self.memory_bytes = memory_bytes
+        self.parent_directory = directory
+        self.level = level
+
+        self.customers = {}   # cid -> [first row, total spent, purchases, {product: None}]
+        self.products = {}    # name -> [first row, qty, revenue]
+        self.rows = 0
+        self.used = 0
+        self.member_bytes = 0
+
+        self.spilling = False
+        self.finished = False
+        self.directory = None
+        self.customer_rows = None
+        self.product_rows = None
+        self.customer_groups = None
+        self.product_groups = None
+        self._merged_customers = None
+        self._merged_products = None
+
+        self.spilled_rows = 0
+        self.partitions_merged = 0
+
+    def add(self, cid, name, qty, amount):
+        if self.finished:
+            raise ValueError("Cannot add rows after the group-by results were read")
+
+        seq = self.rows
+        self.rows += 1
+        self.add_customer(seq, cid, name, amount)
+        self.add_product(seq, name, qty, amount)
+
+    def add_customer(self, seq, cid, name, amount):
+        state = self.customers.get(cid)
+        if state is None:
+            if self.spilling:
+                self.customer_rows.append(self._partition(cid), (seq, cid, name, amount))
+                self.spilled_rows += 1
+                return
+            state = self.customers[cid] = [seq, 0, 0, {}]
+            self.used += GROUP_BYTES
+
+        state[1] += amount
+        state[2] += 1
+
+        names = state[3]
+        if name not in names:
+            names[name] = None
+            self.used += MEMBER_BYTES
+            self.member_bytes += MEMBER_BYTES
+            if self.used > self.memory_bytes:
+                self._overflow()
+
+    def add_product(self, seq, name, qty, amount):
+        state = self.products.get(name)
+        if state is None:
+            if self.spilling:
+                self.product_rows.append(self._partition(name), (seq, name, qty, amount))
+                self.spilled_rows += 1
+                return
+            state = self.products[name] = [seq, 0, 0]
+            self.used += GROUP_BYTES
+            if self.used > self.memory_bytes:
+                self._overflow()
+
+        state[1] += qty
+        state[2] += amount
+
+    def _partition(self, key):
+        return hash((self.level, key)) % PARTITIONS
+
+    def _overflow(self):
+        if self.level >= MAX_DEPTH:
+            return
+
+        if not self.spilling:
+            self.spilling = True
+            self.directory = tempfile.mkdtemp(prefix="sales-groupby-", dir=self.parent_directory)
+            self.customer_rows = SpillFiles(self.directory, "customer-rows")
+            self.product_rows = SpillFiles(self.directory, "product-rows")
+
+        # only worth a pass over every customer once the lists are a large
+        # share of the budget
+        if self.member_bytes * 2 >= self.memory_bytes:
+            for cid, state in self.customers.items():
+                if state[3]:
+                    self.customer_rows.append(self._partition(cid), (cid, list(state[3])))
+                    state[3] = {}
+            self.used -= self.member_bytes
+            self.member_bytes = 0
+
+    def _finish(self):
+        if self.finished:
+            return
+        self.finished = True
+        if not self.spilling:
+            return
+
+        # the groups still in memory go to their partitions as well, so each
+        # partition holds everything about its keys
+        self.customer_groups = SpillFiles(self.directory, "customer-groups")
+        for cid, (first, total, count, names) in self.customers.items():
+            self.customer_groups.append(self._partition(cid), (first, cid, total, count, list(names)))
+        self.customers = {}
+
+        self.product_groups = SpillFiles(self.directory, "product-groups")
+        for name, (first, qty, revenue) in self.products.items():
+            self.product_groups.append(self._partition(name), (first, name, qty, revenue))
+        self.products = {}
+
+    def _child(self):
+        return SpillingGroupBy(self.memory_bytes, self.directory, self.level + 1)
+
+    def _merge_customer_partition(self, partition):
+        child = self._child()
+        try:
+            parked = {}
+            for record in self.customer_rows.read(partition):
+                if len(record) == 2:
+                    cid, names = record
+                    parked.setdefault(cid, {}).update(dict.fromkeys(names))
+                else:
+                    child.add_customer(*record)
+
+            groups = []
+            for first, cid, total, count, names in self.customer_groups.read(partition):
+                earlier = parked.pop(cid, None)
+                if earlier is not None:
+                    earlier.update(dict.fromkeys(names))
+                    names = list(earlier)
+                groups.append((first, cid, total, count, names))
+
+            yield from heapq.merge(groups, child.iter_customers())
+        finally:
+            self.spilled_rows += child.spilled_rows
+            self.partitions_merged += child.partitions_merged + 1
+            child.close()
+
+    def _merge_product_partition(self, partition):
+        child = self._child()
+        try:
+            for record in self.product_rows.read(partition):
+                child.add_product(*record)
+
+            groups = list(self.product_groups.read(partition))
+            yield from heapq.merge(groups, child.iter_products())
+        finally:
+            self.spilled_rows += child.spilled_rows
+            self.partitions_merged += child.partitions_merged + 1
+            child.close()
+
+    # (first row, cid, total spent, purchases, product names in first-purchase
+    # order) per customer, in order of first appearance
+    def iter_customers(self):
+        self._finish()
+        if not self.spilling:
+            for cid, (first, total, count, names) in self.customers.items():
+                yield first, cid, total, count, list(names)
+            return
+
+        if self._merged_customers is None:
+            merged = SpillFiles(self.directory, "customers-merged")
+            for partition in range(PARTITIONS):
+                for entry in self._merge_customer_partition(partition):
+                    merged.append(partition, entry)
+            self._merged_customers = merged
+
+        yield from heapq.merge(*(self._merged_customers.read(p) for p in range(PARTITIONS)))
+
+    # (first row, name, qty, revenue) per product, in order of first appearance
+    def iter_products(self):
+        self._finish()
+        if not self.spilling:
+            for name, (first, qty, revenue) in self.products.items():
+                yield first, name, qty, revenue
+            return
+
+        if self._merged_products is None:
+            merged = SpillFiles(self.directory, "products-merged")
+            for partition in range(PARTITIONS):
+                for entry in self._merge_product_partition(partition):
+                    merged.append(partition, entry)
+            self._merged_products = merged
+
+        yield from heapq.merge(*(self._merged_products.read(p) for p in range(PARTITIONS)))
+
+    def customer_analysis(self):
+        result = {}
+
+        for _, cid, total, count, names in self.iter_customers():
+            result[cid] = {
+                "total_spent": total,
+                "purchase_count": count,
+                "avg_order_value": round(total / count, 2),
+                "products_bought": list(set(names))
+            }
+
+        return dict(sorted(result.items(),
+                           key=lambda x: x[1]["total_spent"],
+                           reverse=True))
+
+    def top_customers(self, n=5):
+        result = ((cid, total, count) for _, cid, total, count, _ in self.iter_customers())
+        return top_n(result, n, key=lambda x: x[1])
+
+    def top_selling_products(self, n=5):
+        result = ((name, qty, revenue) for _, name, qty, revenue in self.iter_products())
+        return top_n(result, n, key=lambda x: x[1])
+
+    def low_performing_products(self, threshold=10):
+        result = [(name, qty, revenue)
+                  for _, name, qty, revenue in self.iter_products()
+                  if qty < threshold]
+
+        result.sort(key=lambda x: x[1])
+        return result
+
+    def close(self):
+        self.customers = {}
+        self.products = {}
+        if self.directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
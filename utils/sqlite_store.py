@@ -0,0 +1,320 @@
+import os
+import sqlite3
+
+from utils.file_handler import Transaction, is_valid_transaction
+from utils.data_processor import SalesAggregator
+from utils.api_handler import ProductMatch, EnrichedTransaction
+
+
+DEFAULT_DB = "output/sales.db"
+LOAD_BATCH_ROWS = 50000
+SCHEMA_VERSION = 1
+
+_COLUMNS = ("TransactionID", "Date", "ProductID", "ProductName", "Quantity", "UnitPrice", "CustomerID", "Region")
+
+# SQLite 3.43 switched SUM() on floats to compensated (Kahan-Babuska)
+# summation; before that it adds in scan order exactly like the Python loops
+NATIVE_SUM_EXACT = sqlite3.sqlite_version_info < (3, 43, 0)
+
+
+class _SequentialSum:
+    # plain left-to-right float sum, the data_processor way, for SQLite
+    # versions whose SUM() would round differently
+
+    def __init__(self):
+        self.total = 0
+
+    def step(self, value):
+        self.total += value
+
+    def finalize(self):
+        return self.total
+
+
+class DistinctCount:
+    # stands in for a per-day customer set: daily_sales_trend only takes its
+    # len(), as it does for the HyperLogLog used in sketch mode
+
+    __slots__ = ("count",)
+
+    def __init__(self, count):
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+
+def _product_number(product_id):
+    # same matching rule as resolve_product: "P101" -> 101, anything else
+    # (or 0) never matches
+    try:
+        number = int(product_id[1:])
+    except:
+        return None
+    return number or None
+
+
+# SQLite storage backend
+#
+# Parsed transactions are bulk-loaded (executemany, one transaction per
+# batch) into a table whose rowid is the input position, with the validation
+# result and Quantity * UnitPrice stored per row (computed in Python, so
+# they are the same floats the in-memory path uses). Date, Region,
+# ProductName and CustomerID are indexed after the load, and the product
+# catalog from create_product_mapping goes into its own table for the
+# enrichment join.
+#
+# Results match the in-memory path exactly: every grouped query scans the
+# index on its grouping column, which visits each group's rows in rowid
+# (input) order, so per-group float sums add in the same order as the Python
+# loops; groups are returned in order of first appearance, which is the dict
+# order SalesAggregator builds. On SQLite >= 3.43 SUM() is replaced by a
+# sequential Python aggregate for the float columns.
+
+class SalesDatabase:
+
+    def __init__(self, path=DEFAULT_DB):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        if NATIVE_SUM_EXACT:
+            self.fsum = "SUM"
+        else:
+            self.conn.create_aggregate("seqsum", 1, _SequentialSum)
+            self.fsum = "seqsum"
+
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS products (
+                product_id INTEGER PRIMARY KEY,
+                title, category, brand, rating
+            );
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def _meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def is_loaded(self, signature):
+        return self._meta("source") == repr((SCHEMA_VERSION, signature))
+
+    # Loading
+
+    def load(self, transactions, signature=None, batch_rows=LOAD_BATCH_ROWS):
+        conn = self.conn
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS transactions")
+            conn.execute("""
+                CREATE TABLE transactions (
+                    seq INTEGER PRIMARY KEY,
+                    TransactionID TEXT, Date TEXT, ProductID TEXT, ProductName TEXT,
+                    Quantity INTEGER, UnitPrice REAL, CustomerID TEXT, Region TEXT,
+                    amount REAL, valid INTEGER, product_num INTEGER
+                )
+            """)
+            conn.execute("DELETE FROM meta WHERE key = 'source'")
+
+        insert = "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        batch = []
+        count = 0
+        for seq, t in enumerate(transactions):
+            batch.append((seq, t["TransactionID"], t["Date"], t["ProductID"], t["ProductName"],
+                          t["Quantity"], t["UnitPrice"], t["CustomerID"], t["Region"],
+                          t["Quantity"] * t["UnitPrice"], int(is_valid_transaction(t)),
+                          _product_number(t["ProductID"])))
+            if len(batch) >= batch_rows:
+                with conn:
+                    conn.executemany(insert, batch)
+                count += len(batch)
+                batch = []
+
+        with conn:
+            if batch:
+                conn.executemany(insert, batch)
+                count += len(batch)
+
+            # built after the load: one sort per index instead of per-row
+            # updates. seq right after the grouping column keeps each group in
+            # input order; the columns after it make the indexes covering for
+            # the filtered group-bys, so those never touch the table
+            conn.execute("CREATE INDEX idx_date ON transactions "
+                         "(Date, seq, valid, Region, amount, CustomerID)")
+            conn.execute("CREATE INDEX idx_region ON transactions (Region, seq, valid, amount)")
+            conn.execute("CREATE INDEX idx_product ON transactions "
+                         "(ProductName, seq, valid, Region, amount, Quantity)")
+            conn.execute("CREATE INDEX idx_customer ON transactions "
+                         "(CustomerID, seq, valid, Region, amount, ProductName)")
+            self._set_meta("source", repr((SCHEMA_VERSION, signature)))
+
+        conn.execute("ANALYZE")
+        return count
+
+    def store_products(self, product_mapping):
+        rows = [(product_id, data.get("title"), data.get("category"), data.get("brand"), data.get("rating"))
+                for product_id, data in product_mapping.items()]
+        with self.conn:
+            self.conn.execute("DELETE FROM products")
+            self.conn.executemany("INSERT INTO products VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    # Filter options (over every row, as validate_and_filter prints them)
+
+    def regions(self):
+        rows = self.conn.execute("SELECT Region, MIN(seq) AS first FROM transactions "
+                                 "INDEXED BY idx_region GROUP BY Region ORDER BY first")
+        return [region for region, _ in rows]
+
+    def amount_range(self):
+        return self.conn.execute("SELECT MIN(amount), MAX(amount) FROM transactions").fetchone()
+
+    def validate_and_filter(self, region=None, min_amount=None, max_amount=None):
+        view = SalesView(self, region, min_amount, max_amount)
+
+        total_input, invalid = self.conn.execute(
+            "SELECT COUNT(*), COUNT(*) - TOTAL(valid) FROM transactions").fetchone()
+        invalid = int(invalid)
+
+        summary = {
+            "total_input": total_input,
+            "invalid": invalid,
+            "filtered_by_region": region,
+            "filtered_by_amount": {
+                "min": min_amount,
+                "max": max_amount
+            },
+            "final_count": len(view)
+        }
+        return view, invalid, summary
+
+
+# The valid rows matching region/amount filters, queried lazily. aggregate()
+# answers every data_processor metric as SalesAggregator state, so the
+# data_processor functions and generate_sales_report work on it unchanged.
+
+class SalesView:
+
+    def __init__(self, db, region=None, min_amount=None, max_amount=None):
+        self.db = db
+        self.region = region
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+
+        filters = [("valid", "=", 1)]
+        if region is not None:
+            filters.append(("Region", "=", region))
+        if min_amount is not None:
+            filters.append(("amount", ">=", min_amount))
+        if max_amount is not None:
+            filters.append(("amount", "<=", max_amount))
+        self.filters = filters
+        self.where = self._where()
+        self.params = [value for _, _, value in filters]
+        self._count = None
+
+    def _where(self, alias=""):
+        return " AND ".join(f"{alias}{column} {op} ?" for column, op, _ in self.filters)
+
+    def _query(self, sql, params=()):
+        return self.db.conn.execute(sql, self.params + list(params))
+
+    def __len__(self):
+        if self._count is None:
+            index = "idx_region" if self.region is not None else None
+            source = f"transactions INDEXED BY {index}" if index else "transactions"
+            self._count = self._query(f"SELECT COUNT(*) FROM {source} WHERE {self.where}").fetchone()[0]
+        return self._count
+
+    def _grouped(self, column, index, aggregates):
+        # one row per group in order of first appearance; the index scan
+        # feeds each group's rows in input order to the sums
+        return self._query(
+            f"SELECT {column}, {aggregates}, MIN(seq) AS first FROM transactions INDEXED BY {index} "
+            f"WHERE {self.where} GROUP BY {column} ORDER BY first"
+        ).fetchall()
+
+    def total_revenue(self):
+        # NOT INDEXED keeps the scan (and the sum) in rowid order
+        total = self._query(f"SELECT {self.db.fsum}(amount) FROM transactions NOT INDEXED "
+                            f"WHERE {self.where}").fetchone()[0]
+        return 0 if total is None else total
+
+    def aggregate(self):
+        fsum = self.db.fsum
+        results = SalesAggregator()
+        results.total_revenue = self.total_revenue()
+        results.transaction_count = len(self)
+
+        for region, sales, count, _ in self._grouped("Region", "idx_region", f"{fsum}(amount), COUNT(*)"):
+            results.regions[region] = {"total_sales": sales, "transaction_count": count}
+
+        for name, qty, revenue, _ in self._grouped("ProductName", "idx_product", f"SUM(Quantity), {fsum}(amount)"):
+            results.products[name] = {"qty": qty, "revenue": revenue}
+
+        for cid, spent, count, _ in self._grouped("CustomerID", "idx_customer", f"{fsum}(amount), COUNT(*)"):
+            results.customers[cid] = {"total_spent": spent, "purchase_count": count, "products": set()}
+
+        # products per customer, added in the order each was first bought
+        pairs = self._query(
+            f"SELECT CustomerID, ProductName, MIN(seq) AS first FROM transactions INDEXED BY idx_customer "
+            f"WHERE {self.where} GROUP BY CustomerID, ProductName ORDER BY first"
+        )
+        customers = results.customers
+        for cid, name, _ in pairs:
+            customers[cid]["products"].add(name)
+
+        daily = self._grouped("Date", "idx_date", f"{fsum}(amount), COUNT(*), COUNT(DISTINCT CustomerID)")
+        for date, revenue, count, distinct, _ in daily:
+            results.daily[date] = {"revenue": revenue, "transaction_count": count,
+                                   "customers": DistinctCount(distinct)}
+
+        return results
+
+    # Enrichment join
+
+    def iter_rows(self):
+        for row in self._query(f"SELECT {', '.join(_COLUMNS)} FROM transactions NOT INDEXED "
+                               f"WHERE {self.where} ORDER BY seq"):
+            yield Transaction(*row)
+
+    def iter_enriched(self):
+        # one ProductMatch per product, shared by its rows as iter_enriched does
+        matches = {}
+        rows = self._query(
+            f"SELECT {', '.join('t.' + c for c in _COLUMNS)}, t.product_num, "
+            f"p.product_id IS NOT NULL, p.category, p.brand, p.rating "
+            f"FROM transactions AS t NOT INDEXED LEFT JOIN products AS p ON p.product_id = t.product_num "
+            f"WHERE {self._where('t.')} "
+            f"ORDER BY t.seq"
+        )
+        for row in rows:
+            product_num, matched = row[8], row[9]
+            match = matches.get(product_num)
+            if match is None:
+                api_data = {"category": row[10], "brand": row[11], "rating": row[12]} if matched else None
+                match = matches[product_num] = ProductMatch(api_data)
+            yield EnrichedTransaction(Transaction(*row[:8]), match)
+
+    def enrichment_stats(self):
+        # what SalesAggregator tracks from API_Match flags
+        checked = len(self)
+        matched = self._query(
+            f"SELECT COUNT(*) FROM transactions AS t JOIN products AS p ON p.product_id = t.product_num "
+            f"WHERE {self._where('t.')}").fetchone()[0]
+        failed = self._query(
+            f"SELECT t.ProductName, MIN(t.seq) AS first FROM transactions AS t "
+            f"LEFT JOIN products AS p ON p.product_id = t.product_num "
+            f"WHERE {self._where('t.')} AND p.product_id IS NULL "
+            f"GROUP BY t.ProductName ORDER BY first")
+        return checked, matched, {name for name, _ in failed}
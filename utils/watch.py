@@ -0,0 +1,246 @@
+import contextlib
+import io
+import os
+import time
+from datetime import date as Date
+
+from utils.file_handler import iter_sales_data, iter_parse_transactions, iter_validate_and_filter, file_fingerprint
+from utils.data_processor import SalesAggregator
+from utils.report_generator import generate_sales_report
+from utils.ingest import COMPRESSED_OPENERS, expand_inputs, iter_file_lines
+
+
+POLL_SECONDS = 0.5
+REPORT_INTERVAL = 5.0
+WINDOW_DAYS = 7
+HOUR_BUCKET_SECONDS = 60
+
+
+# Sliding window over integer keys (day ordinals, arrival minutes)
+#
+# A ring of `size` buckets, each tagged with the key it holds. add() is O(1):
+# it lands in slot key % size, first clearing the slot if it still holds an
+# older key; keys that have fallen out of the window are dropped. total()
+# sums the buckets still inside the window ending at `latest` (or at `now`,
+# for windows that slide with the clock), so there is no running float total
+# to drift.
+
+class SlidingWindow:
+
+    def __init__(self, size):
+        self.size = size
+        self.keys = [None] * size
+        self.values = [0] * size
+        self.counts = [0] * size
+        self.latest = None
+
+    def add(self, key, amount):
+        if self.latest is None or key > self.latest:
+            self.latest = key
+        elif key <= self.latest - self.size:
+            return
+
+        slot = key % self.size
+        if self.keys[slot] != key:
+            self.keys[slot] = key
+            self.values[slot] = 0
+            self.counts[slot] = 0
+        self.values[slot] += amount
+        self.counts[slot] += 1
+
+    def total(self, now=None):
+        end = self.latest if now is None else now
+        if end is None:
+            return 0, 0
+
+        revenue = 0
+        count = 0
+        for key, value, n in zip(self.keys, self.values, self.counts):
+            if key is not None and end - self.size < key <= end:
+                revenue += value
+                count += n
+        return revenue, count
+
+
+# Live aggregates: the full SalesAggregator (region-wise sales, top products,
+# daily trend, ...) plus revenue over the last `window_days` days of sales
+# dates and over the last hour of arrival time.
+
+class LiveAggregates:
+
+    def __init__(self, window_days=WINDOW_DAYS):
+        self.results = SalesAggregator()
+        self.window_days = window_days
+        self.days = SlidingWindow(window_days)
+        self.hour = SlidingWindow(3600 // HOUR_BUCKET_SECONDS)
+        self.total_input = 0
+        self.invalid = 0
+        self._ordinals = {}
+
+    def _ordinal(self, day):
+        ordinal = self._ordinals.get(day)
+        if ordinal is None:
+            try:
+                ordinal = Date.fromisoformat(day).toordinal()
+            except ValueError:
+                ordinal = False
+            self._ordinals[day] = ordinal
+        return ordinal
+
+    def add(self, tx, arrived):
+        self.results.add(tx)
+        amount = tx["Quantity"] * tx["UnitPrice"]
+
+        ordinal = self._ordinal(tx["Date"])
+        if ordinal is not False:
+            self.days.add(ordinal, amount)
+        self.hour.add(int(arrived) // HOUR_BUCKET_SECONDS, amount)
+
+    def update(self, transactions, summary):
+        arrived = time.time()
+        for tx in iter_validate_and_filter(transactions, summary=summary):
+            self.add(tx, arrived)
+        self.total_input += summary.get("total_input", 0)
+        self.invalid += summary.get("invalid", 0)
+
+    def windows(self, now=None):
+        now = time.time() if now is None else now
+        return {
+            "last_days": self.days.total(),
+            "last_hour": self.hour.total(int(now) // HOUR_BUCKET_SECONDS)
+        }
+
+
+# Tailing
+#
+# Each plain file is followed from the byte offset after its last complete
+# line (a line still being written is picked up on a later poll). A file
+# that shrinks or whose already-read bytes change was rotated or rewritten,
+# so the aggregates are rebuilt from scratch. In a directory, new files are
+# picked up as they appear; compressed ones are treated as finished exports
+# and read once.
+
+class FileTail:
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.offset = 0
+        self.encoding = None
+        self.fingerprint = None
+        self.compressed = os.path.splitext(filename)[1].lower() in COMPRESSED_OPENERS
+
+    def changed(self):
+        if self.compressed or self.offset == 0:
+            return False
+        try:
+            if os.path.getsize(self.filename) < self.offset:
+                return True
+            return file_fingerprint(self.filename, self.offset) != self.fingerprint
+        except FileNotFoundError:
+            return True
+
+    def read_new(self):
+        if self.compressed:
+            if self.offset:
+                return
+            self.offset = 1
+            for batch in iter_file_lines(self.filename):
+                yield from batch
+            return
+
+        # wait until the header line is complete before reading a new file
+        if self.offset == 0:
+            with open(self.filename, "rb") as file:
+                if not file.readline().endswith(b"\n"):
+                    return
+
+        progress = {}
+        yield from iter_sales_data(self.filename, self.offset, self.encoding, progress, complete_lines_only=True)
+
+        if "offset" in progress:
+            self.encoding = progress["encoding"]
+            self.offset = progress["offset"]
+            self.fingerprint = file_fingerprint(self.filename, self.offset)
+
+
+def _watched_files(path):
+    if os.path.isdir(path):
+        return expand_inputs(path)
+    return [path] if os.path.exists(path) else []
+
+
+def render(live, report_file):
+    if not live.results.transaction_count:
+        return
+
+    # written aside and renamed so readers never see a half-written report
+    tmp_path = report_file + ".tmp"
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_sales_report(None, None, tmp_path, live.results)
+    os.replace(tmp_path, report_file)
+
+
+def status_line(live):
+    results = live.results
+    windows = live.windows()
+    day_revenue, day_count = windows["last_days"]
+    hour_revenue, hour_count = windows["last_hour"]
+    top = results.top_selling_products(1)
+    top_name = top[0][0] if top else "-"
+
+    return (f"{time.strftime('%H:%M:%S')} | rows {results.transaction_count} "
+            f"(invalid {live.invalid}) | revenue ₹{results.calculate_total_revenue():,.2f} | "
+            f"last {live.window_days} days ₹{day_revenue:,.2f} ({day_count}) | "
+            f"last hour ₹{hour_revenue:,.2f} ({hour_count}) | top {top_name}")
+
+
+# Watch mode
+#
+# Polls the file (or directory) every `poll_seconds`, parses only the
+# appended lines into the live aggregates, and re-renders the report and
+# status line at most once every `report_interval` seconds, and only when
+# something changed. Runs until interrupted, or for `duration` seconds.
+
+def watch(path, report_file="output/live_report.txt", report_interval=REPORT_INTERVAL,
+          window_days=WINDOW_DAYS, poll_seconds=POLL_SECONDS, duration=None):
+    os.makedirs(os.path.dirname(report_file) or ".", exist_ok=True)
+
+    live = LiveAggregates(window_days)
+    tails = {}
+    started = time.time()
+    last_render = 0
+    dirty = False
+
+    try:
+        while duration is None or time.time() - started < duration:
+            files = _watched_files(path)
+
+            if any(tails[f].changed() for f in files if f in tails) or any(f not in files for f in tails):
+                print("Input was rotated or rewritten; rebuilding live aggregates")
+                live = LiveAggregates(window_days)
+                tails = {}
+                dirty = True
+
+            new_rows = 0
+            for filename in files:
+                tail = tails.setdefault(filename, FileTail(filename))
+                summary = {}
+                live.update(iter_parse_transactions(tail.read_new()), summary)
+                new_rows += summary.get("total_input", 0)
+
+            dirty = dirty or new_rows > 0
+            now = time.time()
+            if dirty and now - last_render >= report_interval:
+                render(live, report_file)
+                print(status_line(live))
+                last_render = now
+                dirty = False
+
+            if not new_rows:
+                time.sleep(poll_seconds)
+    except KeyboardInterrupt:
+        print("\nStopping watch")
+
+    render(live, report_file)
+    print(status_line(live))
+    return live